@@ -0,0 +1,129 @@
+# api.py
+#
+# Small HTTP service for running crews from other systems:
+#
+#   crewai-studio serve --port 8000
+#   uvicorn app.api:app --port 8000
+#
+#   GET    /crews                  crews (id, name)
+#   POST   /crews/{crew_id}/runs   queue a crew run: {"inputs": {...}}; ?wait=true blocks until it finishes
+#   GET    /jobs/{job_id}          state of a queued run, with its queue position
+#   GET    /jobs/{job_id}/events   progress events after ?after=<seq>; ?wait=<s> long-polls for new ones
+#   DELETE /jobs/{job_id}          cancel a queued run, or stop a running one
+#   GET    /runs?crew_id=&limit=   recent runs
+#   GET    /cache                  compiled component cache statistics
+#   POST   /cache/clear            re-read .env and drop compiled components (after changing API keys)
+#
+# Runs share the process-wide executor (run_executor.py) with the UI; the
+# X-User header, or else the client address, is the user its per-user
+# limits apply to.
+
+import os
+import sys
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, Header, HTTPException, Request
+from pydantic import BaseModel
+
+import db_utils
+import run_events
+from crew_cache import compiled_cache_stats, reload_api_keys
+from run_executor import QueueFullError, get_executor
+
+load_dotenv()
+
+app = FastAPI(title="CrewAI Studio")
+
+class RunRequest(BaseModel):
+    inputs: Dict[str, Any] = {}
+
+@app.on_event("startup")
+def startup():
+    db_utils.initialize_db()
+
+@app.get("/health")
+def health():
+    return {"status": "ok"}
+
+@app.get("/crews")
+def list_crews(limit: int = 100):
+    return [{"id": crew.id, "name": crew.name} for crew in db_utils.load_crews(limit=limit)]
+
+def _job_dict(job):
+    data = job.to_dict()
+    data['position'] = get_executor().position(job.id)
+    channel = run_events.get_channel(job.run_id)
+    # Streamed output of the LLM call in progress, until the final output is in
+    data['live_output'] = channel.stream_text if channel is not None and not job.done else None
+    return data
+
+# Plain `def` endpoints run in FastAPI's thread pool, so waiting for a run
+# does not block other requests.
+@app.post("/crews/{crew_id}/runs", status_code=202)
+def run_crew(crew_id: str, http_request: Request, request: Optional[RunRequest] = None,
+             wait: bool = False, x_user: Optional[str] = Header(default=None)):
+    crew = db_utils.load_crew(crew_id)
+    if crew is None:
+        raise HTTPException(status_code=404, detail=f"Crew {crew_id} not found")
+    user = x_user or (http_request.client.host if http_request.client else 'anonymous')
+    try:
+        job = get_executor().submit(crew, request.inputs if request else {}, user=user)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    if wait:
+        job.wait()
+    return _job_dict(job)
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = get_executor().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return _job_dict(job)
+
+# Upper bound for ?wait on the events endpoint
+EVENTS_MAX_WAIT = 30.0
+
+@app.get("/jobs/{job_id}/events")
+def get_job_events(job_id: str, after: int = 0, wait: float = 0):
+    job = get_executor().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    channel = run_events.get_channel(job.run_id)
+    if channel is None:
+        return []
+    if wait > 0:
+        events = channel.wait(after, min(wait, EVENTS_MAX_WAIT))
+    else:
+        events = channel.events(after)
+    return [event._asdict() for event in events]
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    try:
+        cancelled = get_executor().cancel(job_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if not cancelled:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} has already finished")
+    return _job_dict(get_executor().get(job_id))
+
+@app.get("/runs")
+def list_runs(crew_id: Optional[str] = None, limit: int = 20):
+    return db_utils.load_crew_run(limit=limit, crew_id=crew_id)
+
+@app.get("/cache")
+def cache_stats():
+    return compiled_cache_stats()
+
+@app.post("/cache/clear")
+def clear_cache():
+    return {"cleared": reload_api_keys()}
@@ -1,76 +1,70 @@
 import os
+import importlib
+from typing import NamedTuple
 from dotenv import load_dotenv
-from zep_python.client import Zep
 import streamlit as st
 from streamlit import session_state as ss
 import agentops
 import db_utils
-from pg_export_crew import PageExportCrew
-from pg_crews import PageCrews
+import memory_backend
+import views
 
 # Load environment variables
 load_dotenv()
 
-def setup_zep_collection():
-    client = Zep(api_key=os.getenv('ZEP_API_KEY'), base_url=os.getenv('ZEP_BASE_URL'))
-    collection_name = "crewai_agents"
-
-    try:
-        # Check if the collection exists
-        existing_collections = client.list_collections()
-        if collection_name not in [col['name'] for col in existing_collections]:
-            # If not, create the collection
-            client.add_collection(
-                name=collection_name,
-                description="Collection for CrewAI agents",
-                metadata={"project": "CrewAI"}
-            )
-            print(f"Collection '{collection_name}' created successfully.")
-        else:
-            print(f"Collection '{collection_name}' already exists.")
-    except Exception as e:
-        print(f"Error accessing Zep collections: {e}")
-
-# Set up Zep collection
-setup_zep_collection()
-
 def main():
     from pg_crew_run import PageCrewRun
     st.set_page_config(page_title="AgencyHiveAI", page_icon="img/favicon.ico", layout="wide")
-    load_data() 
     # Initialize AgentOps
     agentops.init(api_key=os.getenv('AGENTOPS_API_KEY'), auto_start_session=True)
+    # Runs in the background once per process; the UI never waits for it
+    memory_backend.start_memory_bootstrap()
 
     # Initialize database and load session data
     db_utils.initialize_db()
     load_data()
     draw_sidebar()
     PageCrewRun.maintain_session_state()
-    pages()[ss.page].draw()
+    get_page(ss.page).draw()
 
-def pages():
-    from pg_crew_run import PageCrewRun
-    from pg_agents import PageAgents
-    from pg_tasks import PageTasks
-    from pg_crews import PageCrews
-    from pg_tools import PageTools
-    from pg_export_crew import PageExportCrew
-    return {
-        'Crews': PageCrews(),
-        'Tools': PageTools(),
-        'Agents': PageAgents(),
-        'Tasks': PageTasks(),
-        'Kickoff!': PageCrewRun(),
-        'Import/export': PageExportCrew()
-    }
+class PageSpec(NamedTuple):
+    module: str
+    class_name: str
+
+# Sidebar label -> page class; pages are imported and constructed on first visit
+PAGES = {
+    'Crews': PageSpec('pg_crews', 'PageCrews'),
+    'Tools': PageSpec('pg_tools', 'PageTools'),
+    'Agents': PageSpec('pg_agents', 'PageAgents'),
+    'Tasks': PageSpec('pg_tasks', 'PageTasks'),
+    'Kickoff!': PageSpec('pg_crew_run', 'PageCrewRun'),
+    'Batch kickoff': PageSpec('pg_batch', 'PageBatch'),
+    'Import/export': PageSpec('pg_export_crew', 'PageExportCrew'),
+}
+
+def get_page(name: str):
+    """Return the session's instance of the named page, constructing it on first use"""
+    instances = ss.setdefault('page_instances', {})
+    page = instances.get(name)
+    if page is None:
+        spec = PAGES[name]
+        page_class = getattr(importlib.import_module(spec.module), spec.class_name)
+        page = instances[name] = page_class()
+    return page
 
 def load_data():
-    ss['agents'] = db_utils.load_agents()
-    ss['tasks'] = db_utils.load_tasks()
-    ss['crews'] = db_utils.load_crews()
-    ss['tools'] = db_utils.load_tools()
-    ss['enabled_tools'] = db_utils.load_tools_state()
-    ss['crew_run'] = db_utils.load_crew_run()
+    # Sessions share one process-wide snapshot and only swap in a new one
+    # when a write has bumped its version. The snapshot holds plain models
+    # and the views edit objects in place, so each session gets views of its
+    # own (see views.session_library).
+    snapshot = db_utils.get_library_snapshot()
+    if ss.get('library_version') != snapshot.version:
+        ss['agents'], ss['tasks'], ss['crews'] = views.session_library(snapshot)
+        ss['library_version'] = snapshot.version
+    if 'tools' not in ss:
+        ss['tools'] = db_utils.load_tools()
+    if 'enabled_tools' not in ss:
+        ss['enabled_tools'] = db_utils.load_tools_state()
 
 def draw_sidebar():
     with st.sidebar:
@@ -78,15 +72,19 @@ def draw_sidebar():
         if 'page' not in ss:
             ss.page = 'Crews'
             
+        page_names = list(PAGES)
         selected_page = st.radio(
             'Page',
-            list(pages().keys()),
-            index=list(pages().keys()).index(ss.page),
+            page_names,
+            index=page_names.index(ss.page),
             label_visibility="collapsed")
         if selected_page != ss.page:
             
             ss.page = selected_page
             st.rerun()
 
+        memory = memory_backend.memory_status()
+        st.caption(f"Memory: {memory.state}", help=memory.message)
+
 if __name__ == '__main__':
     main()
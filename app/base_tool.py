@@ -1,8 +1,14 @@
 from core_utils import rnd_id
-import streamlit as st
+from crew_cache import content_hash
+import os
 from typing import Optional, Dict, Any, List
 
 class MyTool:
+    # Static metadata declared by each tool class, readable without an instance
+    name: str = ""
+    description: str = ""
+    parameters_metadata: Dict[str, Dict[str, Any]] = {}
+
     def __init__(
         self,
         tool_id: Optional[str] = None,
@@ -12,9 +18,11 @@ class MyTool:
         enabled: bool = True
     ):
         self.tool_id = tool_id or "T_" + rnd_id()
-        self.name = name
-        self.description = description
-        self.parameters = parameters or {}
+        self.name = name or type(self).name
+        self.description = description or type(self).description
+        # Every declared parameter is present, None until it is set
+        self.parameters = {param_name: None for param_name in self.parameters_metadata}
+        self.parameters.update(parameters or {})
         self.enabled = enabled
         self.edit_key = f'edit_{self.tool_id}'
 
@@ -27,6 +35,10 @@ class MyTool:
             "enabled": self.enabled
         }
 
+    def content_hash(self) -> str:
+        """Hash of the tool's definition; equal tools hash equally whatever their id"""
+        return content_hash(self.to_dict())
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'MyTool':
         return cls(
@@ -40,22 +52,35 @@ class MyTool:
     def get_parameter_names(self) -> List[str]:
         return list(self.parameters.keys())
 
-    def is_valid(self, show_warning: bool = False) -> bool:
-        """
-        Validate the tool's data.
+    def is_parameter_mandatory(self, param_name: str) -> bool:
+        return self.parameters_metadata.get(param_name, {}).get('mandatory', False)
 
-        Args:
-            show_warning (bool): Whether to show warnings for missing data.
+    def set_parameters(self, **kwargs):
+        for param_name, value in kwargs.items():
+            self.parameters[param_name] = value
 
-        Returns:
-            bool: True if valid, False otherwise.
+    def _validate_path(self, path: str) -> str:
         """
+        Resolve a path against the workspace directory.
+
+        Raises:
+            ValueError: If the path points outside the workspace.
+        """
+        workspace_root = os.path.abspath(os.getenv('WORKSPACE_DIR', './workspace'))
+        abs_path = os.path.abspath(os.path.join(workspace_root, path))
+        if os.path.commonpath([workspace_root, abs_path]) != workspace_root:
+            raise ValueError(f"Invalid path '{path}' - must stay within workspace")
+        return abs_path
+
+    def validation_errors(self) -> List[str]:
+        """Problems that keep the tool from being created; empty when it is valid"""
         if not self.name:
-            if show_warning:
-                st.warning("Tool name is required.")
-            return False
+            return ["Tool name is required."]
         # Add more validation rules as needed
-        return True
+        return []
+
+    def is_valid(self) -> bool:
+        return not self.validation_errors()
 
     def create_tool(self):
         """Create and return a tool instance based on the tool's configuration."""
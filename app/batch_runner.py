@@ -0,0 +1,356 @@
+# batch_runner.py
+#
+# Batch kickoff: run one crew once per row of placeholder inputs (from a CSV
+# or JSONL file). Rows run on the process-wide run executor (run_executor.py),
+# as runs of the user who started the batch, so they count against the same
+# global and per-user limits as runs from the Kickoff page and the API. At
+# most BATCH_WORKERS rows of all batches are handed to the executor at once,
+# which keeps batches from filling its queue, and every row also takes a
+# slot per LLM provider its crew uses, so a batch stays within each
+# provider's rate limits. Every row's state is stored in crew_batch_row as it
+# changes; a batch that was stopped or interrupted by a restart resumes with
+# the rows not yet done.
+#
+# Several processes (app replicas, the CLI) may run batches against one
+# database. The process running a batch owns it and records a heartbeat
+# every BATCH_HEARTBEAT_SECONDS; another process only takes a running batch
+# over once that heartbeat is BATCH_OWNER_TIMEOUT seconds old.
+
+import csv
+import io
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import Any, Dict, List, Optional
+
+from core_utils import rnd_id
+from crew_runner import RUN_CANCELLED, RUN_FAILED
+from models import CrewModel
+from run_control import CancelToken
+from run_executor import QueueFullError, RunExecutor, get_executor
+import db_utils
+
+BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', '4'))
+# Rows that may call one provider at once, unless BATCH_PROVIDER_LIMITS says otherwise
+BATCH_PROVIDER_CONCURRENCY = int(os.getenv('BATCH_PROVIDER_CONCURRENCY', '2'))
+# Per-provider overrides, e.g. "OpenAI=8,Ollama=1"
+BATCH_PROVIDER_LIMITS = os.getenv('BATCH_PROVIDER_LIMITS', '')
+BATCH_MAX_ROWS = int(os.getenv('BATCH_MAX_ROWS', '10000'))
+BATCH_HEARTBEAT_SECONDS = float(os.getenv('BATCH_HEARTBEAT_SECONDS', '10'))
+# A running batch whose owner sent no heartbeat for this long counts as interrupted
+BATCH_OWNER_TIMEOUT = float(os.getenv('BATCH_OWNER_TIMEOUT', '60'))
+# Seconds before a row tries again when the user's share of the run queue is full
+BATCH_QUEUE_RETRY_SECONDS = 1.0
+
+ROW_PENDING = 'pending'
+ROW_RUNNING = 'running'
+BATCH_RUNNING = 'running'
+BATCH_COMPLETED = 'completed'
+BATCH_STOPPED = 'stopped'
+# States shown for a batch (see BatchRunner.state), never stored
+BATCH_STOPPING = 'stopping'
+BATCH_ELSEWHERE = 'running elsewhere'
+BATCH_INTERRUPTED = 'interrupted'
+
+def parse_rows(file_name: str, data: bytes) -> List[Dict[str, Any]]:
+    """
+    Read placeholder rows from a CSV file (one column per placeholder) or a
+    JSONL file (one JSON object per line).
+
+    Raises:
+        ValueError: If the file cannot be read or has too many rows.
+    """
+    text = data.decode('utf-8-sig')
+    if file_name.lower().endswith(('.jsonl', '.ndjson')):
+        rows = []
+        for number, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Line {number} is not valid JSON: {e}")
+            if not isinstance(row, dict):
+                raise ValueError(f"Line {number} is not a JSON object")
+            rows.append(row)
+    else:
+        rows = [dict(row) for row in csv.DictReader(io.StringIO(text))]
+    if len(rows) > BATCH_MAX_ROWS:
+        raise ValueError(f"The file has {len(rows)} rows, at most {BATCH_MAX_ROWS} are allowed")
+    return rows
+
+def results_csv(batch_id: str) -> str:
+    """All rows of a batch, with their inputs, status, output and error, as CSV"""
+    rows = db_utils.load_batch_rows(batch_id)
+    input_columns = list(dict.fromkeys(key for row in rows for key in row['inputs']))
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(['row', *input_columns, 'status', 'run_id', 'output', 'error'])
+    for row in rows:
+        writer.writerow([
+            row['row_index'],
+            *[row['inputs'].get(column, '') for column in input_columns],
+            row['status'], row['run_id'], row['output'], row['error'],
+        ])
+    return buffer.getvalue()
+
+def _provider_limits() -> Dict[str, int]:
+    limits = {}
+    for item in filter(None, (part.strip() for part in BATCH_PROVIDER_LIMITS.split(','))):
+        provider, _, limit = item.rpartition('=')
+        try:
+            limits[provider.strip()] = int(limit)
+        except ValueError:
+            logging.error(f"Ignoring invalid BATCH_PROVIDER_LIMITS entry {item!r}")
+    return limits
+
+def crew_providers(crew: CrewModel) -> List[str]:
+    """LLM providers the crew's agents use, sorted so slots are always taken in the same order"""
+    agents = [*crew.agents, *(task.agent for task in crew.tasks if task.agent)]
+    return sorted({agent.llm_provider_model.split(': ')[0] for agent in agents if agent.llm_provider_model})
+
+class BatchJob:
+    """A batch executing in this process"""
+
+    def __init__(self, batch_id: str, crew: CrewModel, pending: int, user: str = 'anonymous'):
+        self.batch_id = batch_id
+        self.crew = crew
+        self.user = user
+        self.cancel_token = CancelToken()
+        self._remaining = pending
+        self._lock = threading.Lock()
+        # Executor jobs of the rows in progress, by row index
+        self._runs: Dict[int, Any] = {}
+
+    @property
+    def stopping(self) -> bool:
+        return self.cancel_token.cancelled
+
+    def _row_done(self) -> bool:
+        """Count a finished row; True for the last one"""
+        with self._lock:
+            self._remaining -= 1
+            return self._remaining == 0
+
+class BatchRunner:
+    """
+    Feeds batch rows to the run executor, a bounded number at a time and
+    within per-provider limits.
+
+    Args:
+        workers (int): Rows that may be in the executor at once across all batches.
+        provider_concurrency (int): Default number of rows that may use one provider at once.
+        executor (RunExecutor): Runs the rows; the process-wide executor by default.
+    """
+
+    def __init__(self, workers: int = BATCH_WORKERS, provider_concurrency: int = BATCH_PROVIDER_CONCURRENCY,
+                 executor: Optional[RunExecutor] = None):
+        self.workers = workers
+        self.provider_concurrency = provider_concurrency
+        self.executor = executor or get_executor()
+        self.provider_limits = _provider_limits()
+        # Each thread hands one row to the executor and waits for its run
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='crew-batch')
+        self._semaphores: Dict[str, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+        self._active: Dict[str, BatchJob] = {}
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        threading.Thread(target=self._heartbeat, name='crew-batch-heartbeat', daemon=True).start()
+
+    def _semaphore(self, provider: str) -> threading.Semaphore:
+        with self._lock:
+            if provider not in self._semaphores:
+                limit = self.provider_limits.get(provider, self.provider_concurrency)
+                self._semaphores[provider] = threading.Semaphore(limit)
+            return self._semaphores[provider]
+
+    def create(self, crew: CrewModel, rows: List[Dict[str, Any]], name: Optional[str] = None,
+               user: str = 'anonymous') -> str:
+        """
+        Store a new batch for `crew` and start it as runs of `user`.
+
+        Returns:
+            str: The id of the batch.
+
+        Raises:
+            ValueError: If the crew is not valid or there are no rows.
+        """
+        errors = crew.validation_errors()
+        if errors:
+            raise ValueError(errors[0])
+        if not rows:
+            raise ValueError("The batch has no rows")
+        batch_id = "B_" + rnd_id()
+        db_utils.save_batch(batch_id, crew.id, name or crew.name, rows, BATCH_RUNNING, ROW_PENDING, self.owner)
+        self.resume(batch_id, crew, user=user)
+        return batch_id
+
+    def resume(self, batch_id: str, crew: Optional[CrewModel] = None, retry_failed: bool = False,
+               user: str = 'anonymous') -> int:
+        """
+        Start the rows of a batch that have not completed yet.
+
+        Rows that were running when the batch was stopped or its process
+        died are run again; failed rows only with retry_failed. The rows run
+        as runs of `user` on the executor. The batch is claimed for this process first, which fails while another process
+        is still running it.
+
+        Returns:
+            int: The number of rows started.
+
+        Raises:
+            LookupError: If the batch or its crew no longer exists.
+            RuntimeError: If the batch is already running, here or in another
+                process that is still alive.
+        """
+        batch = db_utils.load_batch(batch_id)
+        if batch is None:
+            raise LookupError(f"Batch {batch_id} not found")
+        crew = crew or db_utils.load_crew(batch['crew_id'])
+        if crew is None:
+            raise LookupError(f"Crew {batch['crew_id']} of batch {batch_id} not found")
+
+        with self._lock:
+            if batch_id in self._active:
+                raise RuntimeError(f"Batch {batch_id} is already running")
+            job = self._active[batch_id] = BatchJob(batch_id, crew, 0, user)
+        try:
+            if not db_utils.claim_batch(batch_id, self.owner, BATCH_RUNNING, BATCH_OWNER_TIMEOUT):
+                raise RuntimeError(f"Batch {batch_id} is running in another process")
+            statuses = [ROW_PENDING, ROW_RUNNING, RUN_CANCELLED] + ([RUN_FAILED] if retry_failed else [])
+            rows = db_utils.load_batch_rows(batch_id, statuses)
+        except BaseException:
+            with self._lock:
+                self._active.pop(batch_id, None)
+            raise
+        if not rows:
+            with self._lock:
+                self._active.pop(batch_id, None)
+            db_utils.update_batch_status(batch_id, BATCH_COMPLETED, finished=True)
+            return 0
+        job._remaining = len(rows)
+        for row in rows:
+            self._pool.submit(self._run_row, job, row)
+        return len(rows)
+
+    def stop(self, batch_id: str) -> bool:
+        """Stop a running batch; rows in progress end at their next step and can be resumed"""
+        job = self._active.get(batch_id)
+        if job is None:
+            return False
+        job.cancel_token.cancel()
+        with job._lock:
+            job_ids = [run.id for run in job._runs.values()]
+        for job_id in job_ids:
+            self.executor.cancel(job_id)
+        return True
+
+    def is_active(self, batch_id: str) -> bool:
+        return batch_id in self._active
+
+    def get(self, batch_id: str) -> Optional[BatchJob]:
+        return self._active.get(batch_id)
+
+    def state(self, batch: Dict[str, Any]) -> str:
+        """
+        How a batch stands as seen from this process: its stored status, or
+        BATCH_STOPPING, BATCH_ELSEWHERE (running in another live process) or
+        BATCH_INTERRUPTED (marked running, but its owner is gone).
+
+        Args:
+            batch (dict): The batch as loaded by db_utils.load_batch.
+        """
+        job = self._active.get(batch['id'])
+        if job is not None:
+            return BATCH_STOPPING if job.stopping else BATCH_RUNNING
+        if batch['status'] != BATCH_RUNNING:
+            return batch['status']
+        age = batch['heartbeat_age']
+        if age is not None and age.total_seconds() < BATCH_OWNER_TIMEOUT:
+            return BATCH_ELSEWHERE
+        return BATCH_INTERRUPTED
+
+    def _heartbeat(self):
+        while True:
+            time.sleep(BATCH_HEARTBEAT_SECONDS)
+            batch_ids = list(self._active)
+            if batch_ids:
+                try:
+                    db_utils.heartbeat_batches(batch_ids, self.owner)
+                except Exception:
+                    pass  # logged by db_operations; the next beat retries
+
+    def _run_row(self, job: BatchJob, row: Dict[str, Any]):
+        batch_id, index, inputs = job.batch_id, row['row_index'], row['inputs']
+        try:
+            if not job.stopping:
+                with ExitStack() as slots:
+                    for provider in crew_providers(job.crew):
+                        slots.enter_context(self._semaphore(provider))
+                    if not job.stopping:
+                        self._execute_row(job, index, inputs)
+        except Exception as e:
+            logging.error(f"Row {index} of batch {batch_id} could not be run: {str(e)}")
+        finally:
+            if job._row_done():
+                self._finish(job)
+
+    def _submit_row(self, job: BatchJob, index: int, inputs: Dict[str, Any]):
+        """Queue a row on the executor, waiting while the user's share of the queue is full; None once stopped"""
+        while not job.stopping:
+            try:
+                run = self.executor.submit(job.crew, inputs, user=job.user)
+            except QueueFullError:
+                time.sleep(BATCH_QUEUE_RETRY_SECONDS)
+                continue
+            with job._lock:
+                job._runs[index] = run
+                stopping = job.stopping
+            if stopping:
+                # stop() ran between the submit and the registration above
+                self.executor.cancel(run.id)
+            return run
+        return None
+
+    def _execute_row(self, job: BatchJob, index: int, inputs: Dict[str, Any]):
+        run = self._submit_row(job, index, inputs)
+        if run is None:
+            return
+        try:
+            db_utils.update_batch_row(job.batch_id, index, ROW_RUNNING, run.run_id)
+            run.wait()
+        finally:
+            with job._lock:
+                job._runs.pop(index, None)
+        result = run.result
+        if result.status == RUN_CANCELLED:
+            # Left for resume()
+            db_utils.update_batch_row(job.batch_id, index, RUN_CANCELLED)
+        else:
+            db_utils.update_batch_row(job.batch_id, index, result.status, output=result.output,
+                                      error=result.error, finished=True)
+
+    def _finish(self, job: BatchJob):
+        with self._lock:
+            self._active.pop(job.batch_id, None)
+        if job.stopping:
+            db_utils.update_batch_status(job.batch_id, BATCH_STOPPED)
+        else:
+            db_utils.update_batch_status(job.batch_id, BATCH_COMPLETED, finished=True)
+
+_runner: Optional[BatchRunner] = None
+_runner_lock = threading.Lock()
+
+def get_batch_runner() -> BatchRunner:
+    """The process-wide batch runner, started on first use"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = BatchRunner()
+        return _runner
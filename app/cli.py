@@ -0,0 +1,161 @@
+# cli.py
+#
+# Run crews without the Streamlit UI:
+#
+#   crewai-studio crews
+#   crewai-studio run <crew_id> --inputs inputs.json
+#   crewai-studio runs --crew <crew_id>
+#   crewai-studio batch <crew_id> rows.csv
+#   crewai-studio batch --resume <batch_id>
+#   crewai-studio serve --port 8000
+#
+# or, from a checkout, `python app/cli.py ...`.
+
+import argparse
+import json
+import os
+import sys
+
+# The app modules import each other as top-level modules (`import db_utils`),
+# so make them importable when this runs as the `app.cli` entry point too.
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+def _init():
+    """Same start-up as the Streamlit app, minus the UI"""
+    import agentops
+    import db_utils
+    if os.getenv('AGENTOPS_API_KEY'):
+        agentops.init(api_key=os.getenv('AGENTOPS_API_KEY'), auto_start_session=True)
+    db_utils.initialize_db()
+
+def _read_inputs(path: str) -> dict:
+    if path == '-':
+        inputs = json.load(sys.stdin)
+    else:
+        with open(path) as f:
+            inputs = json.load(f)
+    if not isinstance(inputs, dict):
+        raise ValueError(f"{path} must contain a JSON object mapping placeholders to values")
+    return inputs
+
+def cmd_run(args) -> int:
+    import crew_runner
+    inputs = _read_inputs(args.inputs) if args.inputs else {}
+    try:
+        result = crew_runner.run_crew_by_id(args.crew_id, inputs)
+    except (LookupError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    if args.json:
+        print(json.dumps(result._asdict(), indent=2))
+    elif result.status == crew_runner.RUN_COMPLETED:
+        print(result.output)
+    else:
+        print(result.error, file=sys.stderr)
+    return 0 if result.status == crew_runner.RUN_COMPLETED else 1
+
+def cmd_batch(args) -> int:
+    import time
+    import batch_runner
+    import db_utils
+    runner = batch_runner.get_batch_runner()
+    try:
+        if args.resume:
+            batch_id = args.resume
+            runner.resume(batch_id, retry_failed=args.retry_failed)
+        else:
+            if not args.crew_id or not args.rows:
+                print("Error: give a crew id and a rows file, or --resume <batch_id>", file=sys.stderr)
+                return 2
+            crew = db_utils.load_crew(args.crew_id)
+            if crew is None:
+                raise LookupError(f"Crew {args.crew_id} not found")
+            with open(args.rows, 'rb') as f:
+                rows = batch_runner.parse_rows(args.rows, f.read())
+            batch_id = runner.create(crew, rows, name=f"{crew.name} · {os.path.basename(args.rows)}")
+    except (LookupError, ValueError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    print(f"Batch {batch_id}", file=sys.stderr)
+    try:
+        while runner.is_active(batch_id):
+            batch = db_utils.load_batch(batch_id)
+            print(f"\r{batch['completed']} completed, {batch['failed']} failed of {batch['total']}", end='', file=sys.stderr)
+            time.sleep(2)
+    except KeyboardInterrupt:
+        runner.stop(batch_id)
+        print(f"\nStopping; continue later with: crewai-studio batch --resume {batch_id}", file=sys.stderr)
+        while runner.is_active(batch_id):
+            time.sleep(0.5)
+    batch = db_utils.load_batch(batch_id)
+    print(f"\r{batch['completed']} completed, {batch['failed']} failed of {batch['total']}", file=sys.stderr)
+    output = batch_runner.results_csv(batch_id)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output, end='')
+    return 0 if batch['completed'] == batch['total'] else 1
+
+def cmd_crews(args) -> int:
+    import db_utils
+    for crew in db_utils.load_crews(limit=args.limit):
+        print(f"{crew.id}\t{crew.name}")
+    return 0
+
+def cmd_runs(args) -> int:
+    import db_utils
+    for run in db_utils.load_crew_run(limit=args.limit, crew_id=args.crew):
+        print(f"{run['id']}\t{run['crew_id']}\t{run['status']}\t{run['created_at']}")
+    return 0
+
+def cmd_serve(args) -> int:
+    import uvicorn
+    from api import app
+    uvicorn.run(app, host=args.host, port=args.port)
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='crewai-studio', description="Run CrewAI Studio crews without the UI.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="Kick off a crew and record the run")
+    run.add_argument('crew_id')
+    run.add_argument('--inputs', help="JSON file with placeholder values ('-' reads stdin)")
+    run.add_argument('--json', action='store_true', help="Print the run record as JSON")
+    run.set_defaults(handler=cmd_run)
+
+    batch = commands.add_parser('batch', help="Run a crew once per row of a CSV/JSONL file of placeholder values")
+    batch.add_argument('crew_id', nargs='?')
+    batch.add_argument('rows', nargs='?', help="CSV with one column per placeholder, or JSONL")
+    batch.add_argument('--resume', metavar='BATCH_ID', help="Continue a stopped or interrupted batch")
+    batch.add_argument('--retry-failed', action='store_true', help="With --resume, also rerun failed rows")
+    batch.add_argument('--output', help="Write the results CSV here instead of stdout")
+    batch.set_defaults(handler=cmd_batch)
+
+    crews = commands.add_parser('crews', help="List crews")
+    crews.add_argument('--limit', type=int, default=100)
+    crews.set_defaults(handler=cmd_crews)
+
+    runs = commands.add_parser('runs', help="List recent runs")
+    runs.add_argument('--crew', help="Only runs of this crew id")
+    runs.add_argument('--limit', type=int, default=20)
+    runs.set_defaults(handler=cmd_runs)
+
+    serve = commands.add_parser('serve', help="Start the HTTP API")
+    serve.add_argument('--host', default=os.getenv('API_HOST', '127.0.0.1'))
+    serve.add_argument('--port', type=int, default=int(os.getenv('API_PORT', '8000')))
+    serve.set_defaults(handler=cmd_serve)
+
+    args = parser.parse_args(argv)
+    _init()
+    sys.exit(args.handler(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# crew_cache.py
+#
+# Compiled crewai components, reused across runs. Compiling an agent means
+# creating its LLM client and its tool instances (the RAG tools index their
+# source when they are created), so these are kept in LRU caches keyed by a
+# content hash of their definition: a run of an unchanged crew reuses them,
+# and any edit changes the hash, so the edited part is built afresh.
+#
+# Only stateless parts are shared between runs. crewai agents keep executor
+# state while they run, so every run gets its own copy of the cached agent
+# template (sharing its LLM and tools), and the token sink StreamingLLM
+# writes to is a contextvar of the run (see llm_streaming), not LLM state.
+#
+# LLM clients read their API keys when they are created, so a changed key only
+# takes effect once the cache is dropped: reload_api_keys() re-reads .env and
+# clears it, and is behind the tools page's "Reload API keys" button and the
+# API's POST /cache/clear. Edited tool parameters change the tool's hash and
+# need no clearing. COMPILED_CACHE_SIZE=0 turns caching off.
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable
+
+from crewai import Agent
+from dotenv import load_dotenv
+
+from llms import create_llm
+
+# Entries kept per cache (LLMs, tools, agent templates, crews)
+COMPILED_CACHE_SIZE = int(os.getenv('COMPILED_CACHE_SIZE', '64'))
+
+# Keys that identify or date a definition without changing what it compiles to
+VOLATILE_KEYS = ('id', 'tool_id', 'created_at')
+
+def _canonical(data: Any, ignore: Iterable[str]) -> Any:
+    if isinstance(data, dict):
+        return {key: _canonical(value, ignore) for key, value in data.items() if key not in ignore}
+    if isinstance(data, (list, tuple)):
+        return [_canonical(value, ignore) for value in data]
+    return data
+
+def content_hash(data: Dict[str, Any], ignore: Iterable[str] = VOLATILE_KEYS) -> str:
+    """
+    SHA-256 of a definition as produced by to_dict().
+
+    The data is serialised as JSON with sorted keys, so equal definitions
+    hash equally regardless of key order.
+
+    Args:
+        data (dict): The definition.
+        ignore (iterable): Keys left out at every level.
+
+    Returns:
+        str: The hex digest.
+    """
+    canonical = json.dumps(_canonical(data, frozenset(ignore)), sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache.
+
+    Args:
+        maxsize (int): Entries kept; 0 disables the cache.
+    """
+
+    def __init__(self, maxsize: int = COMPILED_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(self, key: Any, create: Callable[[], Any]) -> Any:
+        """
+        The entry for `key`, created with `create()` on a miss.
+
+        `create` runs outside the lock, so a slow build does not hold up
+        other lookups; if two threads miss on the same key at once, the
+        first value stored wins. Exceptions from `create` are not cached.
+        """
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self.misses += 1
+        value = create()
+        if self.maxsize <= 0:
+            return value
+        with self._lock:
+            value = self._entries.setdefault(key, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+_llms = LRUCache()
+_tools = LRUCache()
+_agents = LRUCache()
+_crews = LRUCache()
+
+def get_llm(provider_and_model: str, temperature: float, streaming: bool = False):
+    """The LLM client for these settings, see llms.create_llm"""
+    return _llms.get_or_create(
+        (provider_and_model, temperature, streaming),
+        lambda: create_llm(provider_and_model, temperature=temperature, streaming=streaming)
+    )
+
+def get_tool(tool):
+    """The crewai tool for a MyTool definition"""
+    return _tools.get_or_create(tool.content_hash(), tool.create_tool)
+
+def _agent_template(agent) -> Agent:
+    return _agents.get_or_create(agent.content_hash(), lambda: Agent(
+        role=agent.role,
+        backstory=agent.backstory,
+        goal=agent.goal,
+        allow_delegation=agent.allow_delegation,
+        verbose=agent.verbose,
+        max_iter=agent.max_iter,
+        cache=agent.cache,
+        tools=[get_tool(tool) for tool in agent.tools],
+        llm=get_llm(agent.llm_provider_model, agent.temperature, streaming=True)
+    ))
+
+def get_agent(agent) -> Agent:
+    """
+    A crewai Agent for an AgentModel, for one run.
+
+    The agent is a copy of a cached template, so it shares the template's
+    LLM client and tools but none of its run state.
+    """
+    return _agent_template(agent).copy()
+
+def get_crew_agents(crew) -> Dict[str, Agent]:
+    """
+    crewai Agents for one run of a CrewModel, by agent id.
+
+    Covers the crew's agents and the agents of its tasks. The templates are
+    looked up by the crew's content hash first, so an unchanged crew costs
+    one hash; after an edit, agents whose definition did not change are
+    still found in the agent cache.
+    """
+    def templates() -> Dict[str, Agent]:
+        members = {agent.id: agent for agent in crew.agents}
+        for task in crew.tasks:
+            if task.agent is not None:
+                members.setdefault(task.agent.id, task.agent)
+        return {agent_id: _agent_template(agent) for agent_id, agent in members.items()}
+
+    # Ids are kept: they tie tasks to agents and to each other
+    crew_templates = _crews.get_or_create(crew.content_hash(), templates)
+    return {agent_id: template.copy() for agent_id, template in crew_templates.items()}
+
+def clear_compiled_cache():
+    """Drop every cached component, e.g. after API keys changed"""
+    for cache in (_llms, _tools, _agents, _crews):
+        cache.clear()
+
+def reload_api_keys() -> Dict[str, Dict[str, int]]:
+    """
+    Re-read .env and drop the cached components, so that LLM clients and
+    tools built from now on use the current API keys. Runs in progress keep
+    the components they started with.
+
+    Returns:
+        dict: Cache statistics before clearing.
+    """
+    stats = compiled_cache_stats()
+    load_dotenv(override=True)
+    clear_compiled_cache()
+    return stats
+
+def compiled_cache_stats() -> Dict[str, Dict[str, int]]:
+    return {
+        'llms': _llms.stats(),
+        'tools': _tools.stats(),
+        'agents': _agents.stats(),
+        'crews': _crews.stats(),
+    }
@@ -0,0 +1,178 @@
+# crew_runner.py
+#
+# Headless crew execution shared by the CLI (cli.py) and the HTTP service
+# (api.py): load a crew through db_utils, kick it off and record the run,
+# with its inputs and final output or error, in crew_run.
+
+import logging
+import os
+import threading
+import traceback
+from typing import Any, Dict, NamedTuple, Optional
+
+import db_utils
+from models import CrewModel
+from llm_streaming import TokenSink, stream_to
+from run_events import RUN_FINISHED, Publisher, RunReporter
+from run_control import (
+    RUN_ID_ENV, CancelToken, RunCancelled, cleanup_run_containers, reset_current_run, set_current_run,
+)
+
+RUN_QUEUED = 'queued'
+RUN_RUNNING = 'running'
+RUN_COMPLETED = 'completed'
+RUN_FAILED = 'failed'
+RUN_CANCELLED = 'cancelled'
+
+class CrewRunResult(NamedTuple):
+    run_id: Optional[int]
+    crew_id: str
+    status: str
+    output: Optional[str] = None
+    error: Optional[str] = None
+
+def result_text(result: Any) -> str:
+    """Final text of a kickoff result, for both old (dict) and new (CrewOutput) crewai versions"""
+    if isinstance(result, dict) and 'final_output' in result:
+        return str(result['final_output'])
+    raw = getattr(result, 'raw', None)
+    return raw if raw is not None else str(result)
+
+def record_run(crew: CrewModel, inputs: Optional[Dict[str, Any]] = None, status: str = RUN_QUEUED) -> int:
+    """
+    Validate a crew and insert its crew_run row without running it.
+
+    Returns:
+        int: The id of the new run.
+
+    Raises:
+        ValueError: If the crew is not valid; no run is recorded then.
+    """
+    errors = crew.validation_errors()
+    if errors:
+        raise ValueError(errors[0])
+    agent_id = crew.agents[0].id if crew.agents else None
+    return db_utils.save_crew_run(crew.id, agent_id, status, inputs or {})
+
+def execute_run(run_id: int, crew: CrewModel, inputs: Optional[Dict[str, Any]] = None,
+                cancel_token: Optional[CancelToken] = None, publish: Optional[Publisher] = None,
+                stream: Optional[TokenSink] = None, **crew_kwargs) -> CrewRunResult:
+    """
+    Kick off a crew for a run recorded by record_run and store its outcome.
+
+    Failures of the crew itself are recorded and returned, not raised.
+
+    Args:
+        cancel_token (CancelToken): Checked before every task and after every
+            agent step (each LLM call or tool use); once it is cancelled the
+            run stops there and is recorded as cancelled.
+        publish: Receives the run's progress events, see run_events.
+        stream (TokenSink): Receives the output of LLM calls token by token,
+            for providers that can stream. The full output is still stored
+            in crew_run when the run ends.
+    """
+    reporter = RunReporter([task.description for task in crew.ordered_tasks()], publish, cancel_token,
+                           infer_task_start=crew.max_parallel_tasks <= 1)
+    crew_kwargs.setdefault('step_callback', reporter.step_callback)
+    crew_kwargs.setdefault('task_callback', reporter.task_callback)
+    context = set_current_run(run_id)
+    try:
+        if cancel_token is not None:
+            cancel_token.check()
+        db_utils.update_crew_run_status(run_id, RUN_RUNNING)
+        crewai_crew = crew.get_crewai_crew(**crew_kwargs)
+        reporter.start()
+        with stream_to(stream):
+            result = crew.kickoff(crewai_crew, inputs, reporter)
+    except RunCancelled:
+        logging.info(f"Crew {crew.id} run {run_id} cancelled")
+        db_utils.finish_crew_run(run_id, RUN_CANCELLED)
+        run_result = CrewRunResult(run_id, crew.id, RUN_CANCELLED)
+    except Exception as e:
+        logging.error(f"Crew {crew.id} run {run_id} failed: {str(e)}")
+        error = traceback.format_exc()
+        db_utils.finish_crew_run(run_id, RUN_FAILED, error=error)
+        run_result = CrewRunResult(run_id, crew.id, RUN_FAILED, error=error)
+    else:
+        output = result_text(result)
+        db_utils.finish_crew_run(run_id, RUN_COMPLETED, output=output)
+        run_result = CrewRunResult(run_id, crew.id, RUN_COMPLETED, output=output)
+    finally:
+        reset_current_run(context)
+        cleanup_run_containers(run_id)
+
+    reporter.publish(RUN_FINISHED, f"Run {run_result.status}", {'status': run_result.status})
+    return run_result
+
+def run_in_process(run_id: int, crew_id: str, inputs: Dict[str, Any], cancel_token: CancelToken, conn):
+    """
+    Entry point of a worker process started by the run executor.
+
+    The crew is loaded from the database here rather than pickled. Progress
+    events are sent back through `conn` as ('event', kind, message, data)
+    and the CrewRunResult last, as ('result', result). LLM clients, pooled database
+    connections and anything else the run opened go away with the process.
+    """
+    os.environ[RUN_ID_ENV] = str(run_id)
+    # Async tasks call back from other threads; the pipe is not thread-safe
+    send_lock = threading.Lock()
+
+    def publish(kind, message, data):
+        with send_lock:
+            conn.send(('event', kind, message, data))
+
+    class PipeStream:
+        def start_stream(self):
+            with send_lock:
+                conn.send(('start_stream',))
+
+        def write_stream(self, text):
+            with send_lock:
+                conn.send(('write_stream', text))
+
+    try:
+        crew = db_utils.load_crew(crew_id)
+        if crew is None:
+            error = f"Crew {crew_id} not found"
+            db_utils.finish_crew_run(run_id, RUN_FAILED, error=error)
+            result = CrewRunResult(run_id, crew_id, RUN_FAILED, error=error)
+        else:
+            result = execute_run(run_id, crew, inputs, cancel_token, publish, PipeStream())
+    except Exception as e:
+        logging.error(f"Run {run_id} could not be executed: {str(e)}")
+        result = CrewRunResult(run_id, crew_id, RUN_FAILED, error=traceback.format_exc())
+    with send_lock:
+        conn.send(('result', result))
+    conn.close()
+
+def run_crew(crew: CrewModel, inputs: Optional[Dict[str, Any]] = None, **crew_kwargs) -> CrewRunResult:
+    """
+    Kick off a crew in the calling thread and record the run in crew_run.
+
+    Args:
+        crew (CrewModel): The crew to run.
+        inputs (dict): Values for the placeholders in the crew's agents and tasks.
+        **crew_kwargs: Passed on to CrewModel.get_crewai_crew.
+
+    Returns:
+        CrewRunResult: The run id, final status and output or error. Failures
+        of the crew itself are reported here rather than raised.
+
+    Raises:
+        ValueError: If the crew is not valid; no run is recorded then.
+    """
+    run_id = record_run(crew, inputs)
+    return execute_run(run_id, crew, inputs, **crew_kwargs)
+
+def run_crew_by_id(crew_id: str, inputs: Optional[Dict[str, Any]] = None, **crew_kwargs) -> CrewRunResult:
+    """
+    Load a crew from the database and run it; see run_crew.
+
+    Raises:
+        LookupError: If there is no crew with this id.
+        ValueError: If the crew is not valid.
+    """
+    crew = db_utils.load_crew(crew_id)
+    if crew is None:
+        raise LookupError(f"Crew {crew_id} not found")
+    return run_crew(crew, inputs, **crew_kwargs)
@@ -6,8 +6,7 @@ import importlib.util
 from pydantic import BaseModel, Field, model_validator
 import docker
 import base64
-from base_tool import MyTool
-from agentops import record_tool
+from run_control import RUN_LABEL, current_run_id
 
 class FixedCustomFileWriteToolInputSchema(BaseModel):
     content: str = Field(..., description="The content to write or append to the file")
@@ -26,31 +25,6 @@ class CustomFileWriteToolInputSchema(FixedCustomFileWriteToolInputSchema):
         "extra": "forbid"
     }
 
-class MyCustomFileWriteTool(MyTool):
-    def __init__(self, tool_id=None, base_folder=None):
-        parameters = {
-            'base_folder': {'mandatory': True}
-        }
-        self.workspace_root = os.path.abspath(os.getenv('WORKSPACE_DIR', './workspace'))
-        if base_folder:
-            parameters['base_folder'] = base_folder
-        else:
-            parameters['base_folder'] = self.workspace_root
-        
-        super().__init__(
-            tool_id, 
-            'CustomFileWriteTool',
-            "A tool that can be used to write content to files within the allowed workspace directory.",
-            parameters
-        )
-
-    @record_tool('CustomFileWriteTool')
-    def create_tool(self) -> 'MyCustomFileWriteTool':  # Changed to string literal type annotation
-        base_folder = self.parameters.get('base_folder', self.workspace_root)
-        if not os.path.exists(base_folder):
-            os.makedirs(base_folder)
-        return MyCustomFileWriteTool(base_folder=base_folder)
-
 class CustomApiToolInputSchema(BaseModel):
     endpoint: str = Field(..., description="The specific endpoint for the API call")
     method: str = Field(..., description="HTTP method to use (GET, POST, PUT, DELETE)")
@@ -209,7 +183,9 @@ class CustomCodeInterpreterTool(BaseTool):
         volumes = {}
         if self.workspace_dir:
             volumes[self.workspace_dir] = {"bind": "/workspace", "mode": "rw"}
-        container_name = "custom-code-interpreter"
+        # Inside a crew run, use a container of its own that is removed when the run ends
+        run_id = current_run_id()
+        container_name = f"custom-code-interpreter-{run_id}" if run_id else "custom-code-interpreter"
         existing_container = self._get_existing_container(container_name)
         if existing_container:
             return existing_container
@@ -219,7 +195,8 @@ class CustomCodeInterpreterTool(BaseTool):
             tty=True,
             working_dir="/workspace",
             name=container_name,
-            volumes=volumes
+            volumes=volumes,
+            labels={RUN_LABEL: run_id} if run_id else {}
         )
 
     def run_code_in_docker(self, code: str, libraries_used: str) -> str:
@@ -0,0 +1,131 @@
+# db_listener.py
+
+import json
+import logging
+import select
+import threading
+from typing import Any, Callable, Dict, Optional
+
+import psycopg2
+from psycopg2 import sql
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+class ChangeListener:
+    """
+    Background LISTEN loop on a dedicated (non-pooled) PostgreSQL connection.
+
+    Every notification on `channel` is decoded from JSON and passed to
+    `on_change`, except those whose `origin` equals `ignore_origin` (changes
+    made by this process, which it already applied locally). After each
+    (re)connect `on_change(None)` is called, since notifications sent while
+    disconnected are lost and the caller must assume anything changed.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        channel: str,
+        on_change: Callable[[Optional[Dict[str, Any]]], None],
+        ignore_origin: Optional[str] = None,
+        poll_interval: float = 5.0,
+        max_backoff: float = 30.0
+    ):
+        self.dsn = dsn
+        self.channel = channel
+        self.on_change = on_change
+        self.ignore_origin = ignore_origin
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._stats = {
+            'received': 0,
+            'ignored': 0,
+            'applied': 0,
+            'reconnects': 0,
+            'errors': 0,
+            'last_version': None,
+        }
+        self._thread = threading.Thread(target=self._run, name=f'listen-{channel}', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop listening and close the connection."""
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for received, ignored and applied notifications, reconnects and errors."""
+        with self._lock:
+            return dict(self._stats)
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _connect(self):
+        conn = psycopg2.connect(self.dsn)
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cursor:
+            cursor.execute(sql.SQL('LISTEN {}').format(sql.Identifier(self.channel)))
+        return conn
+
+    def _run(self):
+        backoff = 1.0
+        first = True
+        while not self._stop.is_set():
+            try:
+                self._conn = self._connect()
+                if not first:
+                    self._count('reconnects')
+                first = False
+                backoff = 1.0
+                self._dispatch(None)
+                self._listen(self._conn)
+            except psycopg2.Error as e:
+                self._count('errors')
+                logging.error(f"Change listener on '{self.channel}' lost its connection: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+            finally:
+                if self._conn is not None and not self._conn.closed:
+                    self._conn.close()
+                self._conn = None
+
+    def _listen(self, conn):
+        while not self._stop.is_set():
+            if select.select([conn], [], [], self.poll_interval) == ([], [], []):
+                # Idle: make sure the connection is still alive
+                with conn.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                continue
+            conn.poll()
+            while conn.notifies:
+                self._handle(conn.notifies.pop(0).payload)
+
+    def _handle(self, payload: str):
+        self._count('received')
+        try:
+            change = json.loads(payload)
+        except ValueError:
+            logging.error(f"Ignoring malformed change notification on '{self.channel}': {payload!r}")
+            self._count('errors')
+            return
+        with self._lock:
+            version = change.get('version')
+            if version is not None and (self._stats['last_version'] is None or version > self._stats['last_version']):
+                self._stats['last_version'] = version
+        if self.ignore_origin is not None and change.get('origin') == self.ignore_origin:
+            self._count('ignored')
+            return
+        self._dispatch(change)
+
+    def _dispatch(self, change: Optional[Dict[str, Any]]):
+        try:
+            self.on_change(change)
+            if change is not None:
+                self._count('applied')
+        except Exception as e:
+            self._count('errors')
+            logging.error(f"Change listener callback failed for {change}: {e}")
@@ -0,0 +1,408 @@
+# db_migrations.py
+
+import logging
+from typing import List, Tuple
+
+# Arbitrary application-wide key for pg_advisory_lock, so concurrent replicas
+# starting against the same database apply migrations one at a time.
+MIGRATION_LOCK_KEY = 72_616_201
+
+# Ordered migration steps: (version, description, sql).
+# Every step must be idempotent (IF NOT EXISTS, ...) so it can safely run
+# against databases created before versioning was introduced.
+MIGRATIONS: List[Tuple[int, str, str]] = [
+    (1, 'initial schema', '''
+        CREATE TABLE IF NOT EXISTS agents (
+            id TEXT PRIMARY KEY,
+            role TEXT,
+            backstory TEXT,
+            goal TEXT,
+            allow_delegation BOOLEAN DEFAULT FALSE,
+            is_verbose BOOLEAN DEFAULT TRUE,
+            cache BOOLEAN DEFAULT TRUE,
+            llm_provider_model TEXT,
+            temperature NUMERIC DEFAULT 0.1,
+            max_iter INTEGER DEFAULT 25,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS idx_agents_role ON agents(role);
+
+        CREATE TABLE IF NOT EXISTS crews (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            metadata JSONB,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS tasks (
+            id TEXT PRIMARY KEY,
+            description TEXT,
+            expected_output TEXT,
+            agent_id TEXT REFERENCES agents(id) ON DELETE SET NULL,
+            async_execution BOOLEAN DEFAULT FALSE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS crew_agents (
+            crew_id TEXT REFERENCES crews(id) ON DELETE CASCADE,
+            agent_id TEXT REFERENCES agents(id) ON DELETE CASCADE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (crew_id, agent_id)
+        );
+
+        CREATE TABLE IF NOT EXISTS crew_run (
+            id SERIAL PRIMARY KEY,
+            crew_id TEXT REFERENCES crews(id) ON DELETE CASCADE,
+            agent_id TEXT REFERENCES agents(id) ON DELETE CASCADE,
+            status TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS agent_activity_log (
+            id SERIAL PRIMARY KEY,
+            agent_id TEXT REFERENCES agents(id) ON DELETE CASCADE,
+            activity_type TEXT NOT NULL,
+            details TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS crew_tasks (
+            crew_id TEXT REFERENCES crews(id) ON DELETE CASCADE,
+            task_id TEXT REFERENCES tasks(id) ON DELETE CASCADE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (crew_id, task_id)
+        );
+
+        CREATE TABLE IF NOT EXISTS agent_tools (
+            agent_id TEXT REFERENCES agents(id) ON DELETE CASCADE,
+            tool_id TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (agent_id, tool_id)
+        );
+
+        CREATE TABLE IF NOT EXISTS enabled_tools (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            enabled BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS entities (
+            id TEXT PRIMARY KEY,
+            type TEXT NOT NULL,
+            data JSONB,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS tools (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            description TEXT,
+            metadata JSONB
+        );
+
+        CREATE TABLE IF NOT EXISTS tool_states (
+            id SERIAL PRIMARY KEY,
+            tool_id INTEGER REFERENCES tools(id) ON DELETE CASCADE,
+            state JSONB,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS tool_usage_log (
+            id SERIAL PRIMARY KEY,
+            tool_id INTEGER REFERENCES tools(id) ON DELETE CASCADE,
+            usage_data JSONB,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    '''),
+    (2, 'ordered crew memberships', '''
+        ALTER TABLE crew_agents ADD COLUMN IF NOT EXISTS position INTEGER NOT NULL DEFAULT 0;
+        ALTER TABLE crew_tasks ADD COLUMN IF NOT EXISTS position INTEGER NOT NULL DEFAULT 0;
+    '''),
+    (3, 'daily range partitions for run and log tables', '''
+        CREATE OR REPLACE FUNCTION create_daily_partitions(parent TEXT, from_day DATE, to_day DATE)
+        RETURNS INTEGER AS $$
+        DECLARE
+            day DATE := from_day;
+            partition_name TEXT;
+            created INTEGER := 0;
+        BEGIN
+            WHILE day <= to_day LOOP
+                partition_name := parent || '_p' || to_char(day, 'YYYYMMDD');
+                IF to_regclass(partition_name) IS NULL THEN
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                        partition_name, parent, day, day + 1
+                    );
+                    created := created + 1;
+                END IF;
+                day := day + 1;
+            END LOOP;
+            RETURN created;
+        END
+        $$ LANGUAGE plpgsql;
+
+        -- One partition for everything before before_day (the rows of the
+        -- table being converted), and a DEFAULT partition so an insert outside
+        -- the daily partitions never fails
+        CREATE OR REPLACE FUNCTION create_catch_all_partitions(parent TEXT, before_day DATE)
+        RETURNS VOID AS $$
+        BEGIN
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (MINVALUE) TO (%L)',
+                parent || '_before_' || to_char(before_day, 'YYYYMMDD'), parent, before_day
+            );
+            EXECUTE format('CREATE TABLE IF NOT EXISTS %I PARTITION OF %I DEFAULT', parent || '_default', parent);
+        END
+        $$ LANGUAGE plpgsql;
+
+        DO $$
+        BEGIN
+            IF (SELECT relkind FROM pg_class WHERE oid = 'agent_activity_log'::regclass) = 'r' THEN
+                ALTER TABLE agent_activity_log RENAME TO agent_activity_log_legacy;
+                ALTER SEQUENCE agent_activity_log_id_seq RENAME TO agent_activity_log_legacy_id_seq;
+                ALTER INDEX agent_activity_log_pkey RENAME TO agent_activity_log_legacy_pkey;
+                CREATE TABLE agent_activity_log (
+                    id BIGSERIAL,
+                    agent_id TEXT REFERENCES agents(id) ON DELETE CASCADE,
+                    activity_type TEXT NOT NULL,
+                    details TEXT,
+                    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (id, created_at)
+                ) PARTITION BY RANGE (created_at);
+                PERFORM create_daily_partitions('agent_activity_log', CURRENT_DATE - 1, CURRENT_DATE + 7);
+                PERFORM create_catch_all_partitions('agent_activity_log', CURRENT_DATE - 1);
+                INSERT INTO agent_activity_log (id, agent_id, activity_type, details, created_at)
+                SELECT id, agent_id, activity_type, details, COALESCE(created_at, CURRENT_TIMESTAMP)
+                FROM agent_activity_log_legacy;
+                PERFORM setval('agent_activity_log_id_seq', COALESCE((SELECT MAX(id) FROM agent_activity_log), 0) + 1, false);
+                DROP TABLE agent_activity_log_legacy;
+            END IF;
+
+            IF (SELECT relkind FROM pg_class WHERE oid = 'crew_run'::regclass) = 'r' THEN
+                ALTER TABLE crew_run RENAME TO crew_run_legacy;
+                ALTER SEQUENCE crew_run_id_seq RENAME TO crew_run_legacy_id_seq;
+                ALTER INDEX crew_run_pkey RENAME TO crew_run_legacy_pkey;
+                CREATE TABLE crew_run (
+                    id BIGSERIAL,
+                    crew_id TEXT REFERENCES crews(id) ON DELETE CASCADE,
+                    agent_id TEXT REFERENCES agents(id) ON DELETE CASCADE,
+                    status TEXT,
+                    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (id, created_at)
+                ) PARTITION BY RANGE (created_at);
+                PERFORM create_daily_partitions('crew_run', CURRENT_DATE - 1, CURRENT_DATE + 7);
+                PERFORM create_catch_all_partitions('crew_run', CURRENT_DATE - 1);
+                INSERT INTO crew_run (id, crew_id, agent_id, status, created_at)
+                SELECT id, crew_id, agent_id, status, COALESCE(created_at, CURRENT_TIMESTAMP)
+                FROM crew_run_legacy;
+                PERFORM setval('crew_run_id_seq', COALESCE((SELECT MAX(id) FROM crew_run), 0) + 1, false);
+                DROP TABLE crew_run_legacy;
+            END IF;
+
+            IF (SELECT relkind FROM pg_class WHERE oid = 'tool_usage_log'::regclass) = 'r' THEN
+                ALTER TABLE tool_usage_log RENAME TO tool_usage_log_legacy;
+                ALTER SEQUENCE tool_usage_log_id_seq RENAME TO tool_usage_log_legacy_id_seq;
+                ALTER INDEX tool_usage_log_pkey RENAME TO tool_usage_log_legacy_pkey;
+                CREATE TABLE tool_usage_log (
+                    id BIGSERIAL,
+                    tool_id INTEGER REFERENCES tools(id) ON DELETE CASCADE,
+                    usage_data JSONB,
+                    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (id, created_at)
+                ) PARTITION BY RANGE (created_at);
+                PERFORM create_daily_partitions('tool_usage_log', CURRENT_DATE - 1, CURRENT_DATE + 7);
+                PERFORM create_catch_all_partitions('tool_usage_log', CURRENT_DATE - 1);
+                INSERT INTO tool_usage_log (id, tool_id, usage_data, created_at)
+                SELECT id, tool_id, usage_data, COALESCE(created_at, CURRENT_TIMESTAMP)
+                FROM tool_usage_log_legacy;
+                PERFORM setval('tool_usage_log_id_seq', COALESCE((SELECT MAX(id) FROM tool_usage_log), 0) + 1, false);
+                DROP TABLE tool_usage_log_legacy;
+            END IF;
+        END
+        $$;
+    '''),
+    (4, 'indexes for loader access paths', '''
+        CREATE INDEX IF NOT EXISTS idx_agents_created_at ON agents (created_at DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks (created_at DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS idx_tasks_agent_id ON tasks (agent_id);
+        CREATE INDEX IF NOT EXISTS idx_crews_created_at ON crews (created_at DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS idx_crew_agents_agent_id ON crew_agents (agent_id);
+        CREATE INDEX IF NOT EXISTS idx_crew_tasks_task_id ON crew_tasks (task_id);
+        CREATE INDEX IF NOT EXISTS idx_crew_run_created_at ON crew_run (created_at DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS idx_crew_run_crew_id ON crew_run (crew_id, created_at DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS idx_agent_activity_log_agent_id ON agent_activity_log (agent_id, created_at DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS idx_agent_activity_log_created_at ON agent_activity_log (created_at, id);
+        CREATE INDEX IF NOT EXISTS idx_tool_usage_log_tool_id ON tool_usage_log (tool_id, created_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_tool_usage_log_created_at ON tool_usage_log (created_at, id);
+    '''),
+    (5, 'library change version sequence', '''
+        CREATE SEQUENCE IF NOT EXISTS library_version_seq;
+    '''),
+    (6, 'crew run inputs and results', '''
+        ALTER TABLE crew_run
+            ADD COLUMN IF NOT EXISTS inputs JSONB,
+            ADD COLUMN IF NOT EXISTS output TEXT,
+            ADD COLUMN IF NOT EXISTS error TEXT,
+            ADD COLUMN IF NOT EXISTS finished_at TIMESTAMP;
+    '''),
+    (7, 'batch kickoffs', '''
+        CREATE TABLE IF NOT EXISTS crew_batch (
+            id TEXT PRIMARY KEY,
+            crew_id TEXT REFERENCES crews(id) ON DELETE CASCADE,
+            name TEXT,
+            status TEXT NOT NULL,
+            total INTEGER NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            finished_at TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS idx_crew_batch_created ON crew_batch(created_at DESC);
+
+        -- run_id points into the partitioned crew_run, which has no unique id to reference
+        CREATE TABLE IF NOT EXISTS crew_batch_row (
+            batch_id TEXT REFERENCES crew_batch(id) ON DELETE CASCADE,
+            row_index INTEGER NOT NULL,
+            inputs JSONB NOT NULL,
+            status TEXT NOT NULL,
+            run_id BIGINT,
+            output TEXT,
+            error TEXT,
+            finished_at TIMESTAMP,
+            PRIMARY KEY (batch_id, row_index)
+        );
+    '''),
+    (8, 'task context dependencies', '''
+        ALTER TABLE tasks
+            ADD COLUMN IF NOT EXISTS context_from_async_tasks_ids TEXT[] NOT NULL DEFAULT '{}',
+            ADD COLUMN IF NOT EXISTS context_from_sync_tasks_ids TEXT[] NOT NULL DEFAULT '{}';
+    '''),
+    (9, 'batch ownership', '''
+        -- The process running a batch and when it last said so, see batch_runner
+        ALTER TABLE crew_batch
+            ADD COLUMN IF NOT EXISTS owner TEXT,
+            ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMP;
+    '''),
+    (10, 'default partitions for run and log tables', '''
+        CREATE TABLE IF NOT EXISTS agent_activity_log_default PARTITION OF agent_activity_log DEFAULT;
+        CREATE TABLE IF NOT EXISTS crew_run_default PARTITION OF crew_run DEFAULT;
+        CREATE TABLE IF NOT EXISTS tool_usage_log_default PARTITION OF tool_usage_log DEFAULT;
+
+        -- A daily partition cannot be created while the DEFAULT partition holds
+        -- rows of its day, so those rows move into the new partition
+        CREATE OR REPLACE FUNCTION create_daily_partitions(parent TEXT, from_day DATE, to_day DATE)
+        RETURNS INTEGER AS $$
+        DECLARE
+            day DATE := from_day;
+            partition_name TEXT;
+            default_name TEXT := parent || '_default';
+            stray BOOLEAN;
+            created INTEGER := 0;
+        BEGIN
+            WHILE day <= to_day LOOP
+                partition_name := parent || '_p' || to_char(day, 'YYYYMMDD');
+                IF to_regclass(partition_name) IS NULL THEN
+                    stray := FALSE;
+                    IF to_regclass(default_name) IS NOT NULL THEN
+                        EXECUTE format(
+                            'SELECT EXISTS (SELECT 1 FROM %I WHERE created_at >= %L AND created_at < %L)',
+                            default_name, day, day + 1
+                        ) INTO stray;
+                    END IF;
+                    IF stray THEN
+                        EXECUTE format('CREATE TEMP TABLE stray_rows (LIKE %I) ON COMMIT DROP', parent);
+                        EXECUTE format(
+                            'WITH moved AS (DELETE FROM %I WHERE created_at >= %L AND created_at < %L RETURNING *) '
+                            'INSERT INTO stray_rows SELECT * FROM moved',
+                            default_name, day, day + 1
+                        );
+                    END IF;
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                        partition_name, parent, day, day + 1
+                    );
+                    IF stray THEN
+                        EXECUTE format('INSERT INTO %I SELECT * FROM stray_rows', parent);
+                        DROP TABLE stray_rows;
+                    END IF;
+                    created := created + 1;
+                END IF;
+                day := day + 1;
+            END LOOP;
+            RETURN created;
+        END
+        $$ LANGUAGE plpgsql;
+    '''),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def _ensure_version_table(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+def get_schema_version(conn) -> int:
+    """Return the applied schema version, or 0 for an unversioned database"""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT to_regclass('schema_version') IS NOT NULL AS present")
+        if not cursor.fetchone()['present']:
+            conn.rollback()
+            return 0
+        cursor.execute('SELECT COALESCE(MAX(version), 0) AS version FROM schema_version')
+        version = cursor.fetchone()['version']
+    conn.rollback()
+    return version
+
+def migrate(conn) -> int:
+    """
+    Bring the database schema up to LATEST_VERSION.
+
+    The common case (schema already current) costs a single version query.
+    Otherwise pending steps are applied in order, each in its own transaction,
+    while holding an advisory lock so only one process migrates at a time.
+
+    Args:
+        conn: An open database connection using RealDictCursor.
+
+    Returns:
+        int: The schema version after migrating.
+    """
+    if get_schema_version(conn) >= LATEST_VERSION:
+        return LATEST_VERSION
+
+    with conn.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_lock(%s)', (MIGRATION_LOCK_KEY,))
+    conn.commit()
+    try:
+        with conn.cursor() as cursor:
+            _ensure_version_table(cursor)
+        conn.commit()
+
+        # Another process may have migrated while we waited for the lock
+        version = get_schema_version(conn)
+        for step_version, description, sql in MIGRATIONS:
+            if step_version <= version:
+                continue
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(sql)
+                    cursor.execute(
+                        'INSERT INTO schema_version (version, description) VALUES (%s, %s)',
+                        (step_version, description)
+                    )
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logging.error(f"Migration {step_version} ({description}) failed: {e}")
+                raise
+            logging.info(f"Applied migration {step_version}: {description}")
+            version = step_version
+        return version
+    finally:
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_unlock(%s)', (MIGRATION_LOCK_KEY,))
+        conn.commit()
@@ -1,14 +1,21 @@
 # db_operations.py
 
 import psycopg2
-from psycopg2.extras import RealDictCursor
-from psycopg2.pool import SimpleConnectionPool
+from psycopg2 import sql
+from psycopg2.extras import RealDictCursor, execute_values
 from contextlib import contextmanager
 import logging
+import threading
 import os
 import json
-from datetime import datetime
+import uuid
+from datetime import datetime, date, timedelta
+from typing import List
 from urllib.parse import urlparse
+import db_migrations
+from db_pool import InstrumentedConnectionPool
+from log_sink import BufferedLogWriter
+from db_listener import ChangeListener
 
 # Database configuration with proper fallbacks
 DEFAULT_DB_HOST = "localhost"
@@ -20,174 +27,91 @@ DEFAULT_DB_PASS = "pass"
 DATABASE_URL = os.getenv('DATABASE_URL', 
     f"postgresql://{DEFAULT_DB_USER}:{DEFAULT_DB_PASS}@{DEFAULT_DB_HOST}:{DEFAULT_DB_PORT}/{DEFAULT_DB_NAME}")
 
-pool = SimpleConnectionPool(
-    minconn=1,
-    maxconn=10,
-    dsn=DATABASE_URL
-)
+# Connection pool sizing, overridable from the environment
+DB_POOL_MIN = int(os.getenv('DB_POOL_MIN', '1'))
+DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', '10'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+DB_POOL_MAX_IDLE = float(os.getenv('DB_POOL_MAX_IDLE', '300'))
+DB_POOL_MAX_LIFETIME = float(os.getenv('DB_POOL_MAX_LIFETIME', '3600'))
 
-def initialize_db():
-    """Initialize the database with required tables"""
-    with get_db_connection() as conn:
-        with conn.cursor() as cursor:
-            # Drop all tables with CASCADE to handle dependencies
-            cursor.execute('''
-                DROP TABLE IF EXISTS agent_activity_log CASCADE;
-                DROP TABLE IF EXISTS agent_tools CASCADE;
-                DROP TABLE IF EXISTS crew_agents CASCADE;
-                DROP TABLE IF EXISTS crew_run CASCADE;
-                DROP TABLE IF EXISTS crew_tasks CASCADE;
-                DROP TABLE IF EXISTS enabled_tools CASCADE;
-                DROP TABLE IF EXISTS entities CASCADE;
-                DROP TABLE IF EXISTS crews CASCADE;
-                DROP TABLE IF EXISTS agents CASCADE;
-                DROP TABLE IF EXISTS tasks CASCADE;
-                DROP TABLE IF EXISTS tools CASCADE;
-                DROP TABLE IF EXISTS tool_states CASCADE;
-                DROP TABLE IF EXISTS tool_usage_log CASCADE;
-            ''')
+# Rows fetched per round trip by the streaming readers
+DB_STREAM_ITERSIZE = int(os.getenv('DB_STREAM_ITERSIZE', '2000'))
 
-            # Create agents table
-            cursor.execute('''
-                CREATE TABLE agents (
-                    id TEXT PRIMARY KEY,
-                    role TEXT,
-                    backstory TEXT,
-                    goal TEXT,
-                    allow_delegation BOOLEAN DEFAULT FALSE,
-                    is_verbose BOOLEAN DEFAULT TRUE,
-                    cache BOOLEAN DEFAULT TRUE,
-                    llm_provider_model TEXT,
-                    temperature NUMERIC DEFAULT 0.1,
-                    max_iter INTEGER DEFAULT 25,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-                CREATE INDEX idx_agents_role ON agents(role);
-            ''')
+# Buffered log writer settings, overridable from the environment
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+LOG_BATCH_SIZE = int(os.getenv('LOG_BATCH_SIZE', '500'))
+LOG_FLUSH_INTERVAL = float(os.getenv('LOG_FLUSH_INTERVAL', '1.0'))
+LOG_BLOCK_TIMEOUT = float(os.getenv('LOG_BLOCK_TIMEOUT', '0'))
 
-            # Create crews table
-            cursor.execute('''
-                CREATE TABLE crews (
-                    id TEXT PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    metadata JSONB,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
+# Range-partitioned (by day on created_at) tables, see migration 3
+LOG_TABLES = ('agent_activity_log', 'tool_usage_log')
+PARTITIONED_TABLES = ('crew_run',) + LOG_TABLES
+LOG_PARTITION_DAYS_AHEAD = int(os.getenv('LOG_PARTITION_DAYS_AHEAD', '7'))
+PARTITION_LOCK_KEY = 72_616_202
 
-            # Create tasks table
-            cursor.execute('''
-                CREATE TABLE tasks (
-                    id TEXT PRIMARY KEY,
-                    description TEXT,
-                    expected_output TEXT,
-                    agent_id TEXT REFERENCES agents(id) ON DELETE SET NULL,
-                    async_execution BOOLEAN DEFAULT FALSE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
+# Library change notifications, see _notify_changes and start_change_listener
+LIBRARY_CHANNEL = 'library_changes'
+LIBRARY_LISTENER_ENABLED = os.getenv('DB_CHANGE_LISTENER', 'true').lower() not in ('0', 'false', 'no')
+NOTIFY_IDS_PER_MESSAGE = 100  # keeps payloads well under Postgres' 8000 byte limit
+PROCESS_ORIGIN = uuid.uuid4().hex
 
-            # Create crew_agents table
-            cursor.execute('''
-                CREATE TABLE crew_agents (
-                    crew_id TEXT REFERENCES crews(id) ON DELETE CASCADE,
-                    agent_id TEXT REFERENCES agents(id) ON DELETE CASCADE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    PRIMARY KEY (crew_id, agent_id)
-                )
-            ''')
+_change_listener = None
+_change_listener_lock = threading.Lock()
 
-            # Create crew_run table
-            cursor.execute('''
-                CREATE TABLE crew_run (
-                    id SERIAL PRIMARY KEY,
-                    crew_id TEXT REFERENCES crews(id) ON DELETE CASCADE,
-                    agent_id TEXT REFERENCES agents(id) ON DELETE CASCADE,
-                    status TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
+_partitions_ready_through = None
+_partitions_lock = threading.Lock()
 
-            # Create agent_activity_log table
-            cursor.execute('''
-                CREATE TABLE agent_activity_log (
-                    id SERIAL PRIMARY KEY,
-                    agent_id TEXT REFERENCES agents(id) ON DELETE CASCADE,
-                    activity_type TEXT NOT NULL,
-                    details TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
+_log_writers = {}
+_log_writers_lock = threading.Lock()
 
-            # Create remaining tables
-            cursor.execute('''
-                CREATE TABLE crew_tasks (
-                    crew_id TEXT REFERENCES crews(id) ON DELETE CASCADE,
-                    task_id TEXT REFERENCES tasks(id) ON DELETE CASCADE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    PRIMARY KEY (crew_id, task_id)
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE agent_tools (
-                    agent_id TEXT REFERENCES agents(id) ON DELETE CASCADE,
-                    tool_id TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    PRIMARY KEY (agent_id, tool_id)
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE enabled_tools (
-                    id TEXT PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    enabled BOOLEAN DEFAULT TRUE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
+_pool = None
+_pool_lock = threading.Lock()
 
-            cursor.execute('''
-                CREATE TABLE entities (
-                    id TEXT PRIMARY KEY,
-                    type TEXT NOT NULL,
-                    data JSONB,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE tools (
-                    id SERIAL PRIMARY KEY,
-                    name VARCHAR(255) NOT NULL,
-                    description TEXT,
-                    metadata JSONB
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE tool_states (
-                    id SERIAL PRIMARY KEY,
-                    tool_id INTEGER REFERENCES tools(id) ON DELETE CASCADE,
-                    state JSONB,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
+_schema_ready = False
+_schema_lock = threading.Lock()
 
-            cursor.execute('''
-                CREATE TABLE tool_usage_log (
-                    id SERIAL PRIMARY KEY,
-                    tool_id INTEGER REFERENCES tools(id) ON DELETE CASCADE,
-                    usage_data JSONB,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+def initialize_db():
+    """
+    Bring the database schema up to date.
+
+    Migrations run at most once per process; later calls (e.g. on every
+    Streamlit rerun) return immediately without touching the database.
+    """
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if _schema_ready:
+            return
+        with get_db_connection() as conn:
+            db_migrations.migrate(conn)
+        ensure_log_partitions()
+        _schema_ready = True
+
+def get_pool() -> InstrumentedConnectionPool:
+    """Return the process-wide connection pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = InstrumentedConnectionPool(
+                    dsn=DATABASE_URL,
+                    minconn=DB_POOL_MIN,
+                    maxconn=DB_POOL_MAX,
+                    timeout=DB_POOL_TIMEOUT,
+                    max_idle=DB_POOL_MAX_IDLE,
+                    max_lifetime=DB_POOL_MAX_LIFETIME
                 )
-            ''')
+    return _pool
 
-            conn.commit()
+def get_pool_metrics():
+    """Return connection pool metrics, or None if the pool was never used"""
+    return _pool.metrics() if _pool is not None else None
 
 @contextmanager
 def get_db_connection():
     """Context manager for database connections with pooling"""
+    pool = get_pool()
     conn = None
     try:
         conn = pool.getconn()
@@ -200,6 +124,86 @@ def get_db_connection():
         if conn:
             pool.putconn(conn)
 
+# Loader queries shared with db_plan_check, which asserts they stay index-backed
+_CREW_GRAPH_SQL = '''
+    SELECT c.id, c.name, c.metadata, c.created_at,
+        COALESCE((
+            SELECT json_agg(row_to_json(a) ORDER BY ca.position)
+            FROM crew_agents ca
+            JOIN agents a ON a.id = ca.agent_id
+            WHERE ca.crew_id = c.id
+        ), '[]'::json) AS agents,
+        COALESCE((
+            SELECT json_agg(json_build_object(
+                'id', t.id,
+                'description', t.description,
+                'expected_output', t.expected_output,
+                'async_execution', t.async_execution,
+                'context_from_async_tasks_ids', t.context_from_async_tasks_ids,
+                'context_from_sync_tasks_ids', t.context_from_sync_tasks_ids,
+                'created_at', t.created_at,
+                'agent', row_to_json(ta)
+            ) ORDER BY ct.position)
+            FROM crew_tasks ct
+            JOIN tasks t ON t.id = ct.task_id
+            LEFT JOIN agents ta ON ta.id = t.agent_id
+            WHERE ct.crew_id = c.id
+        ), '[]'::json) AS tasks
+    FROM crews c
+'''
+
+LOAD_CREWS_SQL = _CREW_GRAPH_SQL + '''
+    WHERE %(after_created_at)s::timestamp IS NULL
+        OR (c.created_at, c.id) < (%(after_created_at)s, %(after_id)s)
+    ORDER BY c.created_at DESC, c.id DESC
+    LIMIT %(limit)s
+'''
+
+LOAD_CREW_SQL = _CREW_GRAPH_SQL + '''
+    WHERE c.id = %(crew_id)s
+'''
+
+LOAD_CREW_RUN_SQL = '''
+    SELECT * FROM crew_run
+    WHERE (%(crew_id)s::text IS NULL OR crew_id = %(crew_id)s)
+        AND (%(after_created_at)s::timestamp IS NULL
+            OR (created_at, id) < (%(after_created_at)s, %(after_id)s))
+    ORDER BY created_at DESC, id DESC
+    LIMIT %(limit)s
+'''
+
+LOAD_AGENT_ACTIVITY_SQL = '''
+    SELECT * FROM agent_activity_log
+    WHERE agent_id = %(agent_id)s
+        AND (%(after_created_at)s::timestamp IS NULL
+            OR (created_at, id) < (%(after_created_at)s, %(after_id)s))
+    ORDER BY created_at DESC, id DESC
+    LIMIT %(limit)s
+'''
+
+def _keyset_params(limit: int, after=None, **filters):
+    """Query parameters for `(created_at, id) < after` keyset pagination"""
+    after_created_at, after_id = after if after else (None, None)
+    return {'limit': limit, 'after_created_at': after_created_at, 'after_id': after_id, **filters}
+
+def _iter_rows(query: str, params=None, itersize: int = None):
+    """
+    Stream query results through a server-side (named) cursor.
+
+    Rows are fetched from the server `itersize` at a time, so memory stays
+    constant however large the result is. The pooled connection is held until
+    the generator is exhausted or closed.
+    """
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor(name=f'stream_{uuid.uuid4().hex}') as cursor:
+                cursor.itersize = itersize or DB_STREAM_ITERSIZE
+                cursor.execute(query, params)
+                for row in cursor:
+                    yield row
+        finally:
+            conn.rollback()
+
 def load_agents_data():
     """Load all agents data from the database"""
     with get_db_connection() as conn:
@@ -210,93 +214,179 @@ def load_agents_data():
             return cursor.fetchall()
 
 def load_tasks_data():
-    """Load all tasks data from the database"""
+    """
+    Load all tasks data from the database.
+
+    Columns of the assigned agent are aliased with an `agent_` prefix so they
+    cannot collide with the task's own `id`, `created_at`, etc.
+    """
     with get_db_connection() as conn:
         with conn.cursor() as cursor:
             cursor.execute('''
-                SELECT t.*, a.* FROM tasks t
+                SELECT t.id, t.description, t.expected_output, t.agent_id,
+                    t.async_execution, t.created_at,
+                    t.context_from_async_tasks_ids, t.context_from_sync_tasks_ids,
+                    a.role AS agent_role,
+                    a.backstory AS agent_backstory,
+                    a.goal AS agent_goal,
+                    a.allow_delegation AS agent_allow_delegation,
+                    a.is_verbose AS agent_is_verbose,
+                    a.cache AS agent_cache,
+                    a.llm_provider_model AS agent_llm_provider_model,
+                    a.temperature AS agent_temperature,
+                    a.max_iter AS agent_max_iter,
+                    a.created_at AS agent_created_at
+                FROM tasks t
                 LEFT JOIN agents a ON t.agent_id = a.id
                 ORDER BY t.created_at DESC
             ''')
             return cursor.fetchall()
 
-def load_crews_data(limit: int = 100, offset: int = 0):
-    """Load crews data from the database with pagination"""
+def load_crew_data(crew_id: str):
+    """Load one crew with its ordered agents and tasks, or None if it does not exist"""
     with get_db_connection() as conn:
         with conn.cursor() as cursor:
-            cursor.execute('''
-                SELECT c.*, array_agg(ca.agent_id) as agent_ids
-                FROM crews c
-                LEFT JOIN crew_agents ca ON c.id = ca.crew_id
-                GROUP BY c.id
-                ORDER BY c.created_at DESC
-                LIMIT %s OFFSET %s
-            ''', (limit, offset))
+            cursor.execute(LOAD_CREW_SQL, {'crew_id': crew_id})
+            return cursor.fetchone()
+
+def load_crews_data(limit: int = 100, after=None):
+    """
+    Load crews with their full agent and task graph in a single query.
+
+    Each row carries `agents` (ordered crew members) and `tasks` (ordered, each
+    with its assigned `agent` embedded) as JSON arrays.
+
+    Pages are keyset-based: pass the (created_at, id) of the last crew of the
+    previous page as `after` to fetch the next one.
+    """
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(LOAD_CREWS_SQL, _keyset_params(limit, after))
             return cursor.fetchall()
 
+AGENT_COLUMNS = (
+    'id', 'role', 'backstory', 'goal', 'allow_delegation',
+    'is_verbose', 'cache', 'llm_provider_model', 'temperature', 'max_iter'
+)
+TASK_COLUMNS = (
+    'id', 'description', 'expected_output', 'agent_id', 'async_execution',
+    'context_from_async_tasks_ids', 'context_from_sync_tasks_ids'
+)
+
+def _dedupe_by_id(rows):
+    """Keep the last row per id; ON CONFLICT cannot touch the same row twice in one statement"""
+    return list({row['id']: row for row in rows}.values())
+
+def _upsert(cursor, table: str, columns, rows, json_columns=()):
+    """
+    Insert or update rows in a single statement.
+
+    Args:
+        cursor: Open database cursor.
+        table (str): Target table, keyed by an `id` primary key.
+        columns (tuple): Column names to write; the first must be `id`.
+        rows (list): Dicts holding a value for every column.
+        json_columns (tuple): Columns whose values are serialized to JSON.
+
+    Returns:
+        list: The ids of the written rows.
+    """
+    if not rows:
+        return []
+    values = [
+        tuple(json.dumps(row[col]) if col in json_columns else row[col] for col in columns)
+        for row in _dedupe_by_id(rows)
+    ]
+    updates = ', '.join(f'{col} = EXCLUDED.{col}' for col in columns if col != 'id')
+    result = execute_values(
+        cursor,
+        f'''
+            INSERT INTO {table} ({', '.join(columns)}) VALUES %s
+            ON CONFLICT (id) DO UPDATE SET {updates}
+            RETURNING id
+        ''',
+        values,
+        page_size=max(len(values), 1),
+        fetch=True
+    )
+    return [row['id'] for row in result]
+
+def _notify_changes(cursor, entity: str, op: str, ids):
+    """
+    Queue library change notifications on LIBRARY_CHANNEL.
+
+    Postgres delivers them when (and only if) the surrounding transaction
+    commits. Each payload is JSON holding the entity type ('agent', 'task' or
+    'crew'), the operation, the affected ids, a version from
+    library_version_seq and this process's origin token.
+    """
+    ids = list(ids)
+    for start in range(0, len(ids), NOTIFY_IDS_PER_MESSAGE):
+        cursor.execute(
+            '''
+                SELECT pg_notify(%s, json_build_object(
+                    'entity', %s, 'op', %s, 'ids', %s::text[],
+                    'version', nextval('library_version_seq'), 'origin', %s
+                )::text)
+            ''',
+            (LIBRARY_CHANNEL, entity, op, ids[start:start + NOTIFY_IDS_PER_MESSAGE], PROCESS_ORIGIN)
+        )
+
+def start_change_listener(on_change):
+    """
+    Start the process-wide listener for library change notifications.
+
+    `on_change(change)` is called from the listener thread for every change
+    committed by another process, and with None after (re)connecting, when
+    notifications may have been missed. Later calls return the running listener.
+    Returns None when disabled with DB_CHANGE_LISTENER=false.
+    """
+    global _change_listener
+    if not LIBRARY_LISTENER_ENABLED:
+        return None
+    with _change_listener_lock:
+        if _change_listener is None:
+            _change_listener = ChangeListener(DATABASE_URL, LIBRARY_CHANNEL, on_change, ignore_origin=PROCESS_ORIGIN)
+        return _change_listener
+
+def get_change_listener_stats():
+    """Return change listener counters, or None if the listener was never started"""
+    return _change_listener.stats() if _change_listener is not None else None
+
+def _replace_memberships(cursor, table: str, member_column: str, members_by_crew):
+    """Replace the ordered membership rows of the given crews in crew_agents or crew_tasks"""
+    if not members_by_crew:
+        return
+    cursor.execute(f'DELETE FROM {table} WHERE crew_id = ANY(%s)', (list(members_by_crew),))
+    values = [
+        (crew_id, member_id, position)
+        for crew_id, member_ids in members_by_crew.items()
+        for position, member_id in enumerate(dict.fromkeys(member_ids))
+    ]
+    if values:
+        execute_values(
+            cursor,
+            f'INSERT INTO {table} (crew_id, {member_column}, position) VALUES %s',
+            values,
+            page_size=len(values)
+        )
+
 def save_agent_data(agent_data):
     """Save or update agent data in the database"""
+    return save_agents_data([agent_data])[0]
+
+def save_agents_data(agents_data):
+    """Save or update several agents in one statement and transaction"""
     with get_db_connection() as conn:
         try:
             with conn.cursor() as cursor:
-                # Check if agent exists
-                cursor.execute('SELECT id FROM agents WHERE id = %s', (agent_data['id'],))
-                exists = cursor.fetchone()
-
-                if exists:
-                    # Update existing agent
-                    cursor.execute('''
-                        UPDATE agents 
-                        SET role = %s,
-                            backstory = %s,
-                            goal = %s,
-                            allow_delegation = %s,
-                            is_verbose = %s,
-                            cache = %s,
-                            llm_provider_model = %s,
-                            temperature = %s,
-                            max_iter = %s
-                        WHERE id = %s
-                        RETURNING id
-                    ''', (
-                        agent_data['role'],
-                        agent_data['backstory'],
-                        agent_data['goal'],
-                        agent_data['allow_delegation'],
-                        agent_data['is_verbose'],
-                        agent_data['cache'],
-                        agent_data['llm_provider_model'],
-                        agent_data['temperature'],
-                        agent_data['max_iter'],
-                        agent_data['id']
-                    ))
-                else:
-                    # Insert new agent
-                    cursor.execute('''
-                        INSERT INTO agents (
-                            id, role, backstory, goal, allow_delegation,
-                            is_verbose, cache, llm_provider_model, temperature, max_iter
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        RETURNING id
-                    ''', (
-                        agent_data['id'],
-                        agent_data['role'],
-                        agent_data['backstory'],
-                        agent_data['goal'],
-                        agent_data['allow_delegation'],
-                        agent_data['is_verbose'],
-                        agent_data['cache'],
-                        agent_data['llm_provider_model'],
-                        agent_data['temperature'],
-                        agent_data['max_iter']
-                    ))
-
-                conn.commit()
-                return cursor.fetchone()['id']
-
+                ids = _upsert(cursor, 'agents', AGENT_COLUMNS, agents_data)
+                _notify_changes(cursor, 'agent', 'save', ids)
+            conn.commit()
+            return ids
         except Exception as e:
             conn.rollback()
-            logging.error(f"Failed to save agent: {str(e)}")
+            logging.error(f"Failed to save agents: {str(e)}")
             raise
 
 def delete_agent_data(agent_id: str):
@@ -304,85 +394,57 @@ def delete_agent_data(agent_id: str):
     with get_db_connection() as conn:
         with conn.cursor() as cursor:
             cursor.execute('DELETE FROM agents WHERE id = %s', (agent_id,))
+            _notify_changes(cursor, 'agent', 'delete', [agent_id])
             conn.commit()
 
 def save_crew_data(crew_data):
     """Save or update crew data in the database"""
+    return save_crews_data([crew_data])[0]
+
+def save_crews_data(crews_data):
+    """
+    Save or update several crews and their agent/task memberships in one transaction.
+
+    Each crew dict holds `id`, `name` and `metadata`, plus optional ordered
+    `agents` and `tasks` lists of {'id': ...} dicts that replace the crew's
+    current memberships.
+    """
     with get_db_connection() as conn:
         try:
             with conn.cursor() as cursor:
-                if 'id' in crew_data:
-                    cursor.execute('''
-                        UPDATE crews 
-                        SET name = %s, metadata = %s
-                        WHERE id = %s
-                        RETURNING id
-                    ''', (crew_data['name'], json.dumps(crew_data['metadata']), crew_data['id']))
-                else:
-                    cursor.execute('''
-                        INSERT INTO crews (name, metadata)
-                        VALUES (%s, %s)
-                        RETURNING id
-                    ''', (crew_data['name'], json.dumps(crew_data['metadata'])))
-                
-                crew_id = cursor.fetchone()['id']
-                
-                if 'agents' in crew_data:
-                    cursor.execute('DELETE FROM crew_run WHERE crew_id = %s', (crew_id,))
-                    for agent in crew_data['agents']:
-                        cursor.execute('''
-                            INSERT INTO crew_run (crew_id, agent_id)
-                            VALUES (%s, %s)
-                        ''', (crew_id, agent['id']))
-                
-                conn.commit()
-                return crew_id
+                ids = _upsert(cursor, 'crews', ('id', 'name', 'metadata'), crews_data, json_columns=('metadata',))
+                _replace_memberships(cursor, 'crew_agents', 'agent_id', {
+                    crew['id']: [agent['id'] for agent in crew['agents']]
+                    for crew in crews_data if 'agents' in crew
+                })
+                _replace_memberships(cursor, 'crew_tasks', 'task_id', {
+                    crew['id']: [task['id'] for task in crew['tasks']]
+                    for crew in crews_data if 'tasks' in crew
+                })
+                _notify_changes(cursor, 'crew', 'save', ids)
+            conn.commit()
+            return ids
         except Exception as e:
             conn.rollback()
-            logging.error(f"Failed to save crew: {str(e)}")
+            logging.error(f"Failed to save crews: {str(e)}")
             raise
 
 def save_task_data(task_data):
     """Save or update task data in the database"""
+    return save_tasks_data([task_data])[0]
+
+def save_tasks_data(tasks_data):
+    """Save or update several tasks in one statement and transaction"""
     with get_db_connection() as conn:
         try:
             with conn.cursor() as cursor:
-                if 'id' in task_data:
-                    cursor.execute('''
-                        UPDATE tasks 
-                        SET description = %s,
-                            expected_output = %s,
-                            agent_id = %s,
-                            async_execution = %s
-                        WHERE id = %s
-                        RETURNING id
-                    ''', (
-                        task_data['description'],
-                        task_data['expected_output'],
-                        task_data['agent_id'],
-                        task_data['async_execution'],
-                        task_data['id']
-                    ))
-                else:
-                    cursor.execute('''
-                        INSERT INTO tasks (
-                            id, description, expected_output, agent_id, async_execution
-                        ) VALUES (%s, %s, %s, %s, %s)
-                        RETURNING id
-                    ''', (
-                        task_data['id'],
-                        task_data['description'],
-                        task_data['expected_output'],
-                        task_data['agent_id'],
-                        task_data['async_execution']
-                    ))
-
-                conn.commit()
-                return cursor.fetchone()['id']
-
+                ids = _upsert(cursor, 'tasks', TASK_COLUMNS, tasks_data)
+                _notify_changes(cursor, 'task', 'save', ids)
+            conn.commit()
+            return ids
         except Exception as e:
             conn.rollback()
-            logging.error(f"Failed to save task: {str(e)}")
+            logging.error(f"Failed to save tasks: {str(e)}")
             raise
 
 def delete_task_data(task_id: str):
@@ -390,6 +452,21 @@ def delete_task_data(task_id: str):
     with get_db_connection() as conn:
         with conn.cursor() as cursor:
             cursor.execute('DELETE FROM tasks WHERE id = %s', (task_id,))
+            _notify_changes(cursor, 'task', 'delete', [task_id])
+            # Tasks that took context from it would otherwise fail validation
+            cursor.execute(
+                '''
+                    UPDATE tasks SET
+                        context_from_async_tasks_ids = array_remove(context_from_async_tasks_ids, %(id)s),
+                        context_from_sync_tasks_ids = array_remove(context_from_sync_tasks_ids, %(id)s)
+                    WHERE %(id)s = ANY(context_from_async_tasks_ids) OR %(id)s = ANY(context_from_sync_tasks_ids)
+                    RETURNING id
+                ''',
+                {'id': task_id}
+            )
+            referencing = [row['id'] for row in cursor.fetchall()]
+            if referencing:
+                _notify_changes(cursor, 'task', 'save', referencing)
             conn.commit()
 
 def delete_crew_data(crew_id: str):
@@ -397,35 +474,142 @@ def delete_crew_data(crew_id: str):
     with get_db_connection() as conn:
         with conn.cursor() as cursor:
             cursor.execute('DELETE FROM crews WHERE id = %s', (crew_id,))
+            _notify_changes(cursor, 'crew', 'delete', [crew_id])
             conn.commit()
 
+def ensure_log_partitions():
+    """
+    Make sure daily partitions exist for the partitioned run and log tables
+    from yesterday through LOG_PARTITION_DAYS_AHEAD days ahead.
+
+    The days are the database's, as created_at is filled in by the database;
+    rows outside the daily partitions land in the DEFAULT partition and move
+    to their day's partition once it is created (see migration 10).
+
+    Cheap to call often: the database is only consulted once per day per process.
+    """
+    global _partitions_ready_through
+    today = date.today()
+    if _partitions_ready_through is not None and _partitions_ready_through >= today + timedelta(days=1):
+        return
+    with _partitions_lock:
+        if _partitions_ready_through is not None and _partitions_ready_through >= today + timedelta(days=1):
+            return
+        with get_db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    # Serialize partition creation across processes
+                    cursor.execute('SELECT pg_advisory_xact_lock(%s)', (PARTITION_LOCK_KEY,))
+                    for table in PARTITIONED_TABLES:
+                        cursor.execute(
+                            'SELECT create_daily_partitions(%s, CURRENT_DATE - 1, CURRENT_DATE + %s)',
+                            (table, LOG_PARTITION_DAYS_AHEAD)
+                        )
+                    cursor.execute('SELECT CURRENT_DATE + %s AS through', (LOG_PARTITION_DAYS_AHEAD,))
+                    through = cursor.fetchone()['through']
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logging.error(f"Failed to create log partitions: {str(e)}")
+                raise
+        _partitions_ready_through = through
+
+def _drop_partitions_before(table: str, cutoff: date) -> List[str]:
+    """
+    Drop the partitions of `table` holding only rows older than `cutoff`: the
+    daily ones, and the one migration 3 put older rows in. The few rows of
+    those days in the DEFAULT partition are deleted.
+    """
+    dropped = []
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('''
+                    SELECT child.relname AS name
+                    FROM pg_inherits
+                    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                    WHERE parent.relname = %s
+                ''', (table,))
+                # Partition name prefix -> days from the date in the name to the partition's upper bound
+                bounds = {f'{table}_p': 1, f'{table}_before_': 0}
+                for row in cursor.fetchall():
+                    name = row['name']
+                    for prefix, days in bounds.items():
+                        if not name.startswith(prefix):
+                            continue
+                        try:
+                            day = datetime.strptime(name[len(prefix):], '%Y%m%d').date()
+                        except ValueError:
+                            continue
+                        if day + timedelta(days=days) <= cutoff:
+                            cursor.execute(sql.SQL('DROP TABLE {}').format(sql.Identifier(name)))
+                            dropped.append(name)
+                cursor.execute(
+                    sql.SQL('DELETE FROM {} WHERE created_at < %s').format(sql.Identifier(f'{table}_default')),
+                    (cutoff,)
+                )
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"Failed to drop old partitions of {table}: {str(e)}")
+            raise
+    return dropped
+
 def cleanup_old_logs(days: int = 30):
-    """Delete logs older than specified days"""
+    """
+    Delete logs older than specified days.
+
+    Whole daily partitions are dropped, so no rows are scanned or deleted.
+    Returns the names of the dropped partitions.
+    """
+    cutoff = date.today() - timedelta(days=days)
+    dropped = []
+    for table in LOG_TABLES:
+        dropped.extend(_drop_partitions_before(table, cutoff))
+    return dropped
+
+def cleanup_old_crew_runs(days: int = 90):
+    """Delete crew runs older than specified days by dropping their partitions"""
+    return _drop_partitions_before('crew_run', date.today() - timedelta(days=days))
+
+def load_crew_run_data(limit: int = 100, after=None, crew_id: str = None):
+    """Load one keyset page of crew runs, newest first, optionally for a single crew"""
     with get_db_connection() as conn:
         with conn.cursor() as cursor:
-            cursor.execute('''
-                DELETE FROM agent_activity_log 
-                WHERE created_at < NOW() - INTERVAL '%s days'
-            ''', (days,))
-            conn.commit()
+            cursor.execute(LOAD_CREW_RUN_SQL, _keyset_params(limit, after, crew_id=crew_id))
+            return cursor.fetchall()
 
-def load_crew_run_data():
-    """Load crew run data from the database"""
+def load_agent_activity_data(agent_id: str, limit: int = 100, after=None):
+    """Load one keyset page of an agent's activity log, newest first"""
     with get_db_connection() as conn:
         with conn.cursor() as cursor:
-            cursor.execute('SELECT * FROM crew_run')
+            cursor.execute(LOAD_AGENT_ACTIVITY_SQL, _keyset_params(limit, after, agent_id=agent_id))
             return cursor.fetchall()
 
-def save_crew_run_data(crew_id: str, agent_id: str, status: str = None):
-    """Save crew run data with optional status"""
+def iter_crew_run_data(itersize: int = None):
+    """Stream every crew run, oldest first"""
+    return _iter_rows('SELECT * FROM crew_run ORDER BY created_at, id', itersize=itersize)
+
+def iter_agent_activity_log_data(itersize: int = None):
+    """Stream the whole agent activity log, oldest first"""
+    return _iter_rows('SELECT * FROM agent_activity_log ORDER BY created_at, id', itersize=itersize)
+
+def iter_tool_usage_log_data(itersize: int = None):
+    """Stream the whole tool usage log, oldest first"""
+    return _iter_rows('SELECT * FROM tool_usage_log ORDER BY created_at, id', itersize=itersize)
+
+def save_crew_run_data(crew_id: str, agent_id: str, status: str = None, inputs: dict = None):
+    """Save crew run data with optional status and kickoff inputs"""
+    ensure_log_partitions()
     with get_db_connection() as conn:
         try:
             with conn.cursor() as cursor:
                 cursor.execute('''
-                    INSERT INTO crew_run (crew_id, agent_id, status)
-                    VALUES (%s, %s, %s)
+                    INSERT INTO crew_run (crew_id, agent_id, status, inputs)
+                    VALUES (%s, %s, %s, %s)
                     RETURNING id
-                ''', (crew_id, agent_id, status))
+                ''', (crew_id, agent_id, status, json.dumps(inputs) if inputs is not None else None))
                 conn.commit()
                 return cursor.fetchone()['id']
         except Exception as e:
@@ -433,19 +617,234 @@ def save_crew_run_data(crew_id: str, agent_id: str, status: str = None):
             logging.error(f"Failed to save crew run: {str(e)}")
             raise
 
-def log_agent_activity(agent_id: str, activity_type: str, details: str):
-    """Log agent activity"""
+def update_crew_run_status_data(run_id: int, status: str):
+    """Update the status of a crew run that has not finished yet"""
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('UPDATE crew_run SET status = %s WHERE id = %s', (status, run_id))
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"Failed to update crew run {run_id}: {str(e)}")
+            raise
+
+def finish_crew_run_data(run_id: int, status: str, output: str = None, error: str = None):
+    """Record the final status and output (or error) of a crew run"""
     with get_db_connection() as conn:
         try:
             with conn.cursor() as cursor:
                 cursor.execute('''
-                    INSERT INTO agent_activity_log (agent_id, activity_type, details)
-                    VALUES (%s, %s, %s)
+                    UPDATE crew_run
+                    SET status = %s, output = %s, error = %s, finished_at = CURRENT_TIMESTAMP
+                    WHERE id = %s
+                ''', (status, output, error, run_id))
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"Failed to finish crew run {run_id}: {str(e)}")
+            raise
+
+def save_batch_data(batch_id: str, crew_id: str, name: str, rows: List[dict], status: str, row_status: str,
+                    owner: str = None):
+    """Create a batch, owned by `owner`, with one row of placeholder inputs per element of `rows`"""
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('''
+                    INSERT INTO crew_batch (id, crew_id, name, status, total, owner, heartbeat_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, LOCALTIMESTAMP)
+                ''', (batch_id, crew_id, name, status, len(rows), owner))
+                execute_values(
+                    cursor,
+                    'INSERT INTO crew_batch_row (batch_id, row_index, inputs, status) VALUES %s',
+                    [(batch_id, index, json.dumps(inputs), row_status) for index, inputs in enumerate(rows)],
+                    page_size=1000
+                )
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"Failed to save batch {batch_id}: {str(e)}")
+            raise
+
+BATCH_PROGRESS_SQL = '''
+    SELECT b.*, LOCALTIMESTAMP - b.heartbeat_at AS heartbeat_age,
+        COUNT(r.*) FILTER (WHERE r.status = 'completed') AS completed,
+        COUNT(r.*) FILTER (WHERE r.status = 'failed') AS failed,
+        COUNT(r.*) FILTER (WHERE r.status = 'running') AS running
+    FROM crew_batch b
+    LEFT JOIN crew_batch_row r ON r.batch_id = b.id
+'''
+
+def load_batch_data(batch_id: str):
+    """Load a batch with its per-status row counts, or None"""
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(BATCH_PROGRESS_SQL + 'WHERE b.id = %s GROUP BY b.id', (batch_id,))
+            return cursor.fetchone()
+
+def load_batches_data(limit: int = 20):
+    """Load the most recent batches with their per-status row counts"""
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(BATCH_PROGRESS_SQL + 'GROUP BY b.id ORDER BY b.created_at DESC LIMIT %s', (limit,))
+            return cursor.fetchall()
+
+def load_batch_rows_data(batch_id: str, statuses: List[str] = None, limit: int = None, after: int = None):
+    """
+    Load the rows of a batch in input order, optionally only those in the
+    given statuses; `limit` and `after` (a row_index) page through them.
+    """
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute('''
+                SELECT * FROM crew_batch_row
+                WHERE batch_id = %s AND (%s::text[] IS NULL OR status = ANY(%s::text[]))
+                    AND (%s::int IS NULL OR row_index > %s)
+                ORDER BY row_index
+                LIMIT %s
+            ''', (batch_id, statuses, statuses, after, after, limit))
+            return cursor.fetchall()
+
+def update_batch_row_data(batch_id: str, row_index: int, status: str, run_id: int = None,
+                          output: str = None, error: str = None, finished: bool = False):
+    """Record the state of one batch row; run_id is kept when not given"""
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('''
+                    UPDATE crew_batch_row
+                    SET status = %s, run_id = COALESCE(%s, run_id), output = %s, error = %s,
+                        finished_at = CASE WHEN %s THEN CURRENT_TIMESTAMP END
+                    WHERE batch_id = %s AND row_index = %s
+                ''', (status, run_id, output, error, finished, batch_id, row_index))
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"Failed to update row {row_index} of batch {batch_id}: {str(e)}")
+            raise
+
+def claim_batch_data(batch_id: str, owner: str, status: str, stale_after: float) -> bool:
+    """
+    Take over a batch for `owner` and set its status, unless another owner
+    is still running it.
+
+    The batch can be claimed when it is not running, is already owned by
+    `owner`, or its owner sent no heartbeat for `stale_after` seconds. The
+    check and the update are one statement, so two processes cannot both
+    claim the same batch.
+
+    Returns:
+        bool: True if `owner` now owns the batch.
+    """
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('''
+                    UPDATE crew_batch
+                    SET owner = %(owner)s, heartbeat_at = LOCALTIMESTAMP, status = %(status)s, finished_at = NULL
+                    WHERE id = %(batch_id)s
+                        AND (status <> %(status)s OR owner IS NULL OR owner = %(owner)s
+                            OR heartbeat_at IS NULL
+                            OR heartbeat_at < LOCALTIMESTAMP - make_interval(secs => %(stale_after)s))
                     RETURNING id
-                ''', (agent_id, activity_type, details))
-                conn.commit()
-                return cursor.fetchone()['id']
+                ''', {'batch_id': batch_id, 'owner': owner, 'status': status, 'stale_after': stale_after})
+                claimed = cursor.fetchone() is not None
+            conn.commit()
+            return claimed
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"Failed to claim batch {batch_id}: {str(e)}")
+            raise
+
+def heartbeat_batches_data(batch_ids: List[str], owner: str):
+    """Record that `owner` is still running these batches"""
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('''
+                    UPDATE crew_batch SET heartbeat_at = LOCALTIMESTAMP
+                    WHERE id = ANY(%s) AND owner = %s
+                ''', (batch_ids, owner))
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"Failed to record batch heartbeat: {str(e)}")
+            raise
+
+def update_batch_status_data(batch_id: str, status: str, finished: bool = False):
+    """Set the status of a batch, and its finish time once it is done"""
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('''
+                    UPDATE crew_batch
+                    SET status = %s, finished_at = CASE WHEN %s THEN CURRENT_TIMESTAMP END
+                    WHERE id = %s
+                ''', (status, finished, batch_id))
+            conn.commit()
         except Exception as e:
             conn.rollback()
-            logging.error(f"Failed to log agent activity: {str(e)}")
+            logging.error(f"Failed to update batch {batch_id}: {str(e)}")
             raise
+
+def _insert_rows(table: str, columns, rows):
+    """Append rows to a log table with one multi-row INSERT"""
+    ensure_log_partitions()
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                execute_values(
+                    cursor,
+                    f'INSERT INTO {table} ({", ".join(columns)}) VALUES %s',
+                    rows,
+                    page_size=len(rows)
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+def _log_writer(table: str, columns) -> BufferedLogWriter:
+    """Return the background writer for a log table, starting it on first use"""
+    writer = _log_writers.get(table)
+    if writer is None:
+        with _log_writers_lock:
+            writer = _log_writers.get(table)
+            if writer is None:
+                writer = BufferedLogWriter(
+                    table,
+                    lambda rows: _insert_rows(table, columns, rows),
+                    max_queue=LOG_QUEUE_SIZE,
+                    batch_size=LOG_BATCH_SIZE,
+                    flush_interval=LOG_FLUSH_INTERVAL,
+                    block_timeout=LOG_BLOCK_TIMEOUT
+                )
+                _log_writers[table] = writer
+    return writer
+
+def log_agent_activity(agent_id: str, activity_type: str, details: str) -> bool:
+    """
+    Log agent activity.
+
+    The row is queued for a background writer; returns False if it was dropped
+    because the queue was full.
+    """
+    return _log_writer('agent_activity_log', ('agent_id', 'activity_type', 'details', 'created_at')).write(
+        (agent_id, activity_type, details, datetime.now())
+    )
+
+def log_tool_usage(tool_id: int, usage_data: dict) -> bool:
+    """Queue a tool usage log row for the background writer"""
+    return _log_writer('tool_usage_log', ('tool_id', 'usage_data', 'created_at')).write(
+        (tool_id, json.dumps(usage_data), datetime.now())
+    )
+
+def flush_logs():
+    """Block until all queued log rows have been written"""
+    for writer in list(_log_writers.values()):
+        writer.flush()
+
+def get_log_writer_stats():
+    """Return queue, written and drop counters for each log writer"""
+    return {table: writer.stats() for table, writer in _log_writers.items()}
@@ -0,0 +1,166 @@
+# db_plan_check.py
+#
+# Query plan regression check for the hot loader queries in db_operations.
+# Seeds N rows into every table inside a transaction, runs EXPLAIN on each
+# loader query and fails if a checked table is read with a sequential scan.
+# Nothing is committed: the transaction is rolled back at the end.
+#
+#   python app/db_plan_check.py --rows 20000
+
+import argparse
+import json
+import sys
+from datetime import date
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+import db_operations
+
+class PlanCheck(NamedTuple):
+    name: str
+    sql: str
+    params: Dict[str, Any]
+    tables: Tuple[str, ...]
+
+def plan_checks() -> List[PlanCheck]:
+    """The loader queries to check, with the tables that must be index-accessed"""
+    page = db_operations._keyset_params
+    # Keyset cursors pointing at the middle of the seeded (today's) rows
+    midday = f'{date.today()} 12:00:00'
+    after_crew = (midday, 'C_seed_0')
+    after_run = (midday, 0)
+    return [
+        PlanCheck('load_crews_data: first page', db_operations.LOAD_CREWS_SQL,
+                  page(20), ('crews', 'crew_agents', 'crew_tasks', 'agents', 'tasks')),
+        PlanCheck('load_crews_data: next page', db_operations.LOAD_CREWS_SQL,
+                  page(20, after_crew), ('crews', 'crew_agents', 'crew_tasks', 'agents', 'tasks')),
+        PlanCheck('load_crew_data', db_operations.LOAD_CREW_SQL,
+                  {'crew_id': 'C_seed_7'}, ('crews', 'crew_agents', 'crew_tasks', 'agents', 'tasks')),
+        PlanCheck('load_crew_run_data: first page', db_operations.LOAD_CREW_RUN_SQL,
+                  page(50, crew_id=None), ('crew_run',)),
+        PlanCheck('load_crew_run_data: by crew', db_operations.LOAD_CREW_RUN_SQL,
+                  page(50, after_run, crew_id='C_seed_7'), ('crew_run',)),
+        PlanCheck('load_agent_activity_data', db_operations.LOAD_AGENT_ACTIVITY_SQL,
+                  page(50, agent_id='A_seed_7'), ('agent_activity_log',)),
+        # Lookups run by the ON DELETE actions of foreign keys
+        PlanCheck('delete agent: tasks.agent_id', 'SELECT 1 FROM tasks WHERE agent_id = %(agent_id)s',
+                  {'agent_id': 'A_seed_7'}, ('tasks',)),
+        PlanCheck('delete agent: crew_agents.agent_id', 'SELECT 1 FROM crew_agents WHERE agent_id = %(agent_id)s',
+                  {'agent_id': 'A_seed_7'}, ('crew_agents',)),
+        PlanCheck('delete task: crew_tasks.task_id', 'SELECT 1 FROM crew_tasks WHERE task_id = %(task_id)s',
+                  {'task_id': 'T_seed_7'}, ('crew_tasks',)),
+    ]
+
+def seed(cursor, rows: int):
+    """Insert `rows` agents, tasks, runs and log entries plus rows/10 crews with memberships"""
+    crews = max(rows // 10, 1)
+    cursor.execute('''
+        INSERT INTO agents (id, role, backstory, goal, llm_provider_model, created_at)
+        SELECT 'A_seed_' || i, 'Role ' || i, 'Backstory', 'Goal', 'OpenAI: gpt-4o',
+            CURRENT_DATE + (i %% 86000) * INTERVAL '1 second'
+        FROM generate_series(1, %(rows)s) AS i;
+
+        INSERT INTO tasks (id, description, expected_output, agent_id, created_at)
+        SELECT 'T_seed_' || i, 'Description ' || i, 'Output', 'A_seed_' || (i %% %(rows)s + 1),
+            CURRENT_DATE + (i %% 86000) * INTERVAL '1 second'
+        FROM generate_series(1, %(rows)s) AS i;
+
+        INSERT INTO crews (id, name, metadata, created_at)
+        SELECT 'C_seed_' || i, 'Crew ' || i, '{}'::jsonb,
+            CURRENT_DATE + (i %% 86000) * INTERVAL '1 second'
+        FROM generate_series(1, %(crews)s) AS i;
+
+        INSERT INTO crew_agents (crew_id, agent_id, position)
+        SELECT 'C_seed_' || (i %% %(crews)s + 1), 'A_seed_' || i, i / %(crews)s
+        FROM generate_series(1, %(rows)s) AS i;
+
+        INSERT INTO crew_tasks (crew_id, task_id, position)
+        SELECT 'C_seed_' || (i %% %(crews)s + 1), 'T_seed_' || i, i / %(crews)s
+        FROM generate_series(1, %(rows)s) AS i;
+
+        INSERT INTO crew_run (crew_id, agent_id, status, created_at)
+        SELECT 'C_seed_' || (i %% %(crews)s + 1), 'A_seed_' || (i %% %(rows)s + 1), 'done',
+            CURRENT_DATE + (i %% 86000) * INTERVAL '1 second'
+        FROM generate_series(1, %(rows)s) AS i;
+
+        INSERT INTO agent_activity_log (agent_id, activity_type, details, created_at)
+        SELECT 'A_seed_' || (i %% 100 + 1), 'step', 'details',
+            CURRENT_DATE + (i %% 86000) * INTERVAL '1 second'
+        FROM generate_series(1, %(rows)s) AS i;
+    ''', {'rows': rows, 'crews': crews})
+    cursor.execute('ANALYZE')
+
+def _walk(plan: Dict[str, Any]):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from _walk(child)
+
+def _base_table(relation: str, tables: Tuple[str, ...]) -> str:
+    """Map a partition such as crew_run_p20240101 back to its parent table"""
+    for table in tables:
+        if relation == table or relation.startswith(f'{table}_p'):
+            return table
+    return relation
+
+def _estimated_rows(cursor, relation: str) -> float:
+    cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass', (relation,))
+    return cursor.fetchone()['reltuples']
+
+def explain(cursor, check: PlanCheck) -> List[str]:
+    """Return the problems found in the plan of one check (empty when it passes)"""
+    cursor.execute(f'EXPLAIN (FORMAT JSON) {check.sql}', check.params)
+    row = cursor.fetchone()
+    plan = (row['QUERY PLAN'] if isinstance(row, dict) else row[0])[0]['Plan']
+    problems = []
+    used_index = False
+    for node in _walk(plan):
+        node_type = node.get('Node Type', '')
+        relation = node.get('Relation Name', '')
+        if node_type == 'Seq Scan' and _base_table(relation, check.tables) in check.tables:
+            # Scanning an empty partition (e.g. one created ahead for future days) reads nothing
+            if _estimated_rows(cursor, relation) > 0:
+                problems.append(f'sequential scan on {relation}')
+        if 'Index' in node_type:
+            used_index = True
+    if not used_index:
+        problems.append('no index scan in plan')
+    return problems
+
+def run_checks(rows: int = 20000, verbose: bool = False) -> Dict[str, List[str]]:
+    """
+    Seed `rows` rows, EXPLAIN every loader query and roll everything back.
+
+    Returns:
+        dict: Check name -> list of problems; an empty list means the check passed.
+    """
+    db_operations.initialize_db()
+    results = {}
+    with db_operations.get_db_connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                seed(cursor, rows)
+                for check in plan_checks():
+                    results[check.name] = explain(cursor, check)
+                    if verbose:
+                        cursor.execute(f'EXPLAIN {check.sql}', check.params)
+                        print(f'--- {check.name}')
+                        print('\n'.join(line['QUERY PLAN'] for line in cursor.fetchall()))
+        finally:
+            conn.rollback()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the loader queries stay index-backed.")
+    parser.add_argument('--rows', type=int, default=20000, help="Rows to seed per table")
+    parser.add_argument('--verbose', action='store_true', help="Print every query plan")
+    args = parser.parse_args()
+
+    results = run_checks(args.rows, args.verbose)
+    failed = {name: problems for name, problems in results.items() if problems}
+    for name, problems in results.items():
+        print(f"{'FAIL' if problems else 'ok  '} {name}" + (f": {', '.join(problems)}" if problems else ''))
+    if failed:
+        print(json.dumps(failed, indent=2))
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+# db_pool.py
+
+import logging
+import threading
+import time
+from typing import Dict, Any, Optional
+
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool, PoolError
+
+# Upper bounds (in milliseconds) of the checkout latency histogram buckets
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+class PoolTimeout(PoolError):
+    """Raised when no connection becomes available within the checkout timeout."""
+
+class InstrumentedConnectionPool:
+    """
+    Thread-safe PostgreSQL connection pool with checkout timeouts,
+    connection health checks and usage metrics.
+
+    Wraps psycopg2's ThreadedConnectionPool, which raises immediately when
+    exhausted, with a semaphore so callers wait (up to `timeout` seconds)
+    for a free connection instead.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        minconn: int = 1,
+        maxconn: int = 10,
+        timeout: float = 30.0,
+        max_idle: float = 300.0,
+        max_lifetime: float = 3600.0
+    ):
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self._pool = ThreadedConnectionPool(minconn, maxconn, dsn=dsn)
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self._born: Dict[int, float] = {}
+        self._returned: Dict[int, float] = {}
+        self._in_use = 0
+        self._waiting = 0
+        self._counters = {
+            'checkouts': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'recycled': 0,
+            'validation_failures': 0,
+        }
+        self._wait_time_total = 0.0
+        self._latency_histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def getconn(self):
+        """
+        Check out a healthy connection, waiting up to `timeout` seconds.
+
+        Raises:
+            PoolTimeout: If the pool stays exhausted for the whole timeout.
+        """
+        start = time.monotonic()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._waiting += 1
+                self._counters['waits'] += 1
+            try:
+                acquired = self._slots.acquire(timeout=self.timeout)
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+                    self._wait_time_total += time.monotonic() - start
+            if not acquired:
+                with self._lock:
+                    self._counters['timeouts'] += 1
+                logging.warning(
+                    f"Connection pool exhausted: no connection available after {self.timeout}s "
+                    f"({self.maxconn} in use)"
+                )
+                raise PoolTimeout(f"No database connection available within {self.timeout}s")
+
+        try:
+            conn = self._checkout_healthy()
+        except Exception:
+            self._slots.release()
+            raise
+
+        elapsed_ms = (time.monotonic() - start) * 1000
+        with self._lock:
+            self._in_use += 1
+            self._counters['checkouts'] += 1
+            self._latency_histogram[self._bucket(elapsed_ms)] += 1
+        return conn
+
+    def putconn(self, conn, close: bool = False):
+        """Return a connection to the pool, closing it if it is broken."""
+        key = id(conn)
+        with self._lock:
+            self._in_use -= 1
+            self._returned[key] = time.monotonic()
+        try:
+            if close or conn.closed:
+                self._forget(conn)
+                self._pool.putconn(conn, close=True)
+            else:
+                self._pool.putconn(conn)
+        finally:
+            self._slots.release()
+
+    def closeall(self):
+        """Close every connection owned by the pool."""
+        self._pool.closeall()
+        with self._lock:
+            self._born.clear()
+            self._returned.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Snapshot of the pool's usage metrics.
+
+        Returns:
+            dict: Current in-use/waiting counts, cumulative counters, total
+            wait time and the checkout latency histogram (bucket upper bound in
+            milliseconds -> count, with '+Inf' for the overflow bucket).
+        """
+        with self._lock:
+            histogram = {
+                str(bound): count
+                for bound, count in zip(LATENCY_BUCKETS_MS, self._latency_histogram)
+            }
+            histogram['+Inf'] = self._latency_histogram[-1]
+            return {
+                'in_use': self._in_use,
+                'waiting': self._waiting,
+                'max_size': self.maxconn,
+                'min_size': self.minconn,
+                **self._counters,
+                'wait_time_total_s': round(self._wait_time_total, 6),
+                'checkout_latency_ms': histogram,
+            }
+
+    def _checkout_healthy(self):
+        while True:
+            conn = self._pool.getconn()
+            key = id(conn)
+            now = time.monotonic()
+            with self._lock:
+                born = self._born.setdefault(key, now)
+                returned = self._returned.get(key, now)
+
+            if conn.closed or now - born > self.max_lifetime:
+                self._recycle(conn)
+                continue
+            if now - returned > self.max_idle and not self._ping(conn):
+                with self._lock:
+                    self._counters['validation_failures'] += 1
+                self._recycle(conn)
+                continue
+            return conn
+
+    def _ping(self, conn) -> bool:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _recycle(self, conn):
+        with self._lock:
+            self._counters['recycled'] += 1
+        self._forget(conn)
+        self._pool.putconn(conn, close=True)
+
+    def _forget(self, conn):
+        with self._lock:
+            self._born.pop(id(conn), None)
+            self._returned.pop(id(conn), None)
+
+    @staticmethod
+    def _bucket(elapsed_ms: float) -> int:
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                return index
+        return len(LATENCY_BUCKETS_MS)
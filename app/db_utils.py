@@ -1,21 +1,48 @@
 # db_utils.py
 
-from typing import List, Dict
-from my_crew import MyCrew
-from my_agent import MyAgent
-from my_task import MyTask
+from typing import List, Dict, Optional
+from datetime import datetime
+from models import AgentModel, CrewModel, TaskModel
 import db_operations
+from shared_cache import SharedCache, Snapshot
 
 def initialize_db():
     """Initialize the database with required tables"""
     db_operations.initialize_db()
 
-def load_agents() -> List[MyAgent]:
-    """Load all agents from the database"""
-    agents_data = db_operations.load_agents_data()
-    agents = []
-    for agent_data in agents_data:
-        agent = MyAgent(
+# Agent columns besides `id`, as returned by the loaders in db_operations
+AGENT_FIELDS = (
+    'role', 'backstory', 'goal', 'allow_delegation', 'is_verbose', 'cache',
+    'llm_provider_model', 'temperature', 'max_iter', 'created_at'
+)
+
+class IdentityMap:
+    """
+    Per-load registry of domain objects keyed by id.
+
+    Sharing one map across loaders guarantees that every row for a given
+    agent or task becomes exactly one object, referenced by all tasks and
+    crews that point at it. The loaders build plain models; the Streamlit
+    pages pass a map with their view classes instead (see views.py).
+    """
+
+    def __init__(self, agent_class=AgentModel, task_class=TaskModel, crew_class=CrewModel):
+        self.agent_class = agent_class
+        self.task_class = task_class
+        self.crew_class = crew_class
+        self.agents: Dict[str, AgentModel] = {}
+        self.tasks: Dict[str, TaskModel] = {}
+
+def _isoformat(value) -> Optional[str]:
+    """Timestamps arrive as datetimes from plain columns and as strings from JSON aggregates"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _build_agent(agent_data: Dict, identity_map: IdentityMap) -> AgentModel:
+    agent = identity_map.agents.get(agent_data['id'])
+    if agent is None:
+        agent = identity_map.agent_class(
             id=agent_data['id'],
             role=agent_data['role'],
             backstory=agent_data['backstory'],
@@ -26,14 +53,34 @@ def load_agents() -> List[MyAgent]:
             llm_provider_model=agent_data['llm_provider_model'],
             temperature=float(agent_data['temperature']),
             max_iter=agent_data['max_iter'],
-            created_at=agent_data['created_at'].isoformat()
+            created_at=_isoformat(agent_data['created_at'])
         )
-        agents.append(agent)
-    return agents
+        identity_map.agents[agent.id] = agent
+    return agent
 
-def save_agent(agent: MyAgent):
-    """Save or update an agent in the database"""
-    agent_data = {
+def _build_task(task_data: Dict, agent: Optional[AgentModel], identity_map: IdentityMap) -> TaskModel:
+    task = identity_map.tasks.get(task_data['id'])
+    if task is None:
+        task = identity_map.task_class(
+            id=task_data['id'],
+            description=task_data['description'],
+            expected_output=task_data['expected_output'],
+            agent=agent,
+            async_execution=task_data['async_execution'],
+            context_from_async_tasks_ids=task_data['context_from_async_tasks_ids'],
+            context_from_sync_tasks_ids=task_data['context_from_sync_tasks_ids'],
+            created_at=_isoformat(task_data['created_at'])
+        )
+        identity_map.tasks[task.id] = task
+    return task
+
+def load_agents(identity_map: Optional[IdentityMap] = None) -> List[AgentModel]:
+    """Load all agents from the database"""
+    identity_map = identity_map or IdentityMap()
+    return [_build_agent(agent_data, identity_map) for agent_data in db_operations.load_agents_data()]
+
+def _agent_data(agent: AgentModel) -> Dict:
+    return {
         'id': agent.id,
         'role': agent.role,
         'backstory': getattr(agent, 'backstory', None),
@@ -45,100 +92,248 @@ def save_agent(agent: MyAgent):
         'temperature': getattr(agent, 'temperature', 0.1),
         'max_iter': getattr(agent, 'max_iter', 25)
     }
-    return db_operations.save_agent_data(agent_data)
+
+def save_agent(agent: AgentModel):
+    """Save or update an agent in the database"""
+    agent_id = db_operations.save_agent_data(_agent_data(agent))
+    library_cache.invalidate()
+    return agent_id
+
+def save_agents(agents: List[AgentModel]):
+    """Save or update several agents in a single round trip"""
+    agent_ids = db_operations.save_agents_data([_agent_data(agent) for agent in agents])
+    library_cache.invalidate()
+    return agent_ids
 
 def delete_agent(agent_id: str):
     """Delete an agent"""
     db_operations.delete_agent_data(agent_id)
+    library_cache.invalidate()
 
-def load_tasks() -> List[MyTask]:
-    """Load all tasks from the database"""
-    tasks_data = db_operations.load_tasks_data()
+def load_tasks(identity_map: Optional[IdentityMap] = None) -> List[TaskModel]:
+    """Load all tasks from the database, building one agent per distinct agent"""
+    identity_map = identity_map or IdentityMap()
     tasks = []
-    for task_data in tasks_data:
+    for task_data in db_operations.load_tasks_data():
         agent = None
-        if task_data['agent_id']:
-            agent = MyAgent(
-                id=task_data['agent_id'],
-                role=task_data['role'],
-                backstory=task_data['backstory'],
-                goal=task_data['goal'],
-                allow_delegation=task_data['allow_delegation'],
-                verbose=task_data['is_verbose'],
-                cache=task_data['cache'],
-                llm_provider_model=task_data['llm_provider_model'],
-                temperature=float(task_data['temperature']),
-                max_iter=task_data['max_iter'],
-                created_at=task_data['created_at'].isoformat()
+        agent_id = task_data['agent_id']
+        if agent_id:
+            agent = identity_map.agents.get(agent_id) or _build_agent(
+                {'id': agent_id, **{field: task_data[f'agent_{field}'] for field in AGENT_FIELDS}},
+                identity_map
             )
-        task = MyTask(
-            id=task_data['id'],
-            description=task_data['description'],
-            expected_output=task_data['expected_output'],
-            agent=agent,
-            async_execution=task_data['async_execution'],
-            created_at=task_data['created_at'].isoformat()
-        )
-        tasks.append(task)
+        tasks.append(_build_task(task_data, agent, identity_map))
     return tasks
 
-def save_task(task: MyTask):
-    """Save or update a task in the database"""
-    task_data = {
+def _task_data(task: TaskModel) -> Dict:
+    return {
         'id': task.id,
         'description': task.description,
         'expected_output': task.expected_output,
         'agent_id': task.agent.id if task.agent else None,
-        'async_execution': task.async_execution
+        'async_execution': task.async_execution,
+        'context_from_async_tasks_ids': task.context_from_async_tasks_ids,
+        'context_from_sync_tasks_ids': task.context_from_sync_tasks_ids
     }
-    return db_operations.save_task_data(task_data)
+
+def save_task(task: TaskModel):
+    """Save or update a task in the database"""
+    task_id = db_operations.save_task_data(_task_data(task))
+    library_cache.invalidate()
+    return task_id
+
+def save_tasks(tasks: List[TaskModel]):
+    """Save or update several tasks in a single round trip"""
+    task_ids = db_operations.save_tasks_data([_task_data(task) for task in tasks])
+    library_cache.invalidate()
+    return task_ids
 
 def delete_task(task_id: str):
     """Delete a task"""
     db_operations.delete_task_data(task_id)
+    library_cache.invalidate()
 
-def load_crews(limit: int = 100, offset: int = 0) -> List[MyCrew]:
-    """Load crews from the database with pagination"""
-    crews_data = db_operations.load_crews_data(limit, offset)
-    crews = []
-    for crew_data in crews_data:
-        metadata = crew_data['metadata'] or {}
-        crew = MyCrew(
-            id=crew_data['id'],
-            name=crew_data['name'],
-            description=metadata.get('description'),
-            goal=metadata.get('goal'),
-            created_at=crew_data['created_at'].isoformat()
+def _build_crew(crew_data: Dict, identity_map: IdentityMap) -> CrewModel:
+    metadata = crew_data['metadata'] or {}
+    agents = [_build_agent(agent_data, identity_map) for agent_data in crew_data['agents']]
+    tasks = [
+        _build_task(
+            task_data,
+            _build_agent(task_data['agent'], identity_map) if task_data['agent'] else None,
+            identity_map
         )
-        crews.append(crew)
-    return crews
+        for task_data in crew_data['tasks']
+    ]
+    return identity_map.crew_class(
+        id=crew_data['id'],
+        name=crew_data['name'],
+        description=metadata.get('description'),
+        goal=metadata.get('goal'),
+        agents=agents,
+        tasks=tasks,
+        created_at=crew_data['created_at'].isoformat(),
+        max_parallel_tasks=metadata.get('max_parallel_tasks')
+    )
 
-def save_crew(crew: MyCrew):
-    """Save or update a crew in the database"""
+def load_crews(limit: int = 100, after: Optional[CrewModel] = None, identity_map: Optional[IdentityMap] = None) -> List[CrewModel]:
+    """
+    Load crews with their agents and tasks from the database with pagination.
+
+    Pass the last crew of the previous page as `after` to load the next page.
+    """
+    identity_map = identity_map or IdentityMap()
+    keyset = (after.created_at, after.id) if after else None
+    return [_build_crew(crew_data, identity_map) for crew_data in db_operations.load_crews_data(limit, keyset)]
+
+def load_crew(crew_id: str) -> Optional[CrewModel]:
+    """Load a single crew with its agents and tasks, or None if it does not exist"""
+    crew_data = db_operations.load_crew_data(crew_id)
+    return _build_crew(crew_data, IdentityMap()) if crew_data else None
+
+def _crew_data(crew: CrewModel) -> Dict:
     crew_data = {
         'id': crew.id if hasattr(crew, 'id') else None,
         'name': crew.name,
         'metadata': {
             'description': crew.description,
             'goal': getattr(crew, 'goal', None),
+            'max_parallel_tasks': getattr(crew, 'max_parallel_tasks', 1),
             'other_attributes': getattr(crew, 'other_attributes', {}),
         }
     }
     if hasattr(crew, 'agents'):
         crew_data['agents'] = [{'id': agent.id} for agent in crew.agents]
-    return db_operations.save_crew_data(crew_data)
+    if hasattr(crew, 'tasks'):
+        crew_data['tasks'] = [{'id': task.id} for task in crew.tasks]
+    return crew_data
+
+def save_crew(crew: CrewModel):
+    """Save or update a crew in the database"""
+    crew_id = db_operations.save_crew_data(_crew_data(crew))
+    library_cache.invalidate()
+    return crew_id
+
+def save_crews(crews: List[CrewModel]):
+    """
+    Save several crews together with the agents and tasks they reference.
+
+    Agents, tasks and crews are each written with one batched statement, so
+    importing N crews costs a constant number of round trips.
+    """
+    agents = {agent.id: agent for crew in crews for agent in crew.agents}
+    tasks = {task.id: task for crew in crews for task in crew.tasks}
+    agents.update({task.agent.id: task.agent for task in tasks.values() if task.agent})
+    save_agents(list(agents.values()))
+    save_tasks(list(tasks.values()))
+    crew_ids = db_operations.save_crews_data([_crew_data(crew) for crew in crews])
+    library_cache.invalidate()
+    return crew_ids
 
 def delete_crew(crew_id: str):
     """Delete a crew"""
     db_operations.delete_crew_data(crew_id)
+    library_cache.invalidate()
+
+def _load_library():
+    identity_map = IdentityMap()
+    agents = load_agents(identity_map)
+    tasks = load_tasks(identity_map)
+    crews = load_crews(identity_map=identity_map)
+    return agents, tasks, crews
+
+# Process-wide snapshot of agents, tasks and crews shared by all sessions;
+# every save_*/delete_* invalidates it, and so do change notifications
+# from other processes.
+library_cache = SharedCache(_load_library)
+
+def _on_library_change(change):
+    # Another replica committed a change (or the listener reconnected and may
+    # have missed some): the next get_library_snapshot() reloads.
+    library_cache.invalidate()
+
+def get_library_snapshot() -> Snapshot:
+    """
+    Return the shared, versioned snapshot of all agents, tasks and crews.
+
+    The models are shared between sessions and must not be changed; the
+    pages edit views of them, see views.session_library. The first call also starts listening
+    for changes committed by other processes, so the snapshot stays current
+    across replicas without polling.
+    """
+    db_operations.start_change_listener(_on_library_change)
+    return library_cache.get()
+
+def load_crew_run(limit: int = 100, after=None, crew_id: Optional[str] = None):
+    """Load one page of crew run data; pass the last row of the previous page as `after`"""
+    keyset = (after['created_at'], after['id']) if after else None
+    return db_operations.load_crew_run_data(limit, keyset, crew_id)
+
+def load_agent_activity(agent_id: str, limit: int = 100, after=None):
+    """Load one page of an agent's activity log; pass the last row of the previous page as `after`"""
+    keyset = (after['created_at'], after['id']) if after else None
+    return db_operations.load_agent_activity_data(agent_id, limit, keyset)
+
+def iter_crew_runs(itersize: int = None):
+    """Stream all crew run rows with constant memory"""
+    return db_operations.iter_crew_run_data(itersize)
 
-def load_crew_run():
-    """Load crew run data"""
-    return db_operations.load_crew_run_data()
+def iter_agent_activity_log(itersize: int = None):
+    """Stream all agent activity log rows with constant memory"""
+    return db_operations.iter_agent_activity_log_data(itersize)
 
-def save_crew_run(crew_id: str, agent_id: str, status: str = None):
-    """Save crew run data with optional status"""
-    return db_operations.save_crew_run_data(crew_id, agent_id, status)
+def iter_tool_usage_log(itersize: int = None):
+    """Stream all tool usage log rows with constant memory"""
+    return db_operations.iter_tool_usage_log_data(itersize)
+
+def save_crew_run(crew_id: str, agent_id: str, status: str = None, inputs: dict = None):
+    """Save crew run data with optional status and kickoff inputs"""
+    return db_operations.save_crew_run_data(crew_id, agent_id, status, inputs)
+
+def update_crew_run_status(run_id: int, status: str):
+    """Update the status of a crew run that has not finished yet"""
+    db_operations.update_crew_run_status_data(run_id, status)
+
+def finish_crew_run(run_id: int, status: str, output: str = None, error: str = None):
+    """Record the final status and output (or error) of a crew run"""
+    db_operations.finish_crew_run_data(run_id, status, output, error)
+
+def save_batch(batch_id: str, crew_id: str, name: str, rows: List[Dict], status: str, row_status: str,
+               owner: Optional[str] = None):
+    """Create a batch kickoff with one row of placeholder inputs per element of `rows`"""
+    db_operations.save_batch_data(batch_id, crew_id, name, rows, status, row_status, owner)
+
+def claim_batch(batch_id: str, owner: str, status: str, stale_after: float) -> bool:
+    """Take over a batch unless another live owner is running it; True on success"""
+    return db_operations.claim_batch_data(batch_id, owner, status, stale_after)
+
+def heartbeat_batches(batch_ids: List[str], owner: str):
+    """Record that `owner` is still running these batches"""
+    db_operations.heartbeat_batches_data(batch_ids, owner)
+
+def load_batch(batch_id: str):
+    """Load a batch with its per-status row counts, or None"""
+    return db_operations.load_batch_data(batch_id)
+
+def load_batches(limit: int = 20):
+    """Load the most recent batches with their per-status row counts"""
+    return db_operations.load_batches_data(limit)
+
+def load_batch_rows(batch_id: str, statuses: Optional[List[str]] = None, limit: Optional[int] = None,
+                    after: Optional[int] = None):
+    """
+    Load the rows of a batch in input order, optionally only those in the given
+    statuses; pass the row_index of the last row of the previous page as `after`.
+    """
+    return db_operations.load_batch_rows_data(batch_id, statuses, limit, after)
+
+def update_batch_row(batch_id: str, row_index: int, status: str, run_id: int = None,
+                     output: str = None, error: str = None, finished: bool = False):
+    """Record the state of one batch row"""
+    db_operations.update_batch_row_data(batch_id, row_index, status, run_id, output, error, finished)
+
+def update_batch_status(batch_id: str, status: str, finished: bool = False):
+    """Set the status of a batch"""
+    db_operations.update_batch_status_data(batch_id, status, finished)
 
 def load_tools():
     """Load all tools from the database"""
@@ -154,8 +349,20 @@ def load_tools_state():
 
 def cleanup_old_logs(days: int = 30):
     """Delete logs older than specified days"""
-    db_operations.cleanup_old_logs(days)
+    return db_operations.cleanup_old_logs(days)
+
+def cleanup_old_crew_runs(days: int = 90):
+    """Delete crew runs older than specified days"""
+    return db_operations.cleanup_old_crew_runs(days)
 
 def log_agent_activity(agent_id: str, activity_type: str, details: str):
-    """Log agent activity"""
-    db_operations.log_agent_activity(agent_id, activity_type, details)
+    """Log agent activity without waiting for the database write"""
+    return db_operations.log_agent_activity(agent_id, activity_type, details)
+
+def log_tool_usage(tool_id: int, usage_data: dict):
+    """Log tool usage without waiting for the database write"""
+    return db_operations.log_tool_usage(tool_id, usage_data)
+
+def flush_logs():
+    """Write out all queued log rows"""
+    db_operations.flush_logs()
@@ -0,0 +1,122 @@
+# import_benchmark.py
+#
+# Cold-start import benchmark for the Streamlit app and the modules it loads.
+# Every module is imported in a fresh interpreter (so nothing is cached in
+# sys.modules), timed with -X importtime, and checked for heavy optional
+# backends that should only be imported on demand.
+#
+#   python app/import_benchmark.py --repeat 5
+#   python app/import_benchmark.py --save baseline.json
+#   python app/import_benchmark.py --baseline baseline.json --tolerance 0.2
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, NamedTuple
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# app.py and the modules it imports on a cold start, cheapest first
+MODULES = (
+    'db_operations',
+    'memory_backend',
+    'my_tools',
+    'my_agent',
+    'db_utils',
+    'pg_tools',
+    'app',
+)
+
+# Backends that must not be imported just by loading a module
+HEAVY_MODULES = (
+    'crewai_tools',
+    'chromadb',
+    'embedchain',
+    'selenium',
+    'docker',
+    'langchain_community',
+)
+
+_IMPORTTIME = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)')
+
+class ImportResult(NamedTuple):
+    module: str
+    seconds: float
+    heavy: List[str]
+
+def _measure_once(module: str):
+    """Import `module` in a fresh interpreter; return its cumulative import time and the heavy modules it loaded"""
+    probe = (
+        f'import sys, json; import {module}; '
+        f'print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))'
+    )
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', probe],
+        cwd=APP_DIR, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+    cumulative_us = 0
+    for match in _IMPORTTIME.finditer(completed.stderr):
+        # Top-level entries (no indentation) sum up to the whole import
+        if match.group(3) == ' ':
+            cumulative_us += int(match.group(2))
+    heavy = json.loads(completed.stdout.strip().splitlines()[-1])
+    return cumulative_us / 1e6, heavy
+
+def measure(module: str, repeat: int = 3) -> ImportResult:
+    """Median cold import time of `module` over `repeat` fresh interpreters"""
+    timings = []
+    heavy: List[str] = []
+    for _ in range(repeat):
+        seconds, heavy = _measure_once(module)
+        timings.append(seconds)
+    return ImportResult(module, statistics.median(timings), heavy)
+
+def compare(results: List[ImportResult], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    """Return the modules whose import time grew by more than `tolerance` over the baseline"""
+    regressions = []
+    for result in results:
+        previous = baseline.get(result.module)
+        if previous and result.seconds > previous * (1 + tolerance):
+            regressions.append(
+                f"{result.module}: {result.seconds:.3f}s vs {previous:.3f}s baseline "
+                f"(+{(result.seconds / previous - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import time of the app's modules.")
+    parser.add_argument('modules', nargs='*', default=list(MODULES), help="Modules to import (default: the app's)")
+    parser.add_argument('--repeat', type=int, default=3, help="Fresh interpreters per module; the median is reported")
+    parser.add_argument('--save', help="Write the results to this JSON file")
+    parser.add_argument('--baseline', help="JSON file from --save to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown over the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results = []
+    for module in args.modules:
+        result = measure(module, args.repeat)
+        results.append(result)
+        heavy = f"  heavy: {', '.join(result.heavy)}" if result.heavy else ''
+        print(f"{result.module:<20} {result.seconds:8.3f}s{heavy}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({result.module: result.seconds for result in results}, f, indent=2)
+
+    failed = False
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"SLOWER {regression}")
+        failed = bool(regressions)
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# llm_streaming.py
+#
+# Token streaming for crewai's litellm-based LLM. crewai 0.76 always calls
+# litellm with stream=False; StreamingLLM streams instead whenever a token
+# sink is active in the calling context, and still returns the full text, so
+# crewai sees no difference. Without a sink it behaves exactly like LLM.
+
+import contextvars
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Protocol
+
+import litellm
+from crewai import LLM
+from crewai.llm import suppress_warnings
+from crewai.utilities.exceptions.context_window_exceeding_exception import (
+    LLMContextLengthExceededException,
+)
+
+class TokenSink(Protocol):
+    def start_stream(self) -> None:
+        """A new LLM call starts streaming"""
+
+    def write_stream(self, text: str) -> None:
+        """The next chunk of the current call's output"""
+
+_token_sink: contextvars.ContextVar[Optional[TokenSink]] = contextvars.ContextVar('token_sink', default=None)
+
+@contextmanager
+def stream_to(sink: Optional[TokenSink]):
+    """Stream the output of StreamingLLM calls made in this context to `sink`"""
+    token = _token_sink.set(sink)
+    try:
+        yield
+    finally:
+        _token_sink.reset(token)
+
+class StreamingLLM(LLM):
+    """crewai LLM that streams its output to the active token sink"""
+
+    def _completion_params(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        # Same parameters LLM.call passes to litellm
+        params = {
+            "model": self.model,
+            "messages": messages,
+            "timeout": self.timeout,
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "n": self.n,
+            "stop": self.stop,
+            "max_tokens": self.max_tokens or self.max_completion_tokens,
+            "presence_penalty": self.presence_penalty,
+            "frequency_penalty": self.frequency_penalty,
+            "logit_bias": self.logit_bias,
+            "response_format": self.response_format,
+            "seed": self.seed,
+            "logprobs": self.logprobs,
+            "top_logprobs": self.top_logprobs,
+            "api_base": self.base_url,
+            "api_version": self.api_version,
+            "api_key": self.api_key,
+            **self.kwargs,
+            "stream": True,
+        }
+        return {k: v for k, v in params.items() if v is not None}
+
+    def call(self, messages: List[Dict[str, str]], callbacks: List[Any] = []) -> str:
+        sink = _token_sink.get()
+        if sink is None:
+            return super().call(messages, callbacks)
+
+        with suppress_warnings():
+            if callbacks and len(callbacks) > 0:
+                litellm.callbacks = callbacks
+            parts = []
+            try:
+                sink.start_stream()
+                for chunk in litellm.completion(**self._completion_params(messages)):
+                    text = chunk.choices[0].delta.content if chunk.choices else None
+                    if text:
+                        parts.append(text)
+                        sink.write_stream(text)
+            except Exception as e:
+                # As in LLM.call: crewai handles context overflows itself
+                if not LLMContextLengthExceededException(str(e))._is_context_limit_error(str(e)):
+                    logging.error(f"LiteLLM streaming call failed: {str(e)}")
+                raise
+            return ''.join(parts)
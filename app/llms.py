@@ -5,8 +5,9 @@ from langchain_groq import ChatGroq
 from langchain_anthropic import ChatAnthropic
 from crewai import LLM
 from dotenv import load_dotenv
+from llm_streaming import StreamingLLM
 
-def create_openai_llm(model, temperature):
+def create_openai_llm(model, temperature, streaming=False):
     safe_pop_env_var('OPENAI_API_KEY')
     safe_pop_env_var('OPENAI_API_BASE')
     load_dotenv(override=True)
@@ -19,7 +20,8 @@ def create_openai_llm(model, temperature):
     #     max_tokens = 4095
     if api_key:
         #return ChatOpenAI(openai_api_key=api_key, openai_api_base=api_base, model_name=model, temperature=temperature, max_tokens=max_tokens)
-        return LLM(model=model, temperature=temperature, base_url=api_base)
+        llm_class = StreamingLLM if streaming else LLM
+        return llm_class(model=model, temperature=temperature, base_url=api_base)
     else:
         raise ValueError("OpenAI API key not set in .env file")
 
@@ -38,11 +40,12 @@ def create_groq_llm(model, temperature):
     else:
         raise ValueError("Groq API key not set in .env file")
 
-def create_ollama_llm(model, temperature):
+def create_ollama_llm(model, temperature, streaming=False):
     host = os.getenv('OLLAMA_HOST')
     if host:
         #return ChatOllama(base_url=host,model=model, temperature=temperature)
-        return LLM(model=model, temperature=temperature, base_url=host)
+        llm_class = StreamingLLM if streaming else LLM
+        return llm_class(model=model, temperature=temperature, base_url=host)
     else:
         raise ValueError("Ollama Host is not set in .env file")    
 
@@ -58,7 +61,8 @@ def create_lmstudio_llm(model, temperature):
 LLM_CONFIG = {
     "OpenAI": {
         "models": ["gpt-4o","gpt-4o-mini","gpt-3.5-turbo", "gpt-4-turbo"],
-        "create_llm": create_openai_llm
+        "create_llm": create_openai_llm,
+        "streaming": True
     },
     "Groq": {
         "models": ["groq/llama3-8b-8192","groq/llama3-70b-8192", "groq/mixtral-8x7b-32768"],
@@ -66,7 +70,8 @@ LLM_CONFIG = {
     },
     "Ollama": {
         "models": os.getenv("OLLAMA_MODELS", "").split(',') if os.getenv("OLLAMA_MODELS") else [],
-        "create_llm": create_ollama_llm
+        "create_llm": create_ollama_llm,
+        "streaming": True
     },
     "Anthropic": {
         "models": ["claude-3-5-sonnet-20240620"],
@@ -82,10 +87,20 @@ LLM_CONFIG = {
 def llm_providers_and_models():
     return [f"{provider}: {model}" for provider in LLM_CONFIG.keys() for model in LLM_CONFIG[provider]["models"]]
 
-def create_llm(provider_and_model, temperature=0.1):
+def create_llm(provider_and_model, temperature=0.1, streaming=False):
+    """
+    Create the LLM for a "Provider: model" string.
+
+    With streaming=True, providers that support it (see "streaming" in
+    LLM_CONFIG) return a StreamingLLM, which streams tokens to the active
+    token sink; the others ignore the flag.
+    """
     provider, model = provider_and_model.split(": ")
-    create_llm_func = LLM_CONFIG.get(provider, {}).get("create_llm")
+    config = LLM_CONFIG.get(provider, {})
+    create_llm_func = config.get("create_llm")
     if create_llm_func:
+        if streaming and config.get("streaming"):
+            return create_llm_func(model, temperature, streaming=True)
         return create_llm_func(model, temperature)
     else:
         raise ValueError(f"LLM provider {provider} is not recognized or not supported")
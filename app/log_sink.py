@@ -0,0 +1,139 @@
+# log_sink.py
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+class BufferedLogWriter:
+    """
+    Asynchronous, batching sink for append-only log rows.
+
+    `write()` only enqueues the row on a bounded in-memory queue; a background
+    thread drains the queue and hands rows to `write_batch` in batches of up to
+    `batch_size`, or whatever has accumulated after `flush_interval` seconds.
+
+    When the queue is full, `write()` waits at most `block_timeout` seconds
+    (0 = not at all) and then drops the row, counting it in `stats()`.
+    Pending rows are flushed on `close()`, which is also registered to run at
+    interpreter exit.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        write_batch: Callable[[List[Sequence]], None],
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        block_timeout: float = 0.0
+    ):
+        self.name = name
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block_timeout = block_timeout
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._stats = {
+            'enqueued': 0,
+            'written': 0,
+            'dropped': 0,
+            'batches': 0,
+            'failed_batches': 0,
+            'failed_rows': 0,
+        }
+        self._thread = threading.Thread(target=self._run, name=f'log-writer-{name}', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, row: Sequence) -> bool:
+        """
+        Enqueue a row for writing.
+
+        Returns:
+            bool: False if the row was dropped because the queue stayed full.
+        """
+        if self._stop.is_set():
+            self._count('dropped')
+            return False
+        try:
+            if self.block_timeout > 0:
+                self._queue.put(row, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(row)
+        except queue.Full:
+            self._count('dropped')
+            return False
+        self._count('enqueued')
+        return True
+
+    def flush(self):
+        """Block until every row enqueued so far has been written (or failed)."""
+        self._wake.set()
+        self._queue.join()
+
+    def close(self, timeout: float = 10.0):
+        """Stop accepting rows, flush what is queued and stop the writer thread."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for enqueued, written, dropped and failed rows, plus current queue depth."""
+        with self._lock:
+            return {**self._stats, 'queued': self._queue.qsize()}
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _run(self):
+        batch: List[Sequence] = []
+        deadline: Optional[float] = None
+        while True:
+            stopping = self._stop.is_set()
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get_nowait())
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_interval
+            except queue.Empty:
+                pass
+
+            due = deadline is not None and time.monotonic() >= deadline
+            if batch and (len(batch) >= self.batch_size or due or stopping or self._wake.is_set()):
+                self._write(batch)
+                batch = []
+                deadline = None
+                continue
+
+            if stopping:
+                return
+            self._wake.clear()
+            timeout = self.flush_interval if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+            except queue.Empty:
+                pass
+
+    def _write(self, batch: List[Sequence]):
+        try:
+            self.write_batch(batch)
+            self._count('written', len(batch))
+            self._count('batches')
+        except Exception as e:
+            self._count('failed_batches')
+            self._count('failed_rows', len(batch))
+            logging.error(f"Log writer '{self.name}' failed to write {len(batch)} rows: {e}")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
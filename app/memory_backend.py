@@ -0,0 +1,134 @@
+# memory_backend.py
+
+import logging
+import os
+import threading
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import httpx
+from dotenv import load_dotenv
+from zep_python.client import Zep
+
+load_dotenv()
+
+ZEP_COLLECTION_NAME = "crewai_agents"
+# Upper bound for the whole bootstrap and for each HTTP call it makes
+ZEP_BOOTSTRAP_TIMEOUT = float(os.getenv('ZEP_BOOTSTRAP_TIMEOUT', '5'))
+# Size of the HTTP connection pool shared by all Zep clients in the process
+ZEP_HTTP_MAX_CONNECTIONS = int(os.getenv('ZEP_HTTP_MAX_CONNECTIONS', '20'))
+ZEP_HTTP_TIMEOUT = float(os.getenv('ZEP_HTTP_TIMEOUT', '60'))
+
+class MemoryStatus(NamedTuple):
+    state: str  # 'disabled', 'pending', 'ready', 'skipped', 'timeout' or 'error'
+    message: str
+
+_http_client: Optional[httpx.Client] = None
+_clients: Dict[Tuple[Optional[str], Optional[str]], Zep] = {}
+_clients_lock = threading.Lock()
+
+_status = MemoryStatus('pending', "Memory backend setup has not started")
+_started_at: Optional[float] = None
+_bootstrap_thread: Optional[threading.Thread] = None
+_bootstrap_lock = threading.Lock()
+
+def _set_status(state: str, message: str):
+    global _status
+    _status = MemoryStatus(state, message)
+
+def _get_http_client() -> httpx.Client:
+    # Callers hold _clients_lock
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.Client(
+            timeout=ZEP_HTTP_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=ZEP_HTTP_MAX_CONNECTIONS)
+        )
+    return _http_client
+
+def get_memory_client(base_url: Optional[str] = None, api_key: Optional[str] = None) -> Zep:
+    """
+    Return the process-wide Zep client for a base URL and API key.
+
+    Clients are created on first use, one per (base_url, api_key), and all
+    share a single HTTP connection pool.
+
+    Args:
+        base_url (str, optional): Zep server URL; defaults to ZEP_BASE_URL.
+        api_key (str, optional): Zep API key; defaults to ZEP_API_KEY.
+
+    Returns:
+        Zep: The shared client.
+    """
+    key = (base_url or os.getenv('ZEP_BASE_URL'), api_key or os.getenv('ZEP_API_KEY'))
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = Zep(base_url=key[0], api_key=key[1], httpx_client=_get_http_client())
+    return client
+
+def setup_zep_collection():
+    """Create the agents collection in Zep if it does not exist yet"""
+    with _clients_lock:
+        http_client = _get_http_client()
+    client = Zep(
+        api_key=os.getenv('ZEP_API_KEY'),
+        base_url=os.getenv('ZEP_BASE_URL'),
+        timeout=ZEP_BOOTSTRAP_TIMEOUT,
+        httpx_client=http_client
+    )
+    # Document collections only exist in clients exposing the document API
+    documents = getattr(client, 'document', None)
+    if documents is None:
+        _set_status('skipped', "Zep client has no document collections; using session memory only")
+        return
+
+    existing_collections = documents.list_collections()
+    if ZEP_COLLECTION_NAME not in [col.name for col in existing_collections]:
+        documents.add_collection(
+            name=ZEP_COLLECTION_NAME,
+            description="Collection for CrewAI agents",
+            metadata={"project": "CrewAI"}
+        )
+        _set_status('ready', f"Collection '{ZEP_COLLECTION_NAME}' created")
+    else:
+        _set_status('ready', f"Collection '{ZEP_COLLECTION_NAME}' already exists")
+
+def _bootstrap():
+    try:
+        setup_zep_collection()
+    except Exception as e:
+        logging.error(f"Error accessing Zep collections: {e}")
+        _set_status('error', f"Error accessing Zep collections: {e}")
+
+def start_memory_bootstrap():
+    """
+    Set up the Zep memory backend in the background, once per process.
+
+    Returns immediately; later calls are no-ops. Use `memory_status()` to
+    see how the setup went.
+    """
+    global _bootstrap_thread, _started_at
+    if _bootstrap_thread is not None or _status.state == 'disabled':
+        return
+    with _bootstrap_lock:
+        if _bootstrap_thread is not None or _status.state == 'disabled':
+            return
+        if not os.getenv('ZEP_API_KEY'):
+            _set_status('disabled', "ZEP_API_KEY is not set")
+            return
+        _set_status('pending', "Setting up the Zep memory backend")
+        _started_at = time.monotonic()
+        _bootstrap_thread = threading.Thread(target=_bootstrap, name='zep-bootstrap', daemon=True)
+        _bootstrap_thread.start()
+
+def memory_status() -> MemoryStatus:
+    """Return the cached result of the memory backend setup"""
+    status = _status
+    if (status.state == 'pending' and _started_at is not None
+            and time.monotonic() - _started_at > ZEP_BOOTSTRAP_TIMEOUT):
+        return MemoryStatus('timeout', f"Zep did not respond within {ZEP_BOOTSTRAP_TIMEOUT:g}s")
+    return status
@@ -0,0 +1,326 @@
+# models.py
+#
+# Pure domain model for agents, tasks and crews. Nothing here touches
+# Streamlit, so these objects can be built in any thread, pickled to worker
+# processes and compiled into crewai objects there. The Streamlit views
+# (MyAgent, MyTask, MyCrew) subclass these and add editing and drawing.
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from crewai import Agent, Crew, Task
+from agentops import record_action
+
+from base_tool import MyTool
+from core_utils import rnd_id
+from crew_cache import content_hash, get_agent, get_crew_agents
+from llms import llm_providers_and_models
+from memory_backend import get_memory_client
+from task_scheduler import RunTask, TaskGraphError, kickoff_graph, task_dependencies, topological_order
+
+@dataclass(slots=True, eq=False)
+class AgentModel:
+    id: Optional[str] = None
+    role: Optional[str] = None
+    backstory: Optional[str] = None
+    goal: Optional[str] = None
+    temperature: Optional[float] = None
+    allow_delegation: bool = False
+    verbose: bool = False
+    cache: Optional[bool] = None
+    llm_provider_model: Optional[str] = None
+    max_iter: Optional[int] = None
+    created_at: Optional[str] = None
+    tools: List[MyTool] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.id = self.id or "A_" + rnd_id()
+        self.role = self.role or "Senior Researcher"
+        self.backstory = self.backstory or "Driven by curiosity, you're at the forefront of innovation, eager to explore and share knowledge that could change the world."
+        self.goal = self.goal or "Uncover groundbreaking technologies in AI"
+        self.temperature = self.temperature or 0.1
+        self.llm_provider_model = llm_providers_and_models()[0] if self.llm_provider_model is None else self.llm_provider_model
+        self.created_at = self.created_at or datetime.now().isoformat()
+        self.tools = self.tools or []
+        self.max_iter = self.max_iter or 25
+        self.cache = self.cache if self.cache is not None else True
+
+    @property
+    def client(self):
+        """The shared Zep client, created on first access"""
+        return get_memory_client()
+
+    @property
+    def collection(self):
+        """Zep memory API, resolved on first access"""
+        return self.client.memory
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'AgentModel':
+        return cls(
+            id=data.get('id'),
+            role=data.get('role'),
+            backstory=data.get('backstory'),
+            goal=data.get('goal'),
+            temperature=data.get('temperature'),
+            allow_delegation=data.get('allow_delegation', False),
+            verbose=data.get('verbose', False),
+            cache=data.get('cache', True),
+            llm_provider_model=data.get('llm_provider_model'),
+            max_iter=data.get('max_iter', 25),
+            created_at=data.get('created_at'),
+            tools=[MyTool.from_dict(tool) for tool in data.get('tools', [])]
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "role": self.role,
+            "backstory": self.backstory,
+            "goal": self.goal,
+            "temperature": self.temperature,
+            "allow_delegation": self.allow_delegation,
+            "verbose": self.verbose,
+            "cache": self.cache,
+            "llm_provider_model": self.llm_provider_model,
+            "max_iter": self.max_iter,
+            "created_at": self.created_at,
+            "tools": [tool.to_dict() for tool in self.tools]
+        }
+
+    def content_hash(self) -> str:
+        """Hash of what the agent compiles to; equal agents hash equally whatever their id"""
+        return content_hash(self.to_dict())
+
+    def validation_errors(self) -> List[str]:
+        """Problems that keep the agent from running; empty when it is valid"""
+        return [f"Tool {tool.name} is not valid" for tool in self.tools if not tool.is_valid()]
+
+    @record_action("get_crewai_agent")
+    def get_crewai_agent(self) -> Agent:
+        """A crewai Agent for one run, built from cached LLM and tools (see crew_cache)"""
+        return get_agent(self)
+
+@dataclass(slots=True, eq=False)
+class TaskModel:
+    id: Optional[str] = None
+    description: Optional[str] = None
+    expected_output: Optional[str] = None
+    agent: Optional[AgentModel] = None
+    async_execution: Optional[bool] = False
+    created_at: Optional[str] = None
+    context_from_async_tasks_ids: List[str] = field(default_factory=list)
+    context_from_sync_tasks_ids: List[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.id = self.id or "T_" + rnd_id()
+        self.description = self.description or "Identify the next big trend in AI. Focus on identifying pros and cons and the overall narrative."
+        self.expected_output = self.expected_output or "A comprehensive 3 paragraphs long report on the latest AI trends."
+        self.async_execution = self.async_execution or False
+        self.context_from_async_tasks_ids = self.context_from_async_tasks_ids or []
+        self.context_from_sync_tasks_ids = self.context_from_sync_tasks_ids or []
+        self.created_at = self.created_at or datetime.now().isoformat()
+
+    @classmethod
+    def _agent_class(cls):
+        """Class that from_dict builds the agent with; views return their own"""
+        return AgentModel
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TaskModel':
+        agent = cls._agent_class().from_dict(data['agent']) if data.get('agent') else None
+        return cls(
+            id=data.get('id'),
+            description=data.get('description'),
+            expected_output=data.get('expected_output'),
+            agent=agent,
+            async_execution=data.get('async_execution', False),
+            context_from_async_tasks_ids=data.get('context_from_async_tasks_ids', []),
+            context_from_sync_tasks_ids=data.get('context_from_sync_tasks_ids', []),
+            created_at=data.get('created_at')
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "description": self.description,
+            "expected_output": self.expected_output,
+            "agent": self.agent.to_dict() if self.agent else None,
+            "async_execution": self.async_execution,
+            "context_from_async_tasks_ids": self.context_from_async_tasks_ids,
+            "context_from_sync_tasks_ids": self.context_from_sync_tasks_ids,
+            "created_at": self.created_at
+        }
+
+    def validation_errors(self) -> List[str]:
+        """Problems that keep the task from running; empty when it is valid"""
+        if not self.agent:
+            return [f"Task {self.description} has no agent"]
+        return self.agent.validation_errors()
+
+    def get_crewai_task(self, context_from_async_tasks: Optional[List[Task]] = None, context_from_sync_tasks: Optional[List[Task]] = None,
+                        agent: Optional[Agent] = None) -> Task:
+        """
+        Build the crewai Task.
+
+        Args:
+            agent (Agent): The compiled agent to run the task with; compiled
+                from self.agent when not given.
+        """
+        if agent is None and self.agent:
+            agent = self.agent.get_crewai_agent()
+        context = []
+        if context_from_async_tasks:
+            context.extend(context_from_async_tasks)
+        if context_from_sync_tasks:
+            context.extend(context_from_sync_tasks)
+
+        if context:
+            return RunTask(
+                description=self.description,
+                expected_output=self.expected_output,
+                async_execution=self.async_execution,
+                agent=agent,
+                context=context
+            )
+        else:
+            return RunTask(
+                description=self.description,
+                expected_output=self.expected_output,
+                async_execution=self.async_execution,
+                agent=agent
+            )
+
+@dataclass(slots=True, eq=False)
+class CrewModel:
+    id: Optional[str] = None
+    name: Optional[str] = None
+    description: Optional[str] = None
+    goal: Optional[str] = None
+    agents: List[AgentModel] = field(default_factory=list)
+    tasks: List[TaskModel] = field(default_factory=list)
+    created_at: Optional[str] = None
+    # 1 runs the tasks one after another; more runs them as a dependency graph
+    max_parallel_tasks: Optional[int] = None
+
+    def __post_init__(self):
+        self.id = self.id or "C_" + rnd_id()
+        self.name = self.name or "Research Crew"
+        self.description = self.description or "A crew focused on researching and analyzing AI trends."
+        self.goal = self.goal or "Identify and analyze emerging AI trends and their potential impact."
+        self.agents = self.agents or []
+        self.tasks = self.tasks or []
+        self.created_at = self.created_at or datetime.now().isoformat()
+        self.max_parallel_tasks = self.max_parallel_tasks or 1
+
+    @classmethod
+    def _agent_class(cls):
+        """Class that from_dict builds agents with; views return their own"""
+        return AgentModel
+
+    @classmethod
+    def _task_class(cls):
+        """Class that from_dict builds tasks with; views return their own"""
+        return TaskModel
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CrewModel':
+        return cls(
+            id=data.get('id'),
+            name=data.get('name'),
+            description=data.get('description'),
+            goal=data.get('goal'),
+            agents=[cls._agent_class().from_dict(agent_data) for agent_data in data.get('agents', [])],
+            tasks=[cls._task_class().from_dict(task_data) for task_data in data.get('tasks', [])],
+            created_at=data.get('created_at'),
+            max_parallel_tasks=data.get('max_parallel_tasks', 1)
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "goal": self.goal,
+            "agents": [agent.to_dict() for agent in self.agents],
+            "tasks": [task.to_dict() for task in self.tasks],
+            "created_at": self.created_at,
+            "max_parallel_tasks": self.max_parallel_tasks
+        }
+
+    def validation_errors(self) -> List[str]:
+        """Problems that keep the crew from running; empty when it is valid"""
+        if not self.agents:
+            return [f"Crew {self.name} has no agents"]
+        if not self.tasks:
+            return [f"Crew {self.name} has no tasks"]
+        for member in [*self.agents, *self.tasks]:
+            errors = member.validation_errors()
+            if errors:
+                return errors
+        try:
+            topological_order(self.tasks)
+        except TaskGraphError as e:
+            return [str(e)]
+        return []
+
+    def ordered_tasks(self) -> List[TaskModel]:
+        """The tasks with every task after the tasks whose output it uses; as listed if that is impossible"""
+        try:
+            return topological_order(self.tasks)
+        except TaskGraphError:
+            return list(self.tasks)
+
+    def content_hash(self) -> str:
+        """Hash of the whole crew definition, including the ids that link its parts"""
+        return content_hash(self.to_dict(), ignore=('created_at',))
+
+    def get_crewai_crew(self, **crew_kwargs) -> Crew:
+        """
+        Compile the crew, tasks in dependency order (see ordered_tasks) and
+        with the outputs of the tasks they depend on as context.
+
+        Raises:
+            TaskGraphError: If the task dependencies are not a valid graph.
+        """
+        # Every agent is compiled once per run and shared by the tasks it runs
+        compiled = get_crew_agents(self)
+        agents = [compiled[agent.id] for agent in self.agents]
+        tasks: Dict[str, Task] = {}
+        for task in topological_order(self.tasks):
+            tasks[task.id] = task.get_crewai_task(
+                context_from_async_tasks=[tasks[task_id] for task_id in task.context_from_async_tasks_ids],
+                context_from_sync_tasks=[tasks[task_id] for task_id in task.context_from_sync_tasks_ids],
+                agent=compiled[task.agent.id] if task.agent else None
+            )
+            if self.max_parallel_tasks > 1:
+                # The task graph scheduler decides what runs concurrently
+                tasks[task.id].async_execution = False
+        crew_kwargs.setdefault('verbose', True)
+        return Crew(
+            agents=agents,
+            tasks=list(tasks.values()),
+            **crew_kwargs
+        )
+
+    def kickoff(self, crewai_crew: Crew, inputs: Optional[Dict[str, Any]] = None, reporter=None):
+        """
+        Run a crew compiled by get_crewai_crew.
+
+        With max_parallel_tasks = 1 this is crewai's sequential kickoff;
+        otherwise the tasks run as a dependency graph (see task_scheduler),
+        reported to `reporter` rather than through the crew's callbacks.
+        """
+        if self.max_parallel_tasks <= 1:
+            return crewai_crew.kickoff(inputs=inputs or {})
+        ordered = topological_order(self.tasks)
+        position = {task.id: index for index, task in enumerate(ordered)}
+        dependencies = task_dependencies(ordered)
+        return kickoff_graph(
+            crewai_crew,
+            {position[task.id]: [position[task_id] for task_id in dependencies[task.id]] for task in ordered},
+            inputs,
+            max_parallel=self.max_parallel_tasks,
+            reporter=reporter
+        )
@@ -1,118 +1,36 @@
 # my_agent.py
 
-from crewai import Agent
 import streamlit as st
 from utils import fix_columns_width
 from core_utils import rnd_id
 from streamlit import session_state as ss
 import db_utils
-from llms import llm_providers_and_models, create_llm
-from datetime import datetime
+from llms import llm_providers_and_models
 import agentops
 from agentops import track_agent, record_tool, record_action, record, ActionEvent
-import os
 from dotenv import load_dotenv
 from my_tools import MyTool 
-from zep_python.client import Zep
-from typing import Optional, List, Dict, Any
+from models import AgentModel
+from typing import Optional, Any
 
 load_dotenv()
 
 @track_agent(name="CrewAI_Agent")
-class MyAgent:
-    def __init__(
-        self, 
-        id: Optional[str] = None, 
-        role: Optional[str] = None, 
-        backstory: Optional[str] = None, 
-        goal: Optional[str] = None, 
-        temperature: Optional[float] = None, 
-        allow_delegation: bool = False, 
-        verbose: bool = False, 
-        cache: Optional[bool] = None, 
-        llm_provider_model: Optional[str] = None, 
-        max_iter: Optional[int] = None, 
-        created_at: Optional[str] = None, 
-        tools: Optional[List[MyTool]] = None
-    ):
-        self.client = Zep(
-            api_key=os.getenv('ZEP_API_KEY'),
-            base_url=os.getenv('ZEP_BASE_URL'),
-        )
-        self.id = id or "A_" + rnd_id()
-        self.role = role or "Senior Researcher"
-        self.backstory = backstory or "Driven by curiosity, you're at the forefront of innovation, eager to explore and share knowledge that could change the world."
-        self.goal = goal or "Uncover groundbreaking technologies in AI"
-        self.temperature = temperature or 0.1
-        self.allow_delegation = allow_delegation
-        self.verbose = verbose
-        self.llm_provider_model = llm_providers_and_models()[0] if llm_provider_model is None else llm_provider_model
-        self.created_at = created_at or datetime.now().isoformat()
-        self.tools = tools or []
-        self.max_iter = max_iter or 25
-        self.cache = cache if cache is not None else True
-        self.edit_key = f'edit_{self.id}'
-        self.collection = self.client.memory
-        if self.edit_key not in ss:
-            ss[self.edit_key] = False
+class MyAgent(AgentModel):
+    """Streamlit view of an agent; its edit state lives in session state, not on the object."""
 
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'MyAgent':
-        return cls(
-            id=data.get('id'),
-            role=data.get('role'),
-            backstory=data.get('backstory'),
-            goal=data.get('goal'),
-            temperature=data.get('temperature'),
-            allow_delegation=data.get('allow_delegation', False),
-            verbose=data.get('verbose', False),
-            cache=data.get('cache', True),
-            llm_provider_model=data.get('llm_provider_model'),
-            max_iter=data.get('max_iter', 25),
-            created_at=data.get('created_at'),
-            tools=[MyTool.from_dict(tool) for tool in data.get('tools', [])]
-        )
-
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "id": self.id,
-            "role": self.role,
-            "backstory": self.backstory,
-            "goal": self.goal,
-            "temperature": self.temperature,
-            "allow_delegation": self.allow_delegation,
-            "verbose": self.verbose,
-            "cache": self.cache,
-            "llm_provider_model": self.llm_provider_model,
-            "max_iter": self.max_iter,
-            "created_at": self.created_at,
-            "tools": [tool.to_dict() for tool in self.tools]
-        }
+    @property
+    def edit_key(self) -> str:
+        return f'edit_{self.id}'
 
     @property
     def edit(self):
-        return ss[self.edit_key]
+        return ss.get(self.edit_key, False)
 
     @edit.setter
     def edit(self, value):
         ss[self.edit_key] = value
 
-    @record_action("get_crewai_agent")
-    def get_crewai_agent(self) -> Agent:
-        llm = create_llm(self.llm_provider_model, temperature=self.temperature)
-        tools = [tool.create_tool() for tool in self.tools]
-        return Agent(
-            role=self.role,
-            backstory=self.backstory,
-            goal=self.goal,
-            allow_delegation=self.allow_delegation,
-            verbose=self.verbose,
-            max_iter=self.max_iter,
-            cache=self.cache,
-            tools=tools,
-            llm=llm
-        )
-
     @record_action("delete_agent")
     def delete(self):
         ss.agents = [agent for agent in ss.agents if agent.id != self.id]
@@ -126,12 +44,10 @@ class MyAgent:
 
     @record_action("validate_agent")
     def is_valid(self, show_warning: bool = False) -> bool:
-        for tool in self.tools:
-            if not tool.is_valid(show_warning=show_warning):
-                if show_warning:
-                    st.warning(f"Tool {tool.name} is not valid")
-                return False
-        return True
+        errors = self.validation_errors()
+        if errors and show_warning:
+            st.warning(errors[0])
+        return not errors
 
     def validate_llm_provider_model(self):
         available_models = llm_providers_and_models()
@@ -1,101 +1,47 @@
 # my_crew.py
 
-from crewai import Crew
 import streamlit as st
 from streamlit import session_state as ss
 from utils import fix_columns_width
 from core_utils import rnd_id
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional
+from models import CrewModel
 import db_utils
 
-class MyCrew:
-    def __init__(
-        self, 
-        id: Optional[str] = None, 
-        name: Optional[str] = None, 
-        description: Optional[str] = None, 
-        goal: Optional[str] = None, 
-        agents: Optional[List['MyAgent']] = None, 
-        tasks: Optional[List['MyTask']] = None, 
-        created_at: Optional[str] = None, 
-        **kwargs
-    ):
-        self.id = id or "C_" + rnd_id()
-        self.name = name or "Research Crew"
-        self.description = description or "A crew focused on researching and analyzing AI trends."
-        self.goal = goal or "Identify and analyze emerging AI trends and their potential impact."
-        self.agents = agents or []
-        self.tasks = tasks or []
-        self.created_at = created_at or datetime.now().isoformat()
-        self.edit_key = f'edit_{self.id}'
-        if self.edit_key not in ss:
-            ss[self.edit_key] = False
+class MyCrew(CrewModel):
+    """Streamlit view of a crew; its edit state lives in session state, not on the object."""
 
     @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'MyCrew':
+    def _agent_class(cls):
         from my_agent import MyAgent  # Import here to avoid circular imports
+        return MyAgent
+
+    @classmethod
+    def _task_class(cls):
         from my_task import MyTask  # Import here to avoid circular imports
-        agents = [MyAgent.from_dict(agent_data) for agent_data in data.get('agents', [])]
-        tasks = [MyTask.from_dict(task_data) for task_data in data.get('tasks', [])]
-        return cls(
-            id=data.get('id'),
-            name=data.get('name'),
-            description=data.get('description'),
-            goal=data.get('goal'),
-            agents=agents,
-            tasks=tasks,
-            created_at=data.get('created_at')
-        )
+        return MyTask
 
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "id": self.id,
-            "name": self.name,
-            "description": self.description,
-            "goal": self.goal,
-            "agents": [agent.to_dict() for agent in self.agents],
-            "tasks": [task.to_dict() for task in self.tasks],
-            "created_at": self.created_at
-        }
+    @property
+    def edit_key(self) -> str:
+        return f'edit_{self.id}'
 
     @property
     def edit(self):
-        return ss[self.edit_key]
+        return ss.get(self.edit_key, False)
 
     @edit.setter
     def edit(self, value):
         ss[self.edit_key] = value
 
-    def get_crewai_crew(self) -> Crew:
-        agents = [agent.get_crewai_agent() for agent in self.agents]
-        tasks = [task.get_crewai_task() for task in self.tasks]
-        return Crew(
-            agents=agents,
-            tasks=tasks,
-            verbose=True
-        )
-
     def delete(self):
         ss.crews = [crew for crew in ss.crews if crew.id != self.id]
         db_utils.delete_crew(self.id)
 
     def is_valid(self, show_warning: bool = False) -> bool:
-        if not self.agents:
-            if show_warning:
-                st.warning(f"Crew {self.name} has no agents")
-            return False
-        if not self.tasks:
-            if show_warning:
-                st.warning(f"Crew {self.name} has no tasks")
-            return False
-        for agent in self.agents:
-            if not agent.is_valid(show_warning):
-                return False
-        for task in self.tasks:
-            if not task.is_valid(show_warning):
-                return False
-        return True
+        errors = self.validation_errors()
+        if errors and show_warning:
+            st.warning(errors[0])
+        return not errors
 
     def draw(self, key: Optional[str] = None):
         expander_title = f"{self.name}" if self.is_valid() else f"❗ {self.name}"
@@ -117,6 +63,13 @@ class MyCrew:
                         default=self.tasks,
                         format_func=lambda x: x.description[:120]
                     )
+                    self.max_parallel_tasks = st.number_input(
+                        "Parallel tasks",
+                        value=self.max_parallel_tasks,
+                        min_value=1,
+                        max_value=16,
+                        help="Above 1, a task starts as soon as the tasks it takes context from are done, with up to this many running at once"
+                    )
                     submitted = st.form_submit_button("Save")
                     if submitted:
                         self.set_editable(False)
@@ -128,6 +81,7 @@ class MyCrew:
                 st.markdown(f"**Goal:** {self.goal}")
                 st.markdown(f"**Agents:** {[agent.role for agent in self.agents]}")
                 st.markdown(f"**Tasks:** {[task.description[:120] for task in self.tasks]}")
+                st.markdown(f"**Parallel tasks:** {self.max_parallel_tasks}")
 
                 col1, col2 = st.columns(2)
                 with col1:
@@ -1,66 +1,64 @@
 # my_tools.py
+#
+# Tool backends (crewai_tools, langchain_community, docker) are heavy to
+# import, so every wrapper below imports its backend inside create_tool().
+# Name, description and parameters are class-level data, which is all
+# TOOL_REGISTRY and the Tools page need.
 
 from agentops import record_tool
-from crewai_tools import (
-    CodeInterpreterTool as MyCodeInterpreterTool, ScrapeElementFromWebsiteTool, TXTSearchTool, SeleniumScrapingTool,
-    PGSearchTool, PDFSearchTool, MDXSearchTool, JSONSearchTool, GithubSearchTool,
-    EXASearchTool, DOCXSearchTool, CSVSearchTool, ScrapeWebsiteTool, FileReadTool,
-    DirectorySearchTool, DirectoryReadTool, CodeDocsSearchTool, YoutubeVideoSearchTool,
-    SerperDevTool, YoutubeChannelSearchTool, WebsiteSearchTool
-)
-from custom_tools import CustomApiTool, MyCustomFileWriteTool, CustomCodeInterpreterTool
-from langchain_community.tools import YahooFinanceNewsTool
-import streamlit as st
 import os
 from core_utils import rnd_id
 import json
 from datetime import datetime
+from typing import Any, Dict, NamedTuple, Type
 from base_tool import MyTool
 
 class MyScrapeWebsiteTool(MyTool):
+    name = 'ScrapeWebsiteTool'
+    description = "A tool that can be used to read website content."
+    parameters_metadata = {
+        'website_url': {'mandatory': False}
+    }
+
     def __init__(self, tool_id=None, website_url=None):
-        parameters = {
-            'website_url': {'mandatory': False}
-        }
-        if website_url:
-            parameters['website_url'] = website_url
-        super().__init__(tool_id, 'ScrapeWebsiteTool', "A tool that can be used to read website content.", parameters)
+        super().__init__(tool_id, parameters={'website_url': website_url})
 
     @record_tool('ScrapeWebsiteTool')
-    def create_tool(self) -> ScrapeWebsiteTool:
+    def create_tool(self) -> 'ScrapeWebsiteTool':
+        from crewai_tools import ScrapeWebsiteTool
         return ScrapeWebsiteTool(self.parameters.get('website_url') if self.parameters.get('website_url') else None)
 
 class MyFileReadTool(MyTool):
+    name = 'FileReadTool'
+    description = "A tool that can be used to read a file's content."
+    parameters_metadata = {
+        'file_path': {'mandatory': False}
+    }
+
     def __init__(self, tool_id=None, file_path=None):
-        parameters = {
-            'file_path': {'mandatory': False}
-        }
-        if file_path:
-            parameters['file_path'] = file_path
-        super().__init__(tool_id, 'FileReadTool', "A tool that can be used to read a file's content.", parameters)
+        super().__init__(tool_id, parameters={'file_path': file_path})
 
     @record_tool('FileReadTool')
-    def create_tool(self) -> FileReadTool:
-        if self.parameters.get('file_path'):
-            self.parameters['file_path'] = self._validate_path(self.parameters['file_path'])
-        return FileReadTool(self.parameters.get('file_path'))
+    def create_tool(self) -> 'FileReadTool':
+        from crewai_tools import FileReadTool
+        file_path = self.parameters.get('file_path')
+        if file_path:
+            file_path = self._validate_path(file_path)
+        return FileReadTool(file_path)
 
 class MyDirectorySearchTool(MyTool):
+    name = 'DirectorySearchTool'
+    description = "A tool that can be used for semantic search queries within a directory's content."
+    parameters_metadata = {
+        'directory': {'mandatory': True}
+    }
+
     def __init__(self, tool_id=None, directory=None):
-        parameters = {
-            'directory': {'mandatory': True}
-        }
-        if directory:
-            parameters['directory'] = directory
-        super().__init__(
-            tool_id, 
-            'DirectorySearchTool',
-            "A tool that can be used for semantic search queries within a directory's content.",
-            parameters
-        )
-        
-        self.workspace_root = os.path.abspath(os.getenv('WORKSPACE_DIR', './workspace'))
-        os.makedirs(self.workspace_root, exist_ok=True)
+        super().__init__(tool_id, parameters={'directory': directory})
+
+    @property
+    def workspace_root(self) -> str:
+        return os.path.abspath(os.getenv('WORKSPACE_DIR', './workspace'))
 
     def _create_directory(self, directory: str) -> str:
         rel_path = os.path.normpath(directory).lstrip('/')
@@ -75,7 +73,8 @@ class MyDirectorySearchTool(MyTool):
         return abs_path
 
     @record_tool('DirectorySearchTool')
-    def create_tool(self) -> DirectorySearchTool:
+    def create_tool(self) -> 'DirectorySearchTool':
+        from crewai_tools import DirectorySearchTool
         directory = self.parameters.get('directory')
         if not directory:
             raise ValueError("Directory parameter is required")
@@ -95,149 +94,173 @@ class MyDirectorySearchTool(MyTool):
             raise ValueError(f"Failed to initialize directory tool: {str(e)}")
         
 class MyDirectoryReadTool(MyTool):
+    name = 'DirectoryReadTool'
+    description = "Use the tool to list the contents of the specified directory."
+    parameters_metadata = {
+        'directory_contents': {'mandatory': True}
+    }
+
     def __init__(self, tool_id=None, directory_contents=None):
-        parameters = {
-            'directory_contents': {'mandatory': True}
-        }
-        if directory_contents:
-            parameters['directory_contents'] = directory_contents
-        super().__init__(tool_id, 'DirectoryReadTool', "Use the tool to list the contents of the specified directory.", parameters)
+        super().__init__(tool_id, parameters={'directory_contents': directory_contents})
 
     @record_tool('DirectoryReadTool')
-    def create_tool(self) -> DirectoryReadTool:
-        if self.parameters.get('directory_contents'):
-            self.parameters['directory_contents'] = self._validate_path(self.parameters['directory_contents'])
-        return DirectoryReadTool(self.parameters.get('directory_contents'))
+    def create_tool(self) -> 'DirectoryReadTool':
+        from crewai_tools import DirectoryReadTool
+        directory_contents = self.parameters.get('directory_contents')
+        if directory_contents:
+            directory_contents = self._validate_path(directory_contents)
+        return DirectoryReadTool(directory_contents)
 
 class MyCodeDocsSearchTool(MyTool):
+    name = 'CodeDocsSearchTool'
+    description = "A tool that can be used to search through code documentation."
+    parameters_metadata = {
+        'code_docs': {'mandatory': False}
+    }
+
     def __init__(self, tool_id=None, code_docs=None):
-        parameters = {
-            'code_docs': {'mandatory': False}
-        }
-        if code_docs:
-            parameters['code_docs'] = code_docs
-        super().__init__(tool_id, 'CodeDocsSearchTool', "A tool that can be used to search through code documentation.", parameters)
+        super().__init__(tool_id, parameters={'code_docs': code_docs})
 
     @record_tool('CodeDocsSearchTool')
-    def create_tool(self) -> CodeDocsSearchTool:
-        if self.parameters.get('code_docs'):
-            self.parameters['code_docs'] = self._validate_path(self.parameters['code_docs'])
-        return CodeDocsSearchTool(self.parameters.get('code_docs'))
+    def create_tool(self) -> 'CodeDocsSearchTool':
+        from crewai_tools import CodeDocsSearchTool
+        code_docs = self.parameters.get('code_docs')
+        if code_docs:
+            code_docs = self._validate_path(code_docs)
+        return CodeDocsSearchTool(code_docs)
 
 class MyYoutubeVideoSearchTool(MyTool):
+    name = 'YoutubeVideoSearchTool'
+    description = "A tool that can be used for semantic search queries within YouTube video content."
+    parameters_metadata = {
+        'youtube_video_url': {'mandatory': False}
+    }
+
     def __init__(self, tool_id=None, youtube_video_url=None):
-        parameters = {
-            'youtube_video_url': {'mandatory': False}
-        }
-        if youtube_video_url:
-            parameters['youtube_video_url'] = youtube_video_url
-        super().__init__(tool_id, 'YoutubeVideoSearchTool', "A tool that can be used for semantic search queries within YouTube video content.", parameters)
+        super().__init__(tool_id, parameters={'youtube_video_url': youtube_video_url})
 
     @record_tool('YoutubeVideoSearchTool')
-    def create_tool(self) -> YoutubeVideoSearchTool:
+    def create_tool(self) -> 'YoutubeVideoSearchTool':
+        from crewai_tools import YoutubeVideoSearchTool
         return YoutubeVideoSearchTool(self.parameters.get('youtube_video_url'))
 
 class MySerperDevTool(MyTool):
+    name = 'SerperDevTool'
+    description = "A tool that can be used to search the internet with a search query."
+    parameters_metadata = {
+        'serper_api_key': {'mandatory': True}
+    }
+
     def __init__(self, tool_id=None, serper_api_key=None):
-        parameters = {
-            'serper_api_key': {'mandatory': True}
-        }
-        if serper_api_key:
-            parameters['serper_api_key'] = serper_api_key
-        super().__init__(tool_id, 'SerperDevTool', "A tool that can be used to search the internet with a search query.", parameters)
+        super().__init__(tool_id, parameters={'serper_api_key': serper_api_key})
 
     @record_tool('SerperDevTool')
-    def create_tool(self) -> SerperDevTool:
+    def create_tool(self) -> 'SerperDevTool':
+        from crewai_tools import SerperDevTool
         os.environ['SERPER_API_KEY'] = self.parameters.get('serper_api_key')
         return SerperDevTool()
 
 class MyYoutubeChannelSearchTool(MyTool):
+    name = 'YoutubeChannelSearchTool'
+    description = "A tool that can be used for semantic search queries within YouTube channel content."
+    parameters_metadata = {
+        'youtube_channel_handle': {'mandatory': False}
+    }
+
     def __init__(self, tool_id=None, youtube_channel_handle=None):
-        parameters = {
-            'youtube_channel_handle': {'mandatory': False}
-        }
-        if youtube_channel_handle:
-            parameters['youtube_channel_handle'] = youtube_channel_handle
-        super().__init__(tool_id, 'YoutubeChannelSearchTool', "A tool that can be used for semantic search queries within YouTube channel content.", parameters)
+        super().__init__(tool_id, parameters={'youtube_channel_handle': youtube_channel_handle})
 
     @record_tool('YoutubeChannelSearchTool')
-    def create_tool(self) -> YoutubeChannelSearchTool:
+    def create_tool(self) -> 'YoutubeChannelSearchTool':
+        from crewai_tools import YoutubeChannelSearchTool
         return YoutubeChannelSearchTool(self.parameters.get('youtube_channel_handle'))
 
 class MyWebsiteSearchTool(MyTool):
+    name = 'WebsiteSearchTool'
+    description = "A tool that can be used for semantic search queries within specific website content."
+    parameters_metadata = {
+        'website': {'mandatory': False}
+    }
+
     def __init__(self, tool_id=None, website=None):
-        parameters = {
-            'website': {'mandatory': False}
-        }
-        if website:
-            parameters['website'] = website
-        super().__init__(tool_id, 'WebsiteSearchTool', "A tool that can be used for semantic search queries within specific website content.", parameters)
+        super().__init__(tool_id, parameters={'website': website})
 
     @record_tool('WebsiteSearchTool')
-    def create_tool(self) -> WebsiteSearchTool:
+    def create_tool(self) -> 'WebsiteSearchTool':
+        from crewai_tools import WebsiteSearchTool
         return WebsiteSearchTool(self.parameters.get('website'))
    
 class MyCSVSearchTool(MyTool):
+    name = 'CSVSearchTool'
+    description = "A tool that can be used for semantic search queries within CSV content."
+    parameters_metadata = {
+        'csv': {'mandatory': False}
+    }
+
     def __init__(self, tool_id=None, csv=None):
-        parameters = {
-            'csv': {'mandatory': False}
-        }
-        if csv:
-            parameters['csv'] = csv
-        super().__init__(tool_id, 'CSVSearchTool', "A tool that can be used for semantic search queries within CSV content.", parameters)
+        super().__init__(tool_id, parameters={'csv': csv})
 
     @record_tool('CSVSearchTool')
-    def create_tool(self) -> CSVSearchTool:
-        if self.parameters.get('csv'):
-            self.parameters['csv'] = self._validate_path(self.parameters['csv'])
-        return CSVSearchTool(csv=self.parameters.get('csv'))
+    def create_tool(self) -> 'CSVSearchTool':
+        from crewai_tools import CSVSearchTool
+        csv = self.parameters.get('csv')
+        if csv:
+            csv = self._validate_path(csv)
+        return CSVSearchTool(csv=csv)
 
 class MyDocxSearchTool(MyTool):
+    name = 'DOCXSearchTool'
+    description = "A tool that can be used for semantic search queries within DOCX content."
+    parameters_metadata = {
+        'docx': {'mandatory': False}
+    }
+
     def __init__(self, tool_id=None, docx=None):
-        parameters = {
-            'docx': {'mandatory': False}
-        }
-        if docx:
-            parameters['docx'] = docx
-        super().__init__(tool_id, 'DOCXSearchTool', "A tool that can be used for semantic search queries within DOCX content.", parameters)
+        super().__init__(tool_id, parameters={'docx': docx})
 
     @record_tool('DOCXSearchTool')
-    def create_tool(self) -> DOCXSearchTool:
-        if self.parameters.get('docx'):
-            self.parameters['docx'] = self._validate_path(self.parameters['docx'])
-        return DOCXSearchTool(docx=self.parameters.get('docx'))
+    def create_tool(self) -> 'DOCXSearchTool':
+        from crewai_tools import DOCXSearchTool
+        docx = self.parameters.get('docx')
+        if docx:
+            docx = self._validate_path(docx)
+        return DOCXSearchTool(docx=docx)
     
 class MyEXASearchTool(MyTool):
+    name = 'EXASearchTool'
+    description = "A tool that can be used to search the internet with a search query."
+    parameters_metadata = {
+        'exa_api_key': {'mandatory': True}
+    }
+
     def __init__(self, tool_id=None, exa_api_key=None):
-        parameters = {
-            'exa_api_key': {'mandatory': True}
-        }
-        if exa_api_key:
-            parameters['exa_api_key'] = exa_api_key
-        super().__init__(tool_id, 'EXASearchTool', "A tool that can be used to search the internet with a search query.", parameters)
+        super().__init__(tool_id, parameters={'exa_api_key': exa_api_key})
 
     @record_tool('EXASearchTool')
-    def create_tool(self) -> EXASearchTool:
+    def create_tool(self) -> 'EXASearchTool':
+        from crewai_tools import EXASearchTool
         os.environ['EXA_API_KEY'] = self.parameters.get('exa_api_key')
         return EXASearchTool()
 
 class MyGithubSearchTool(MyTool):
+    name = 'GithubSearchTool'
+    description = "A tool that can be used for semantic search queries within a GitHub repository's content. Valid content_types: code, repo, pr, issue (comma separated)"
+    parameters_metadata = {
+        'github_repo': {'mandatory': False},
+        'gh_token': {'mandatory': True},
+        'content_types': {'mandatory': False}
+    }
+
     def __init__(self, tool_id=None, github_repo=None, gh_token=None, content_types=None):
-        parameters = {
-            'github_repo': {'mandatory': False},
-            'gh_token': {'mandatory': True},
-            'content_types': {'mandatory': False}
-        }
-        if github_repo:
-            parameters['github_repo'] = github_repo
-        if gh_token:
-            parameters['gh_token'] = gh_token
-        if content_types:
-            parameters['content_types'] = content_types
-        super().__init__(tool_id, 'GithubSearchTool', "A tool that can be used for semantic search queries within a GitHub repository's content. Valid content_types: code, repo, pr, issue (comma separated)", parameters)
+        super().__init__(tool_id, parameters={
+            'github_repo': github_repo,
+            'gh_token': gh_token,
+            'content_types': content_types
+        })
 
     @record_tool('GithubSearchTool')
-    def create_tool(self) -> GithubSearchTool:
+    def create_tool(self) -> 'GithubSearchTool':
+        from crewai_tools import GithubSearchTool
         content_types = self.parameters.get('content_types').split(",") if self.parameters.get('content_types') else ["code", "repo", "pr", "issue"]
         return GithubSearchTool(
             github_repo=self.parameters.get('github_repo'),
@@ -246,88 +269,95 @@ class MyGithubSearchTool(MyTool):
         )
 
 class MyJSONSearchTool(MyTool):
+    name = 'JSONSearchTool'
+    description = "A tool that can be used for semantic search queries within JSON content."
+    parameters_metadata = {
+        'json_path': {'mandatory': False}
+    }
+
     def __init__(self, tool_id=None, json_path=None):
-        parameters = {
-            'json_path': {'mandatory': False}
-        }
-        if json_path:
-            parameters['json_path'] = json_path
-        super().__init__(tool_id, 'JSONSearchTool', "A tool that can be used for semantic search queries within JSON content.", parameters)
+        super().__init__(tool_id, parameters={'json_path': json_path})
 
     @record_tool('JSONSearchTool')
-    def create_tool(self) -> JSONSearchTool:
-        if self.parameters.get('json_path'):
-            self.parameters['json_path'] = self._validate_path(self.parameters['json_path'])
-        return JSONSearchTool(json_path=self.parameters.get('json_path'))
+    def create_tool(self) -> 'JSONSearchTool':
+        from crewai_tools import JSONSearchTool
+        json_path = self.parameters.get('json_path')
+        if json_path:
+            json_path = self._validate_path(json_path)
+        return JSONSearchTool(json_path=json_path)
 
 class MyMDXSearchTool(MyTool):
+    name = 'MDXSearchTool'
+    description = "A tool that can be used for semantic search queries within MDX content."
+    parameters_metadata = {
+        'mdx': {'mandatory': False}
+    }
+
     def __init__(self, tool_id=None, mdx=None):
-        parameters = {
-            'mdx': {'mandatory': False}
-        }
-        if mdx:
-            parameters['mdx'] = mdx
-        super().__init__(tool_id, 'MDXSearchTool', "A tool that can be used for semantic search queries within MDX content.", parameters)
+        super().__init__(tool_id, parameters={'mdx': mdx})
 
     @record_tool('MDXSearchTool')
-    def create_tool(self) -> MDXSearchTool:
-        if self.parameters.get('mdx'):
-            self.parameters['mdx'] = self._validate_path(self.parameters['mdx'])
-        return MDXSearchTool(mdx=self.parameters.get('mdx'))
+    def create_tool(self) -> 'MDXSearchTool':
+        from crewai_tools import MDXSearchTool
+        mdx = self.parameters.get('mdx')
+        if mdx:
+            mdx = self._validate_path(mdx)
+        return MDXSearchTool(mdx=mdx)
     
 class MyPDFSearchTool(MyTool):
+    name = 'PDFSearchTool'
+    description = "A tool that can be used for semantic search queries within PDF content."
+    parameters_metadata = {
+        'pdf': {'mandatory': False}
+    }
+
     def __init__(self, tool_id=None, pdf=None):
-        parameters = {
-            'pdf': {'mandatory': False}
-        }
-        if pdf:
-            parameters['pdf'] = pdf
-        super().__init__(tool_id, 'PDFSearchTool', "A tool that can be used for semantic search queries within PDF content.", parameters)
+        super().__init__(tool_id, parameters={'pdf': pdf})
 
     @record_tool('PDFSearchTool')
-    def create_tool(self) -> PDFSearchTool:
-        if self.parameters.get('pdf'):
-            self.parameters['pdf'] = self._validate_path(self.parameters['pdf'])
-        return PDFSearchTool(self.parameters.get('pdf'))
+    def create_tool(self) -> 'PDFSearchTool':
+        from crewai_tools import PDFSearchTool
+        pdf = self.parameters.get('pdf')
+        if pdf:
+            pdf = self._validate_path(pdf)
+        return PDFSearchTool(pdf)
 
 class MyPGSearchTool(MyTool):
+    name = 'PGSearchTool'
+    description = "A tool that can be used to search a PostgreSQL database."
+    parameters_metadata = {
+        'db_uri': {'mandatory': True}
+    }
+
     def __init__(self, tool_id=None, db_uri=None):
-        parameters = {
-            'db_uri': {'mandatory': True}
-        }
-        if db_uri:
-            parameters['db_uri'] = db_uri
-        super().__init__(tool_id, 'PGSearchTool', "A tool that can be used to search a PostgreSQL database.", parameters)
+        super().__init__(tool_id, parameters={'db_uri': db_uri})
 
     @record_tool('PGSearchTool')
-    def create_tool(self) -> PGSearchTool:
+    def create_tool(self) -> 'PGSearchTool':
+        from crewai_tools import PGSearchTool
         return PGSearchTool(self.parameters.get('db_uri'))
 
 class MySeleniumScrapingTool(MyTool):
+    name = 'SeleniumScrapingTool'
+    description = "A tool that can be used to read specific parts of website content. CSS elements are separated by commas, cookies are in the format {key1:value1},{key2:value2}"
+    parameters_metadata = {
+        'website_url': {'mandatory': False},
+        'css_element': {'mandatory': False},
+        'cookie': {'mandatory': False},
+        'wait_time': {'mandatory': False}
+    }
+
     def __init__(self, tool_id=None, website_url=None, css_element=None, cookie=None, wait_time=None):
-        parameters = {
-            'website_url': {'mandatory': False},
-            'css_element': {'mandatory': False},
-            'cookie': {'mandatory': False},
-            'wait_time': {'mandatory': False}
-        }
-        if website_url:
-            parameters['website_url'] = website_url
-        if css_element:
-            parameters['css_element'] = css_element
-        if cookie:
-            parameters['cookie'] = cookie
-        if wait_time:
-            parameters['wait_time'] = wait_time
-        super().__init__(
-            tool_id, 
-            'SeleniumScrapingTool', 
-            "A tool that can be used to read specific parts of website content. CSS elements are separated by commas, cookies are in the format {key1:value1},{key2:value2}", 
-            parameters
-        )
+        super().__init__(tool_id, parameters={
+            'website_url': website_url,
+            'css_element': css_element,
+            'cookie': cookie,
+            'wait_time': wait_time
+        })
 
     @record_tool('SeleniumScrapingTool')
-    def create_tool(self) -> SeleniumScrapingTool:
+    def create_tool(self) -> 'SeleniumScrapingTool':
+        from crewai_tools import SeleniumScrapingTool
         cookie_arrayofdicts = [
             {k.strip(): v.strip()} 
             for item in self.parameters.get('cookie', '').split(',') 
@@ -342,42 +372,42 @@ class MySeleniumScrapingTool(MyTool):
         )
 
 class MyTXTSearchTool(MyTool):
+    name = 'TXTSearchTool'
+    description = "A tool that can be used for semantic search queries within TXT content."
+    parameters_metadata = {
+        'txt': {'mandatory': False}
+    }
+
     def __init__(self, tool_id=None, txt=None):
-        parameters = {
-            'txt': {'mandatory': False}
-        }
-        if txt:
-            parameters['txt'] = txt
-        super().__init__(tool_id, 'TXTSearchTool', "A tool that can be used for semantic search queries within TXT content.", parameters)
+        super().__init__(tool_id, parameters={'txt': txt})
 
     @record_tool('TXTSearchTool')
-    def create_tool(self) -> TXTSearchTool:
-        if self.parameters.get('txt'):
-            self.parameters['txt'] = self._validate_path(self.parameters['txt'])
-        return TXTSearchTool(self.parameters.get('txt'))
+    def create_tool(self) -> 'TXTSearchTool':
+        from crewai_tools import TXTSearchTool
+        txt = self.parameters.get('txt')
+        if txt:
+            txt = self._validate_path(txt)
+        return TXTSearchTool(txt)
 
 class MyScrapeElementFromWebsiteTool(MyTool):
+    name = 'ScrapeElementFromWebsiteTool'
+    description = "A tool that can be used to read specific parts of website content. CSS elements are separated by commas, cookies are in the format {key1:value1},{key2:value2}"
+    parameters_metadata = {
+        'website_url': {'mandatory': False},
+        'css_element': {'mandatory': False},
+        'cookie': {'mandatory': False}
+    }
+
     def __init__(self, tool_id=None, website_url=None, css_element=None, cookie=None):
-        parameters = {
-            'website_url': {'mandatory': False},
-            'css_element': {'mandatory': False},
-            'cookie': {'mandatory': False}
-        }
-        if website_url:
-            parameters['website_url'] = website_url
-        if css_element:
-            parameters['css_element'] = css_element
-        if cookie:
-            parameters['cookie'] = cookie
-        super().__init__(
-            tool_id, 
-            'ScrapeElementFromWebsiteTool', 
-            "A tool that can be used to read specific parts of website content. CSS elements are separated by commas, cookies are in the format {key1:value1},{key2:value2}", 
-            parameters
-        )
+        super().__init__(tool_id, parameters={
+            'website_url': website_url,
+            'css_element': css_element,
+            'cookie': cookie
+        })
 
     @record_tool('ScrapeElementFromWebsiteTool')
-    def create_tool(self) -> ScrapeElementFromWebsiteTool:
+    def create_tool(self) -> 'ScrapeElementFromWebsiteTool':
+        from crewai_tools import ScrapeElementFromWebsiteTool
         cookie_arrayofdicts = [
             {k.strip(): v.strip()} 
             for item in self.parameters.get('cookie', '').split(',') 
@@ -390,37 +420,107 @@ class MyScrapeElementFromWebsiteTool(MyTool):
         )
     
 class MyYahooFinanceNewsTool(MyTool):
+    name = 'YahooFinanceNewsTool'
+    description = "A tool that can be used to search Yahoo Finance News."
+
     def __init__(self, tool_id=None):
-        parameters = {}
-        super().__init__(tool_id, 'YahooFinanceNewsTool', "A tool that can be used to search Yahoo Finance News.", parameters)
+        super().__init__(tool_id)
 
     @record_tool('YahooFinanceNewsTool')
-    def create_tool(self) -> YahooFinanceNewsTool:
+    def create_tool(self) -> 'YahooFinanceNewsTool':
+        from langchain_community.tools import YahooFinanceNewsTool
         return YahooFinanceNewsTool()
 
-TOOL_CLASSES = {
-    'SerperDevTool': MySerperDevTool,
-    'WebsiteSearchTool': MyWebsiteSearchTool,
-    'ScrapeWebsiteTool': MyScrapeWebsiteTool,
-    'SeleniumScrapingTool': MySeleniumScrapingTool,
-    'ScrapeElementFromWebsiteTool': MyScrapeElementFromWebsiteTool,
-    'CodeInterpreterTool': MyCodeInterpreterTool,
-    'CustomCodeInterpreterTool': CustomCodeInterpreterTool,
-    'FileReadTool': MyFileReadTool,
-    'CustomFileWriteTool': MyCustomFileWriteTool,
-    'DirectorySearchTool': MyDirectorySearchTool,
-    'DirectoryReadTool': MyDirectoryReadTool,
-    'YoutubeVideoSearchTool': MyYoutubeVideoSearchTool,
-    'YoutubeChannelSearchTool': MyYoutubeChannelSearchTool,
-    'GithubSearchTool': MyGithubSearchTool,
-    'CodeDocsSearchTool': MyCodeDocsSearchTool,
-    'YahooFinanceNewsTool': MyYahooFinanceNewsTool,
-    'TXTSearchTool': MyTXTSearchTool,
-    'CSVSearchTool': MyCSVSearchTool,
-    'DOCXSearchTool': MyDocxSearchTool,
-    'EXASearchTool': MyEXASearchTool,
-    'JSONSearchTool': MyJSONSearchTool,
-    'MDXSearchTool': MyMDXSearchTool,
-    'PDFSearchTool': MyPDFSearchTool,
-    'PGSearchTool': MyPGSearchTool    
+class MyCodeInterpreterTool(MyTool):
+    name = 'CodeInterpreterTool'
+    description = "This tool is used to give the Agent the ability to run code (Python3) from the code generated by the Agent itself. The code is executed in a sandboxed environment, so it is safe to run any code."
+
+    def __init__(self, tool_id=None):
+        super().__init__(tool_id)
+
+    @record_tool('CodeInterpreterTool')
+    def create_tool(self) -> 'CodeInterpreterTool':
+        from crewai_tools import CodeInterpreterTool
+        return CodeInterpreterTool()
+
+class MyCustomCodeInterpreterTool(MyTool):
+    name = 'CustomCodeInterpreterTool'
+    description = "This tool is used to give the Agent the ability to run code (Python3) from the code generated by the Agent itself. The code is executed in a sandboxed environment, so it is safe to run any code. Worskpace folder is shared. It is possible to run scripts saved to the workspace."
+    parameters_metadata = {
+        'workspace_dir': {'mandatory': False}
+    }
+
+    def __init__(self, tool_id=None, workspace_dir=None):
+        super().__init__(tool_id, parameters={'workspace_dir': workspace_dir})
+
+    @record_tool('CustomCodeInterpreterTool')
+    def create_tool(self) -> 'CustomCodeInterpreterTool':
+        from custom_tools import CustomCodeInterpreterTool
+        workspace_dir = self.parameters.get('workspace_dir')
+        if workspace_dir:
+            workspace_dir = self._validate_path(workspace_dir)
+        return CustomCodeInterpreterTool(workspace_dir=workspace_dir or os.getenv('WORKSPACE_DIR', './workspace'))
+
+class MyCustomFileWriteTool(MyTool):
+    name = 'CustomFileWriteTool'
+    description = "A tool that can be used to write content to files within the allowed workspace directory."
+    parameters_metadata = {
+        'base_folder': {'mandatory': True}
+    }
+
+    def __init__(self, tool_id=None, base_folder=None):
+        self.workspace_root = os.path.abspath(os.getenv('WORKSPACE_DIR', './workspace'))
+        super().__init__(tool_id, parameters={'base_folder': base_folder or self.workspace_root})
+
+    @record_tool('CustomFileWriteTool')
+    def create_tool(self) -> 'MyCustomFileWriteTool':  # Changed to string literal type annotation
+        base_folder = self.parameters.get('base_folder', self.workspace_root)
+        if not os.path.exists(base_folder):
+            os.makedirs(base_folder)
+        return MyCustomFileWriteTool(base_folder=base_folder)
+
+class ToolDescriptor(NamedTuple):
+    """Static metadata of a tool; reading it imports no tool backend."""
+    name: str
+    description: str
+    parameters: Dict[str, Dict[str, Any]]
+    tool_class: Type[MyTool]
+
+    @classmethod
+    def from_class(cls, tool_class: Type[MyTool]) -> 'ToolDescriptor':
+        """Build the descriptor from the class-level metadata, without instantiating the tool"""
+        return cls(tool_class.name, tool_class.description, tool_class.parameters_metadata, tool_class)
+
+    def create(self, **parameters) -> MyTool:
+        """Instantiate the tool wrapper; its backend is imported later, by create_tool()"""
+        return self.tool_class(**parameters)
+
+# Tools offered on the Tools page, in display order
+TOOL_REGISTRY: Dict[str, ToolDescriptor] = {
+    tool_class.name: ToolDescriptor.from_class(tool_class) for tool_class in (
+        MySerperDevTool,
+        MyWebsiteSearchTool,
+        MyScrapeWebsiteTool,
+        MySeleniumScrapingTool,
+        MyScrapeElementFromWebsiteTool,
+        MyCodeInterpreterTool,
+        MyCustomCodeInterpreterTool,
+        MyFileReadTool,
+        MyCustomFileWriteTool,
+        MyDirectorySearchTool,
+        MyDirectoryReadTool,
+        MyYoutubeVideoSearchTool,
+        MyYoutubeChannelSearchTool,
+        MyGithubSearchTool,
+        MyCodeDocsSearchTool,
+        MyYahooFinanceNewsTool,
+        MyTXTSearchTool,
+        MyCSVSearchTool,
+        MyDocxSearchTool,
+        MyEXASearchTool,
+        MyJSONSearchTool,
+        MyMDXSearchTool,
+        MyPDFSearchTool,
+        MyPGSearchTool,
+    )
 }
@@ -2,7 +2,8 @@
 
 import streamlit as st
 from streamlit import session_state as ss
-import db_utils  # Import database utility functions
+import db_utils
+import views  # Import database utility functions
 from agentops import record_action, record, ActionEvent
 
 from my_agent import MyAgent  # Ensure MyAgent is imported correctly
@@ -14,7 +15,7 @@ class PageAgents:
 
     def load_agents(self):
         """Load agents from the database into session state."""
-        ss.agents = db_utils.load_agents()  # Ensure this loads a list of MyAgent instances
+        ss.agents = views.load_agents()  # Ensure this loads a list of MyAgent instances
 
     def save_agent(self, agent: MyAgent):
         """Save an agent to the database."""
@@ -58,7 +59,7 @@ class PageAgents:
             if 'agents' not in ss:
                 self.load_agents()  # Load agents from database if not in session
             if 'crews' not in ss:
-                ss.crews = db_utils.load_crews()  # Load crews if applicable
+                ss.crews = views.load_crews()  # Load crews if applicable
 
             agent_assignment = {agent.id: [] for agent in ss.agents}
 
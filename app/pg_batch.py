@@ -0,0 +1,188 @@
+# pg_batch.py
+
+import math
+import os
+import pandas as pd
+import streamlit as st
+from streamlit import session_state as ss
+
+import db_utils
+from batch_runner import (
+    BATCH_ELSEWHERE, BATCH_RUNNING, BATCH_STOPPING, get_batch_runner, parse_rows, results_csv,
+)
+from crew_runner import RUN_COMPLETED, RUN_FAILED
+from pg_crew_run import PageCrewRun
+
+# How often the progress of running batches redraws
+BATCH_REFRESH_SECONDS = float(os.getenv('BATCH_REFRESH_SECONDS', '2'))
+# Rows shown per page of a batch's table
+BATCH_PAGE_SIZE = int(os.getenv('BATCH_PAGE_SIZE', '100'))
+
+# Batch states whose progress is still changing
+LIVE_STATES = (BATCH_RUNNING, BATCH_STOPPING, BATCH_ELSEWHERE)
+
+class PageBatch:
+    def __init__(self):
+        self.name = "Batch kickoff"
+        # Batch rows run as this session's runs on the shared executor
+        PageCrewRun.maintain_session_state()
+
+    def draw_new_batch(self):
+        """
+        Render the form for starting a batch: crew, rows file and a preview of the rows.
+        """
+        if not ss.get('crews'):
+            st.warning("No crews defined yet.")
+            return
+        crew = st.selectbox("Crew", options=ss.crews, format_func=lambda crew: crew.name, key='batch_crew')
+        uploaded = st.file_uploader(
+            "Placeholder rows (CSV with one column per placeholder, or JSONL)",
+            type=['csv', 'jsonl', 'ndjson'],
+            key='batch_file'
+        )
+        if uploaded is None:
+            return
+        try:
+            rows = parse_rows(uploaded.name, uploaded.getvalue())
+        except ValueError as e:
+            st.error(str(e))
+            return
+
+        placeholders = PageCrewRun.get_placeholders_from_crew(crew)
+        columns = set(key for row in rows for key in row)
+        missing = sorted(placeholders - columns)
+        if missing:
+            st.warning(f"Missing columns for placeholders: {', '.join(missing)}")
+        st.caption(f"{len(rows)} rows")
+        st.dataframe(pd.DataFrame(rows[:50]), use_container_width=True)
+
+        if st.button("Start batch", disabled=not rows or bool(missing) or not crew.is_valid(show_warning=True)):
+            try:
+                ss.selected_batch_id = get_batch_runner().create(crew, rows, name=f"{crew.name} · {uploaded.name}",
+                                                                   user=ss.run_owner)
+            except ValueError as e:
+                st.error(str(e))
+                return
+            st.rerun()
+
+    def draw_batch(self, batch):
+        """
+        Render the progress, controls and results of one batch.
+
+        Args:
+            batch (dict): The batch with its row counts, as loaded by db_utils.load_batch.
+        """
+        runner = get_batch_runner()
+        state = runner.state(batch)
+        done = batch['completed'] + batch['failed']
+        st.write(f"**{batch['name']}** · {state}")
+        st.progress(done / batch['total'] if batch['total'] else 1.0,
+                    text=f"{batch['completed']} completed, {batch['failed']} failed, "
+                         f"{batch['running']} running, {batch['total'] - done - batch['running']} to do")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            if state in (BATCH_RUNNING, BATCH_STOPPING):
+                if st.button("Stop", key=f"stop_{batch['id']}", disabled=state == BATCH_STOPPING):
+                    runner.stop(batch['id'])
+                    st.rerun()
+            elif state == BATCH_ELSEWHERE:
+                st.caption(f"Running in {batch['owner']}")
+            elif done < batch['total']:
+                if st.button("Resume", key=f"resume_{batch['id']}"):
+                    self.resume(batch['id'])
+            elif batch['failed']:
+                if st.button("Retry failed rows", key=f"retry_{batch['id']}"):
+                    self.resume(batch['id'], retry_failed=True)
+        with col2:
+            self.draw_download(batch, state)
+
+        pages = max(1, math.ceil(batch['total'] / BATCH_PAGE_SIZE))
+        page = st.number_input("Page", min_value=1, max_value=pages, key=f"rows_page_{batch['id']}") if pages > 1 else 1
+        # Row indexes run from 0 to total - 1, so a page starts after a known index
+        rows = db_utils.load_batch_rows(batch['id'], limit=BATCH_PAGE_SIZE,
+                                        after=(page - 1) * BATCH_PAGE_SIZE - 1 if page > 1 else None)
+        table = pd.DataFrame([
+            {
+                'row': row['row_index'],
+                **{f'input: {key}': value for key, value in row['inputs'].items()},
+                'status': row['status'],
+                'run': row['run_id'],
+                'output': row['output'] if row['status'] == RUN_COMPLETED else row['error'] if row['status'] == RUN_FAILED else None,
+            }
+            for row in rows
+        ])
+        st.dataframe(table, use_container_width=True, hide_index=True)
+
+    def draw_download(self, batch, state: str):
+        """
+        Render the results download. The CSV holds every row, so while the
+        batch is running it is only built when asked for; once the batch has
+        stopped it is built once and kept.
+        """
+        key = f"batch_csv_{batch['id']}"
+        signature = (batch['status'], batch['completed'], batch['failed'])
+        cached = ss.get(key)
+        if state in LIVE_STATES:
+            if st.button("Prepare results", key=f"prepare_{batch['id']}"):
+                cached = ss[key] = (signature, results_csv(batch['id']))
+        elif cached is None or cached[0] != signature:
+            cached = ss[key] = (signature, results_csv(batch['id']))
+        if cached is not None:
+            st.download_button(
+                "Download results",
+                data=cached[1],
+                file_name=f"{batch['id']}.csv",
+                mime='text/csv',
+                key=f"download_{batch['id']}"
+            )
+
+    def resume(self, batch_id: str, retry_failed: bool = False):
+        try:
+            get_batch_runner().resume(batch_id, retry_failed=retry_failed, user=ss.run_owner)
+        except (LookupError, RuntimeError) as e:
+            st.error(str(e))
+            return
+        st.rerun()
+
+    @st.fragment(run_every=BATCH_REFRESH_SECONDS)
+    def draw_live_batch(self, batch_id: str):
+        """Progress of a running batch, redrawn on its own while the rest of the page stays put"""
+        batch = db_utils.load_batch(batch_id)
+        if batch is None:
+            return
+        self.draw_batch(batch)
+        if get_batch_runner().state(batch) not in LIVE_STATES:
+            st.rerun()
+
+    def draw_batches(self):
+        """
+        Render the recent batches and the selected one.
+        """
+        batches = db_utils.load_batches()
+        if not batches:
+            return
+        st.divider()
+        ids = [batch['id'] for batch in batches]
+        if ss.get('selected_batch_id') not in ids:
+            ss.selected_batch_id = ids[0]
+        by_id = {batch['id']: batch for batch in batches}
+        ss.selected_batch_id = st.selectbox(
+            "Batches",
+            options=ids,
+            index=ids.index(ss.selected_batch_id),
+            format_func=lambda batch_id: f"{by_id[batch_id]['name']} ({by_id[batch_id]['created_at']:%Y-%m-%d %H:%M})"
+        )
+        batch = by_id[ss.selected_batch_id]
+        if get_batch_runner().state(batch) in LIVE_STATES:
+            self.draw_live_batch(batch['id'])
+        else:
+            self.draw_batch(batch)
+
+    def draw(self):
+        """
+        Render the Batch kickoff page.
+        """
+        st.subheader(self.name)
+        self.draw_new_batch()
+        self.draw_batches()
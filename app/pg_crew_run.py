@@ -1,16 +1,29 @@
 # pg_crew_run.py
 
 import re
+import os
+import time
 import streamlit as st
 from streamlit import session_state as ss
-import threading
-import queue
-import time
-import traceback
-import os
 
+from core_utils import rnd_id
+from crew_runner import RUN_QUEUED, RUN_RUNNING, RUN_COMPLETED, RUN_FAILED
 from my_crew import MyCrew  # Ensure MyCrew is imported correctly
-from datetime import datetime
+from run_executor import Job, QueueFullError, get_executor
+import run_events
+
+# How often the progress fragment redraws while runs are pending; only the
+# fragment reruns, not the whole page
+RUN_PROGRESS_INTERVAL = float(os.getenv('RUN_PROGRESS_INTERVAL', '0.5'))
+
+EVENT_ICONS = {
+    run_events.RUN_STARTED: '🚀',
+    run_events.TASK_STARTED: '▶️',
+    run_events.TASK_FINISHED: '✅',
+    run_events.AGENT_STEP: '💭',
+    run_events.TOOL_CALL: '🔧',
+    run_events.RUN_FINISHED: '🏁',
+}
 
 class PageCrewRun:
     def __init__(self):
@@ -21,10 +34,10 @@ class PageCrewRun:
     def maintain_session_state():
         """Initialize default session state variables if they don't exist."""
         defaults = {
-            'crew_thread': None,
-            'result': None,
-            'running': False,
-            'message_queue': queue.Queue(),
+            # Identifies this session's runs to the shared executor
+            'run_owner': "S_" + rnd_id(),
+            'selected_job_id': None,
+            'jobs_signature': None,
             'selected_crew_name': None,
             'placeholders': {}
         }
@@ -37,7 +50,8 @@ class PageCrewRun:
         """Extract placeholders enclosed in curly braces from the given text."""
         return re.findall(r'\{(.*?)\}', text)
 
-    def get_placeholders_from_crew(self, crew: MyCrew):
+    @staticmethod
+    def get_placeholders_from_crew(crew: MyCrew):
         """
         Extract all unique placeholders from the crew's tasks and agents.
 
@@ -51,33 +65,17 @@ class PageCrewRun:
         attributes = ['description', 'expected_output', 'role', 'backstory', 'goal']
 
         for task in crew.tasks:
-            placeholders.update(self.extract_placeholders(task.description))
-            placeholders.update(self.extract_placeholders(task.expected_output))
+            placeholders.update(PageCrewRun.extract_placeholders(task.description))
+            placeholders.update(PageCrewRun.extract_placeholders(task.expected_output))
 
         for agent in crew.agents:
             for attr in attributes:
                 attr_value = getattr(agent, attr, "")
                 if isinstance(attr_value, str):
-                    placeholders.update(self.extract_placeholders(attr_value))
+                    placeholders.update(PageCrewRun.extract_placeholders(attr_value))
 
         return placeholders
 
-    def run_crew(self, crewai_crew, inputs, message_queue):
-        """
-        Execute the crew's kickoff method in a separate thread and handle results.
-
-        Args:
-            crewai_crew (Crew): The crew instance to run.
-            inputs (dict): Inputs to pass to the crew.
-            message_queue (queue.Queue): Queue to communicate results back to the main thread.
-        """
-        try:
-            result = crewai_crew.kickoff(inputs=inputs)
-            message_queue.put({"result": result})
-        except Exception as e:
-            stack_trace = traceback.format_exc()
-            message_queue.put({"result": f"Error running crew: {str(e)}", "stack_trace": stack_trace})
-
     def get_mycrew_by_name(self, crewname: str) -> MyCrew:
         """
         Retrieve a crew by its name.
@@ -105,8 +103,7 @@ class PageCrewRun:
                 ss.placeholders[placeholder_key] = st.text_input(
                     label=placeholder,
                     key=placeholder_key,
-                    value=ss.placeholders.get(placeholder_key, ''),
-                    disabled=ss.running
+                    value=ss.placeholders.get(placeholder_key, '')
                 )
 
     def draw_crews(self):
@@ -125,8 +122,7 @@ class PageCrewRun:
         selected_crew_name = st.selectbox(
             label="Select crew to run",
             options=[crew.name for crew in ss.crews],
-            index=0 if ss.selected_crew_name is None else [crew.name for crew in ss.crews].index(ss.selected_crew_name) if ss.selected_crew_name in [crew.name for crew in ss.crews] else 0,
-            disabled=ss.running
+            index=0 if ss.selected_crew_name is None else [crew.name for crew in ss.crews].index(ss.selected_crew_name) if ss.selected_crew_name in [crew.name for crew in ss.crews] else 0
         )
 
         if selected_crew_name != ss.selected_crew_name:
@@ -145,77 +141,124 @@ class PageCrewRun:
 
     def control_buttons(self, selected_crew: MyCrew):
         """
-        Render and handle the Run and Stop buttons for the selected crew.
+        Render and handle the Run button for the selected crew.
+
+        Runs go to the shared executor; a session may queue several of them.
 
         Args:
-            selected_crew (MyCrew): The crew to be run or stopped.
-        """
-        col1, col2 = st.columns(2)
-
-        with col1:
-            if st.button('Run crew!', disabled=not selected_crew.is_valid() or ss.running):
-                inputs = {key.split('_')[1]: value for key, value in ss.placeholders.items()}
-                ss.result = None
-                try:
-                    crew = selected_crew.get_crewai_crew(full_output=True)
-                except Exception as e:
-                    st.exception(e)
-                    traceback.print_exc()
-                    return
-
-                ss.running = True
-                ss.crew_thread = threading.Thread(
-                    target=self.run_crew,
-                    kwargs={
-                        "crewai_crew": crew,
-                        "inputs": inputs,
-                        "message_queue": ss.message_queue
-                    },
-                    daemon=True  # Ensure thread exits when main program does
-                )
-                ss.crew_thread.start()
-                st.experimental_rerun()
-
-        with col2:
-            if st.button('Stop crew!', disabled=not ss.running):
-                self.request_stop_thread()
-                ss.message_queue.queue.clear()
-                ss.running = False
-                ss.crew_thread = None
-                ss.result = None
-                st.success("Crew stopped successfully.")
-                st.experimental_rerun()
+            selected_crew (MyCrew): The crew to be run.
+        """
+        if st.button('Run crew!', disabled=not selected_crew.is_valid()):
+            inputs = {key.split('_')[1]: value for key, value in ss.placeholders.items()}
+            try:
+                job = get_executor().submit(selected_crew, inputs, user=ss.run_owner)
+            except (ValueError, QueueFullError) as e:
+                st.error(str(e))
+                return
+            ss.selected_job_id = job.id
+            st.rerun()
+
+    def job_label(self, job: Job) -> str:
+        """One-line summary of a run, with its queue position while it waits"""
+        if job.state == RUN_QUEUED:
+            position = get_executor().position(job.id)
+            state = f"queued (#{position})" if position else job.state
+        elif job.stopping:
+            state = "stopping"
+        else:
+            state = job.state
+        return f"{job.crew_name} · run {job.run_id} · {state}"
+
+    def draw_jobs(self):
+        """
+        Render this session's runs with their state, and buttons to cancel queued ones or stop running ones.
+        """
+        executor = get_executor()
+        jobs = executor.jobs(user=ss.run_owner)
+        if not jobs:
+            return
+        stats = executor.stats()
+        st.write('**Your runs:**')
+        st.caption(f"{stats['running']} of {stats['workers']} run slots busy, {stats['queued']} runs waiting")
+        for job in jobs:
+            col1, col2, col3 = st.columns([6, 1, 1])
+            with col1:
+                st.write(self.job_label(job))
+            with col2:
+                if st.button("Show", key=f'show_{job.id}', disabled=job.id == ss.selected_job_id):
+                    ss.selected_job_id = job.id
+                    st.rerun()
+            with col3:
+                if job.state == RUN_QUEUED and st.button("Cancel", key=f'cancel_{job.id}'):
+                    executor.cancel(job.id)
+                    st.rerun()
+                elif job.state == RUN_RUNNING and st.button("Stop", key=f'stop_{job.id}', disabled=job.stopping):
+                    executor.cancel(job.id)
+                    st.rerun()
 
-    def display_result(self):
+    @staticmethod
+    def jobs_signature(jobs):
+        """What the page shows about the session's runs; a change calls for a full redraw"""
+        return tuple((job.id, job.state, job.stopping) for job in jobs)
+
+    def draw_events(self, job: Job):
         """
-        Display the result of the crew's execution.
+        Render the progress events of a run received so far.
+
+        Args:
+            job (Job): The run whose events to show.
         """
-        if ss.result is not None:
-            if isinstance(ss.result, dict):
-                if 'final_output' in ss.result.get("result", {}):  # Old version of crewai
-                    st.expander("Final output", expanded=True).write(ss.result["result"]['final_output'])
-                elif hasattr(ss.result.get("result", {}), 'raw'):  # New version of crewai
-                    st.expander("Final output", expanded=True).write(ss.result['result'].raw)
-                st.expander("Full output", expanded=False).write(ss.result)
-            else:
-                st.error(ss.result)
-        elif ss.running and ss.crew_thread is not None:
-            with st.spinner("Running crew..."):
-                while ss.running:
-                    time.sleep(1)
-                    if not ss.message_queue.empty():
-                        ss.result = ss.message_queue.get()
-                        ss.running = False
-                        st.experimental_rerun()
+        channel = run_events.get_channel(job.run_id)
+        if channel is None:
+            if not job.done:
+                st.caption("Waiting for a free run slot...")
+            return
+        for event in channel.events():
+            timestamp = time.strftime('%H:%M:%S', time.localtime(event.time))
+            st.markdown(f"{EVENT_ICONS.get(event.kind, '•')} `{timestamp}` {event.message[:300]}")
 
-    def request_stop_thread(self):
+    @st.fragment(run_every=RUN_PROGRESS_INTERVAL)
+    def draw_progress(self):
         """
-        Request the running thread to stop gracefully.
+        Live progress of the session's pending runs.
+
+        Reruns on its own every RUN_PROGRESS_INTERVAL seconds without blocking
+        the script thread, and triggers a full rerun once a run starts, stops
+        or finishes.
+        """
+        jobs = get_executor().jobs(user=ss.run_owner)
+        if self.jobs_signature(jobs) != ss.jobs_signature:
+            st.rerun()
+        pending = [job for job in jobs if not job.done]
+        job = next((job for job in pending if job.id == ss.selected_job_id), pending[0])
+        running = sum(1 for job in pending if job.state == RUN_RUNNING)
+        st.write(f"**{job.crew_name}** · run {job.run_id} · {running} running, {len(pending) - running} queued")
+        self.draw_events(job)
+        channel = run_events.get_channel(job.run_id)
+        if channel is not None and channel.stream_text:
+            st.expander("Live output", expanded=True).markdown(channel.stream_text)
+
+    def display_result(self):
         """
-        # Note: Python does not support killing threads. Implement a stop mechanism if possible.
-        # For example, using a threading.Event to signal the thread to exit.
-        st.warning("Stopping threads forcefully is not supported. Implement a cooperative stopping mechanism.")
-        # Implement a proper stopping mechanism here if your crewai library supports it.
+        Display the result of the selected run, and live progress while runs are pending.
+        """
+        executor = get_executor()
+        jobs = executor.jobs(user=ss.run_owner)
+        ss.jobs_signature = self.jobs_signature(jobs)
+        job = executor.get(ss.selected_job_id) if ss.selected_job_id else None
+        if job is not None and job.done:
+            if job.state == RUN_COMPLETED:
+                st.expander("Final output", expanded=True).write(job.result.output)
+            elif job.state == RUN_FAILED:
+                st.error(f"Error running crew {job.crew_name}")
+                st.expander("Stack trace", expanded=False).code(job.result.error)
+            else:
+                st.info(f"Run {job.run_id} was cancelled.")
+            with st.expander("Run log", expanded=False):
+                self.draw_events(job)
+
+        if any(not job.done for job in jobs):
+            self.draw_progress()
 
     def draw(self):
         """
@@ -223,4 +266,5 @@ class PageCrewRun:
         """
         st.subheader(self.name)
         self.draw_crews()
+        self.draw_jobs()
         self.display_result()
\ No newline at end of file
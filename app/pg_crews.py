@@ -2,7 +2,8 @@
 
 import streamlit as st
 from streamlit import session_state as ss  # Ensure session_state is imported
-import db_utils  # Import database utility functions as needed
+import db_utils
+import views  # Import database utility functions as needed
 from agentops import record_action, record, ActionEvent
 
 from my_crew import MyCrew  # Ensure MyCrew is imported correctly
@@ -14,7 +15,7 @@ class PageCrews:
 
     def load_crews(self):
         """Load crews from the database into session state."""
-        ss.crews = db_utils.load_crews()  # Ensure this loads a list of MyCrew instances
+        ss.crews = views.load_crews()  # Ensure this loads a list of MyCrew instances
 
     def save_crew(self, crew: MyCrew):
         """Save a crew to the database."""
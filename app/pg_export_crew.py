@@ -7,6 +7,7 @@ from my_agent import MyAgent
 from my_task import MyTask
 from base_tool import MyTool as Tool
 import db_utils
+import views
 import os
 import json
 import shutil
@@ -21,7 +22,7 @@ class PageExportCrew:
     def maintain_session_state():
         """Initialize default session state variables if they don't exist."""
         if 'crews' not in ss:
-            ss.crews = db_utils.load_crews()  # Ensure this loads a list of MyCrew instances
+            ss.crews = views.load_crews()  # Ensure this loads a list of MyCrew instances
 
     def export_crew_data(self):
         """Exports all crew data to a JSON file and provides a download link."""
@@ -92,7 +93,7 @@ class PageExportCrew:
             if 'crews' not in ss:
                 ss.crews = []
             ss.crews.extend(imported_crews)
-            db_utils.save_crews(ss.crews)  # Save the updated crews to the database
+            db_utils.save_crews(imported_crews)  # Save the imported crews to the database
             st.success("Crew data imported successfully.")
             st.experimental_rerun()  # Refresh the UI to show updates
         except json.JSONDecodeError:
@@ -128,7 +129,7 @@ class PageExportCrew:
             if 'crews' not in ss:
                 ss.crews = []
             ss.crews.extend(imported_crews)
-            db_utils.save_crews(ss.crews)  # Save the updated crews to the database
+            db_utils.save_crews(imported_crews)  # Save the imported crews to the database
 
             st.success("Crew data imported successfully from zip.")
             st.experimental_rerun()  # Refresh the UI to show updates
@@ -2,7 +2,8 @@
 
 import streamlit as st
 from streamlit import session_state as ss
-import db_utils  # Ensure it has both export_to_json and import_from_json functions
+import db_utils
+import views  # Ensure it has both export_to_json and import_from_json functions
 from agentops import record_action, record, ActionEvent
 
 from my_task import MyTask  # Ensure MyTask is imported correctly
@@ -19,13 +20,13 @@ class PageTasks:
     def maintain_session_state():
         """Initialize default session state variables if they don't exist."""
         if 'tasks' not in ss:
-            ss.tasks = db_utils.load_tasks()  # Ensure this loads a list of MyTask instances
+            ss.tasks = views.load_tasks()  # Ensure this loads a list of MyTask instances
         if 'crews' not in ss:
-            ss.crews = db_utils.load_crews()  # Ensure this loads a list of MyCrew instances
+            ss.crews = views.load_crews()  # Ensure this loads a list of MyCrew instances
 
     def load_tasks(self):
         """Load tasks from the database into session state."""
-        ss.tasks = db_utils.load_tasks()
+        ss.tasks = views.load_tasks()
 
     def save_task(self, task: MyTask):
         """Save a task to the database."""
@@ -43,7 +44,7 @@ class PageTasks:
         record(ActionEvent("task_creation_requested"))
 
         # Create a new task and save to DB
-        task = MyTask()
+        task = MyTask(agent=ss.agents[0] if ss.get('agents') else None)
         ss.tasks.append(task)
         task.edit = True
         self.save_task(task)
@@ -71,7 +72,7 @@ class PageTasks:
             if 'tasks' not in ss:
                 self.load_tasks()
             if 'crews' not in ss:
-                ss.crews = db_utils.load_crews()
+                ss.crews = views.load_crews()
 
             # Dictionary to track task assignments
             task_assignment = {task.id: [] for task in ss.tasks}
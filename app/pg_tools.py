@@ -2,10 +2,10 @@
 
 import streamlit as st
 from core_utils import rnd_id
-from my_tools import TOOL_CLASSES
-from custom_tools import MyCustomFileWriteTool
+from my_tools import TOOL_REGISTRY, MyCustomFileWriteTool
 from streamlit import session_state as ss
 import db_utils
+from crew_cache import reload_api_keys
 from agentops import record_tool, record, ActionEvent
 from typing import Optional, Dict, Any
 import os
@@ -13,7 +13,7 @@ import os
 class PageTools:
     def __init__(self):
         self.name = "Tools"
-        self.available_tools = TOOL_CLASSES
+        self.available_tools = TOOL_REGISTRY
         self.maintain_session_state()
 
     @staticmethod
@@ -30,16 +30,16 @@ class PageTools:
         Args:
             tool_name (str): The name of the tool to create.
         """
-        tool_class = self.available_tools.get(tool_name)
-        if not tool_class:
+        descriptor = self.available_tools.get(tool_name)
+        if not descriptor:
             st.error(f"Tool '{tool_name}' is not recognized.")
             return
 
         # Instantiate the tool with a unique ID
-        if tool_class == MyCustomFileWriteTool:
-            tool_instance = tool_class(base_folder=os.path.abspath(os.getenv('WORKSPACE_DIR', './workspace')))
+        if descriptor.tool_class == MyCustomFileWriteTool:
+            tool_instance = descriptor.create(base_folder=os.path.abspath(os.getenv('WORKSPACE_DIR', './workspace')))
         else:
-            tool_instance = tool_class()
+            tool_instance = descriptor.create()
 
         # Initialize tools in session state if not present
         if 'tools' not in ss:
@@ -111,10 +111,8 @@ class PageTools:
         for idx, tool_name in enumerate(self.available_tools.keys()):
             col = cols[idx % len(cols)]
             with col:
-                tool_class = self.available_tools[tool_name]
-                tool_instance = tool_class()  # Instantiate without parameters for display
-                tool_description = tool_instance.description
-                if st.button(f"{tool_name}", key=f"enable_{tool_name}", help=tool_description):
+                descriptor = self.available_tools[tool_name]
+                if st.button(f"{tool_name}", key=f"enable_{tool_name}", help=descriptor.description):
                     self.create_tool(tool_name)
 
     def draw_enabled_tools(self):
@@ -128,7 +126,10 @@ class PageTools:
 
         for tool in ss.tools:
             display_name = self.get_tool_display_name(tool)
-            is_complete = tool.is_valid(show_warning=True)
+            errors = tool.validation_errors()
+            if errors:
+                st.warning(errors[0])
+            is_complete = not errors
             expander_title = display_name if is_complete else f"❗ {display_name}"
             with st.expander(expander_title, expanded=False):
                 st.write(tool.description)
@@ -195,6 +196,9 @@ class PageTools:
         Render the entire Tools page.
         """
         st.subheader(self.name)
+        if st.button("Reload API keys", help="Re-read .env; runs started after this use the new keys"):
+            reload_api_keys()
+            st.toast("API keys reloaded")
         self.draw_tools()
 
 # Instantiate and render the page
@@ -0,0 +1,84 @@
+# run_control.py
+#
+# Cancellation and per-run resource tracking shared by the run executor, the
+# crew runner and the tools. Kept free of crewai imports so tools and worker
+# processes can use it cheaply.
+
+import contextvars
+import logging
+import os
+import threading
+from typing import Optional
+
+# Set in worker processes, so tools know which run they belong to
+RUN_ID_ENV = 'CREW_RUN_ID'
+# Docker label put on containers started for a run, used to remove them afterwards
+RUN_LABEL = 'crewai-studio.run'
+
+_current_run_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('current_run_id', default=None)
+
+class RunCancelled(BaseException):
+    """
+    Raised inside a run when it has been cancelled.
+
+    Derives from BaseException, like KeyboardInterrupt, so the generic
+    `except Exception` handlers in crewai and the tools do not swallow it.
+    """
+
+class CancelToken:
+    """
+    Cooperative cancellation flag checked between tasks and agent steps.
+
+    Args:
+        event: A threading.Event, or a multiprocessing Event when the run
+            happens in another process.
+    """
+
+    def __init__(self, event=None):
+        self._event = event if event is not None else threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self, *args):
+        """Raise RunCancelled if the run was cancelled; usable directly as a crewai callback"""
+        if self._event.is_set():
+            raise RunCancelled()
+
+def set_current_run(run_id) -> contextvars.Token:
+    """Mark the calling context as executing `run_id`; pass the result to reset_current_run"""
+    return _current_run_id.set(str(run_id))
+
+def reset_current_run(token: contextvars.Token):
+    _current_run_id.reset(token)
+
+def current_run_id() -> Optional[str]:
+    """Id of the crew run the caller executes in, if any"""
+    return _current_run_id.get() or os.getenv(RUN_ID_ENV)
+
+def cleanup_run_containers(run_id) -> int:
+    """
+    Remove the Docker containers tools started for a run.
+
+    Returns:
+        int: The number of containers removed; 0 when Docker is unavailable.
+    """
+    try:
+        import docker
+        client = docker.from_env()
+        containers = client.containers.list(all=True, filters={'label': f'{RUN_LABEL}={run_id}'})
+    except Exception as e:
+        logging.debug(f"Skipping container cleanup for run {run_id}: {str(e)}")
+        return 0
+    removed = 0
+    for container in containers:
+        try:
+            container.remove(force=True)
+            removed += 1
+        except Exception as e:
+            logging.error(f"Failed to remove container {container.name} of run {run_id}: {str(e)}")
+    return removed
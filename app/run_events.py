@@ -0,0 +1,202 @@
+# run_events.py
+#
+# Live progress of crew runs. While a crew runs, its crewai step and task
+# callbacks are turned into RunEvents (task started/finished, agent step,
+# tool call) and published on a per-run channel, which the Kickoff page and
+# the HTTP API read incrementally. The channel also buffers the tokens of
+# the LLM call in progress (see llm_streaming).
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from run_control import CancelToken
+
+# Events kept per run; older ones are dropped first
+RUN_EVENT_BUFFER = int(os.getenv('RUN_EVENT_BUFFER', '500'))
+# Longest text stored in one event (tool output can be huge)
+RUN_EVENT_TEXT_LIMIT = int(os.getenv('RUN_EVENT_TEXT_LIMIT', '2000'))
+# Characters of streamed LLM output kept per run; the oldest are dropped first
+RUN_STREAM_BUFFER = int(os.getenv('RUN_STREAM_BUFFER', '20000'))
+
+RUN_STARTED = 'run_started'
+TASK_STARTED = 'task_started'
+TASK_FINISHED = 'task_finished'
+AGENT_STEP = 'agent_step'
+TOOL_CALL = 'tool_call'
+RUN_FINISHED = 'run_finished'
+
+# publish(kind, message, data)
+Publisher = Callable[[str, str, Dict[str, Any]], None]
+
+class RunEvent(NamedTuple):
+    seq: int
+    time: float
+    kind: str
+    message: str
+    data: Dict[str, Any]
+
+def _truncate(text: Any) -> str:
+    text = '' if text is None else str(text)
+    return text if len(text) <= RUN_EVENT_TEXT_LIMIT else text[:RUN_EVENT_TEXT_LIMIT] + '…'
+
+class RunChannel:
+    """
+    Bounded, append-only event log of one run that readers poll by sequence
+    number, plus the streamed output of its current LLM call.
+    """
+
+    def __init__(self, run_id: int, maxlen: int = RUN_EVENT_BUFFER, stream_maxlen: int = RUN_STREAM_BUFFER):
+        self.run_id = run_id
+        self.maxlen = maxlen
+        self.stream_maxlen = stream_maxlen
+        self._stream: List[str] = []
+        self._stream_len = 0
+        self.streamed_chars = 0
+        self._events: List[RunEvent] = []
+        self._seq = 0
+        self._closed = False
+        self._changed = threading.Condition()
+
+    def publish(self, kind: str, message: str, data: Optional[Dict[str, Any]] = None) -> RunEvent:
+        with self._changed:
+            self._seq += 1
+            event = RunEvent(self._seq, time.time(), kind, _truncate(message), data or {})
+            self._events.append(event)
+            if len(self._events) > self.maxlen:
+                del self._events[:len(self._events) - self.maxlen]
+            self._changed.notify_all()
+        return event
+
+    def events(self, after: int = 0) -> List[RunEvent]:
+        """Buffered events with a sequence number greater than `after`"""
+        with self._changed:
+            return [event for event in self._events if event.seq > after]
+
+    def wait(self, after: int, timeout: float) -> List[RunEvent]:
+        """Like events(), but block up to `timeout` seconds for new ones while the run is open"""
+        with self._changed:
+            self._changed.wait_for(lambda: self._seq > after or self._closed, timeout)
+        return self.events(after)
+
+    def start_stream(self):
+        """A new LLM call starts: clear the streamed text of the previous one"""
+        with self._changed:
+            self._stream = []
+            self._stream_len = 0
+
+    def write_stream(self, text: str):
+        with self._changed:
+            self._stream.append(text)
+            self._stream_len += len(text)
+            self.streamed_chars += len(text)
+            if self._stream_len > self.stream_maxlen:
+                tail = ''.join(self._stream)[-self.stream_maxlen:]
+                self._stream = [tail]
+                self._stream_len = len(tail)
+
+    @property
+    def stream_text(self) -> str:
+        """Streamed output of the current (or last) LLM call, up to stream_maxlen characters"""
+        with self._changed:
+            text = ''.join(self._stream)
+            if len(self._stream) > 1:
+                self._stream = [text]
+            return text
+
+    def close(self):
+        with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+_channels: Dict[int, RunChannel] = {}
+_channels_lock = threading.Lock()
+
+def open_channel(run_id: int) -> RunChannel:
+    with _channels_lock:
+        channel = _channels.get(run_id)
+        if channel is None:
+            channel = _channels[run_id] = RunChannel(run_id)
+        return channel
+
+def get_channel(run_id: int) -> Optional[RunChannel]:
+    return _channels.get(run_id)
+
+def drop_channel(run_id: int):
+    with _channels_lock:
+        _channels.pop(run_id, None)
+
+def _ignore(kind: str, message: str, data: Dict[str, Any]):
+    pass
+
+class RunReporter:
+    """
+    crewai step and task callbacks that publish run events and honour a cancel token.
+
+    For a sequential kickoff crewai has no "task started" callback, so the
+    start of a task is inferred from the end of the previous one. The task
+    graph scheduler runs tasks concurrently and reports them itself through
+    task_started, task_finished and step, with infer_task_start=False.
+
+    Args:
+        task_descriptions (list): Descriptions of the crew's tasks, in order.
+        publish: Called as publish(kind, message, data) for every event.
+        cancel_token (CancelToken): Checked on every callback.
+        infer_task_start (bool): Publish the start of the next task when one finishes.
+    """
+
+    def __init__(self, task_descriptions: List[str], publish: Optional[Publisher] = None,
+                 cancel_token: Optional[CancelToken] = None, infer_task_start: bool = True):
+        self.task_descriptions = task_descriptions
+        self.publish = publish or _ignore
+        self.cancel_token = cancel_token
+        self.infer_task_start = infer_task_start
+        self._task_index = 0
+
+    def task_started(self, index: int):
+        if index < len(self.task_descriptions):
+            self.publish(TASK_STARTED, self.task_descriptions[index][:120], {'task': index})
+
+    def start(self):
+        self.publish(RUN_STARTED, "Run started", {'tasks': len(self.task_descriptions)})
+        if self.infer_task_start:
+            self.task_started(self._task_index)
+
+    def step(self, index: int, step):
+        """An agent step of the task at `index`"""
+        tool = getattr(step, 'tool', None)
+        if tool:
+            self.publish(TOOL_CALL, f"{tool}: {getattr(step, 'tool_input', '')}", {
+                'task': index,
+                'tool': tool,
+                'thought': _truncate(getattr(step, 'thought', None)),
+                'result': _truncate(getattr(step, 'result', None)),
+            })
+        else:
+            output = getattr(step, 'output', None) or getattr(step, 'text', None) or step
+            self.publish(AGENT_STEP, output, {'task': index, 'thought': _truncate(getattr(step, 'thought', None))})
+        if self.cancel_token is not None:
+            self.cancel_token.check()
+
+    def task_finished(self, index: int, output):
+        self.publish(TASK_FINISHED, getattr(output, 'summary', None) or f"Task {index + 1} finished", {
+            'task': index,
+            'agent': getattr(output, 'agent', None),
+            'output': _truncate(getattr(output, 'raw', None)),
+        })
+        if self.cancel_token is not None:
+            self.cancel_token.check()
+
+    def step_callback(self, step):
+        self.step(self._task_index, step)
+
+    def task_callback(self, output):
+        self.task_finished(self._task_index, output)
+        self._task_index += 1
+        if self.infer_task_start:
+            self.task_started(self._task_index)
@@ -0,0 +1,369 @@
+# run_executor.py
+#
+# Process-wide executor for crew runs. Every Streamlit session (and the HTTP
+# API) submits runs to one bounded worker pool instead of starting its own
+# thread, so the number of crews running at once stays within
+# RUN_WORKERS no matter how many users are connected. Each user may have at
+# most RUN_MAX_PER_USER runs executing; their further runs wait in the queue
+# while other users' runs go ahead.
+#
+# With RUN_ISOLATION=process each run executes in a worker process of its
+# own. Cancelling a running job sets its cancel token, which the crew checks
+# between tasks and agent steps; a process that has not stopped
+# RUN_CANCEL_GRACE seconds later is killed, and its resources with it.
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from core_utils import rnd_id
+from crew_runner import (
+    CrewRunResult, RUN_CANCELLED, RUN_COMPLETED, RUN_FAILED, RUN_QUEUED, RUN_RUNNING,
+    execute_run, record_run, run_in_process,
+)
+from run_control import CancelToken, cleanup_run_containers
+import run_events
+from models import CrewModel
+import db_utils
+
+RUN_WORKERS = int(os.getenv('RUN_WORKERS', '4'))
+RUN_MAX_PER_USER = int(os.getenv('RUN_MAX_PER_USER', '2'))
+RUN_MAX_QUEUED = int(os.getenv('RUN_MAX_QUEUED', '100'))
+RUN_MAX_QUEUED_PER_USER = int(os.getenv('RUN_MAX_QUEUED_PER_USER', '10'))
+# Finished jobs kept in memory for the UI; older ones are still in crew_run
+RUN_HISTORY = int(os.getenv('RUN_HISTORY', '200'))
+# 'thread' runs crews in the executor's threads, 'process' in worker processes
+RUN_ISOLATION = os.getenv('RUN_ISOLATION', 'thread')
+# Seconds a cancelled run gets to stop on its own before its process is killed
+RUN_CANCEL_GRACE = float(os.getenv('RUN_CANCEL_GRACE', '30'))
+
+FINISHED_STATES = (RUN_COMPLETED, RUN_FAILED, RUN_CANCELLED)
+
+class QueueFullError(RuntimeError):
+    """Raised by submit() when the global or per-user queue limit is reached"""
+
+class Job:
+    """A submitted crew run; the executor updates it in place"""
+
+    __slots__ = ('id', 'run_id', 'crew', 'inputs', 'user', 'state', 'result', 'cancel_token',
+                 'cancel_requested_at', 'submitted_at', 'started_at', 'finished_at', '_process', '_done')
+
+    def __init__(self, run_id: int, crew: CrewModel, inputs: Dict[str, Any], user: str, cancel_token: CancelToken):
+        self.id = "J_" + rnd_id()
+        self.run_id = run_id
+        self.crew = crew
+        self.inputs = inputs
+        self.user = user
+        self.state = RUN_QUEUED
+        self.result: Optional[CrewRunResult] = None
+        self.cancel_token = cancel_token
+        self.cancel_requested_at: Optional[float] = None
+        self._process = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._done = threading.Event()
+
+    @property
+    def crew_name(self) -> str:
+        return self.crew.name
+
+    @property
+    def stopping(self) -> bool:
+        """Cancelled while running, but not finished yet"""
+        return self.cancel_requested_at is not None and not self.done
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job has finished; return False on timeout"""
+        return self._done.wait(timeout)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "run_id": self.run_id,
+            "crew_id": self.crew.id,
+            "crew_name": self.crew.name,
+            "user": self.user,
+            "state": self.state,
+            "stopping": self.stopping,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "output": self.result.output if self.result else None,
+            "error": self.result.error if self.result else None,
+        }
+
+class RunExecutor:
+    """
+    Bounded pool of worker threads running crews from a shared queue.
+
+    Args:
+        workers (int): Crews that may run at once in this process.
+        max_per_user (int): Crews one user may have running at once.
+        max_queued (int): Jobs that may wait in the queue overall.
+        max_queued_per_user (int): Jobs one user may have waiting.
+        isolation (str): 'thread' or 'process', see RUN_ISOLATION.
+        cancel_grace (float): Seconds before a cancelled run's process is killed.
+    """
+
+    def __init__(self, workers: int = RUN_WORKERS, max_per_user: int = RUN_MAX_PER_USER,
+                 max_queued: int = RUN_MAX_QUEUED, max_queued_per_user: int = RUN_MAX_QUEUED_PER_USER,
+                 isolation: str = RUN_ISOLATION, cancel_grace: float = RUN_CANCEL_GRACE):
+        if isolation not in ('thread', 'process'):
+            raise ValueError(f"Unknown run isolation {isolation!r}, expected 'thread' or 'process'")
+        self.isolation = isolation
+        self.cancel_grace = cancel_grace
+        # Spawned, not forked: a fork would copy the parent's pooled DB connections and threads
+        self._mp = multiprocessing.get_context('spawn')
+        self.workers = workers
+        self.max_per_user = max_per_user
+        self.max_queued = max_queued
+        self.max_queued_per_user = max_queued_per_user
+        self._lock = threading.Lock()
+        # Notified whenever a job is queued, started or finished
+        self._changed = threading.Condition(self._lock)
+        self._queue: Deque[Job] = deque()
+        # Queue places taken by submits that are still recording their run, by user
+        self._reserved: Dict[str, int] = {}
+        self._running: Dict[str, int] = {}
+        self._jobs: Dict[str, Job] = {}
+        self._finished: Deque[str] = deque()
+        self._threads = [
+            threading.Thread(target=self._work, name=f'crew-run-{i}', daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, crew: CrewModel, inputs: Optional[Dict[str, Any]] = None, user: str = 'anonymous') -> Job:
+        """
+        Queue a crew run.
+
+        Raises:
+            ValueError: If the crew is not valid.
+            QueueFullError: If the queue, or this user's share of it, is full.
+        """
+        inputs = inputs or {}
+        # The place in the queue is taken before the run is recorded, so
+        # concurrent submits cannot all pass the check
+        with self._lock:
+            self._check_capacity(user)
+            self._reserved[user] = self._reserved.get(user, 0) + 1
+        try:
+            run_id = record_run(crew, inputs)
+        except BaseException:
+            with self._lock:
+                self._release(user)
+            raise
+        token = CancelToken(self._mp.Event() if self.isolation == 'process' else None)
+        job = Job(run_id, crew, inputs, user, token)
+        with self._changed:
+            self._release(user)
+            self._jobs[job.id] = job
+            self._queue.append(job)
+            self._changed.notify_all()
+        return job
+
+    def _release(self, user: str):
+        # Caller holds the lock
+        self._reserved[user] -= 1
+        if not self._reserved[user]:
+            del self._reserved[user]
+
+    def _check_capacity(self, user: str):
+        # Caller holds the lock
+        if len(self._queue) + sum(self._reserved.values()) >= self.max_queued:
+            raise QueueFullError(f"The run queue is full ({self.max_queued} runs waiting), try again later")
+        waiting = sum(1 for job in self._queue if job.user == user) + self._reserved.get(user, 0)
+        if waiting >= self.max_queued_per_user:
+            raise QueueFullError(f"You already have {self.max_queued_per_user} runs waiting")
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job; return False if it has already finished.
+
+        A queued job is dropped right away. A running one is asked to stop at
+        its next task or agent step; in process isolation its process is
+        killed if it is still running after the grace period.
+
+        Raises:
+            LookupError: If there is no job with this id (or it finished so
+                long ago that it is no longer kept).
+        """
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise LookupError(f"Job {job_id} not found")
+            if job.done:
+                return False
+            if job.state == RUN_QUEUED:
+                self._queue.remove(job)
+                self._finish(job, CrewRunResult(job.run_id, job.crew.id, RUN_CANCELLED))
+                queued = True
+            else:
+                queued = False
+                if job.cancel_requested_at is None:
+                    job.cancel_requested_at = time.time()
+                    job.cancel_token.cancel()
+                    timer = threading.Timer(self.cancel_grace, self._enforce_cancel, args=(job,))
+                    timer.daemon = True
+                    timer.start()
+                self._changed.notify_all()
+        if queued:
+            db_utils.finish_crew_run(job.run_id, RUN_CANCELLED)
+        return True
+
+    def _enforce_cancel(self, job: Job):
+        if job.done:
+            return
+        process = job._process
+        if process is None:
+            # Threads cannot be killed; the run stops at its next step
+            logging.warning(f"Run {job.run_id} is still running {self.cancel_grace:.0f}s after being cancelled")
+            return
+        logging.warning(f"Killing run {job.run_id}, it did not stop within {self.cancel_grace:.0f}s")
+        process.terminate()
+        process.join(5)
+        if process.is_alive():
+            process.kill()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def jobs(self, user: Optional[str] = None) -> List[Job]:
+        """Known jobs, newest first, optionally only those of one user"""
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if user is None or job.user == user]
+        return sorted(jobs, key=lambda job: job.submitted_at, reverse=True)
+
+    def position(self, job_id: str) -> Optional[int]:
+        """1-based place of a queued job in the queue, or None if it is not waiting"""
+        with self._lock:
+            for index, job in enumerate(self._queue):
+                if job.id == job_id:
+                    return index + 1
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'running': sum(self._running.values()),
+                'queued': len(self._queue),
+                'jobs': len(self._jobs),
+            }
+
+    def _next_job(self) -> Optional[Job]:
+        # Oldest queued job whose user is below the per-user limit
+        for job in self._queue:
+            if self._running.get(job.user, 0) < self.max_per_user:
+                self._queue.remove(job)
+                return job
+        return None
+
+    def _work(self):
+        while True:
+            with self._changed:
+                job = self._next_job()
+                while job is None:
+                    self._changed.wait()
+                    job = self._next_job()
+                self._running[job.user] = self._running.get(job.user, 0) + 1
+                job.state = RUN_RUNNING
+                job.started_at = time.time()
+                self._changed.notify_all()
+            channel = run_events.open_channel(job.run_id)
+            try:
+                if self.isolation == 'process':
+                    result = self._run_in_process(job, channel)
+                else:
+                    result = execute_run(job.run_id, job.crew, job.inputs, job.cancel_token, channel.publish, channel)
+            except Exception as e:
+                # execute_run records crew failures itself; this is the database failing
+                logging.error(f"Run {job.run_id} could not be executed: {str(e)}")
+                result = CrewRunResult(job.run_id, job.crew.id, RUN_FAILED, error=str(e))
+            with self._changed:
+                self._running[job.user] -= 1
+                if not self._running[job.user]:
+                    del self._running[job.user]
+                self._finish(job, result)
+
+    def _run_in_process(self, job: Job, channel: run_events.RunChannel) -> CrewRunResult:
+        receiver, sender = self._mp.Pipe(duplex=False)
+        process = self._mp.Process(
+            target=run_in_process,
+            args=(job.run_id, job.crew.id, job.inputs, job.cancel_token, sender),
+            name=f'crew-run-{job.run_id}',
+            daemon=True
+        )
+        job._process = process
+        process.start()
+        # Drop our copy of the sending end, so recv() sees EOF if the process dies
+        sender.close()
+        result = None
+        try:
+            while result is None:
+                message = receiver.recv()
+                if message[0] == 'event':
+                    channel.publish(*message[1:])
+                elif message[0] == 'start_stream':
+                    channel.start_stream()
+                elif message[0] == 'write_stream':
+                    channel.write_stream(message[1])
+                else:
+                    result = message[1]
+        except EOFError:
+            pass
+        finally:
+            receiver.close()
+        process.join()
+        job._process = None
+        if result is not None:
+            return result
+
+        # Killed after a cancel, or crashed: record the outcome on its behalf
+        cleanup_run_containers(job.run_id)
+        if job.cancel_requested_at is not None:
+            db_utils.finish_crew_run(job.run_id, RUN_CANCELLED)
+            result = CrewRunResult(job.run_id, job.crew.id, RUN_CANCELLED)
+        else:
+            error = f"Worker process exited with code {process.exitcode}"
+            db_utils.finish_crew_run(job.run_id, RUN_FAILED, error=error)
+            result = CrewRunResult(job.run_id, job.crew.id, RUN_FAILED, error=error)
+        channel.publish(run_events.RUN_FINISHED, f"Run {result.status}", {'status': result.status})
+        return result
+
+    def _finish(self, job: Job, result: CrewRunResult):
+        # Caller holds the lock
+        job.result = result
+        job.state = result.status
+        job.finished_at = time.time()
+        job._done.set()
+        channel = run_events.get_channel(job.run_id)
+        if channel is not None:
+            channel.close()
+        self._finished.append(job.id)
+        while len(self._finished) > RUN_HISTORY:
+            dropped = self._jobs.pop(self._finished.popleft(), None)
+            if dropped is not None:
+                run_events.drop_channel(dropped.run_id)
+        self._changed.notify_all()
+
+_executor: Optional[RunExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_executor() -> RunExecutor:
+    """The process-wide executor, started on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = RunExecutor()
+        return _executor
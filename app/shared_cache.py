@@ -0,0 +1,53 @@
+# shared_cache.py
+
+import threading
+from typing import Any, Callable, NamedTuple, Optional, Tuple
+
+class Snapshot(NamedTuple):
+    """An immutable view of the agent/task/crew library at one cache version."""
+    version: int
+    agents: Tuple[Any, ...]
+    tasks: Tuple[Any, ...]
+    crews: Tuple[Any, ...]
+
+class SharedCache:
+    """
+    Process-wide, versioned, read-mostly cache of the domain library.
+
+    All Streamlit sessions in the process read the same Snapshot. Writes call
+    `invalidate()`, which bumps the version; the next `get()` reloads once
+    (other callers wait for that load instead of querying in parallel) and
+    every session picks up the new snapshot by comparing versions.
+    """
+
+    def __init__(self, loader: Callable[[], Tuple[list, list, list]]):
+        self._loader = loader
+        self._load_lock = threading.Lock()
+        self._version_lock = threading.Lock()
+        self._version = 0
+        self._snapshot: Optional[Snapshot] = None
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def get(self) -> Snapshot:
+        """Return the current snapshot, loading it if it is missing or stale."""
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self._version:
+            return snapshot
+        with self._load_lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.version == self._version:
+                return snapshot
+            # A write that lands while loading bumps the version past the one
+            # recorded here, so the next get() reloads again.
+            version = self._version
+            agents, tasks, crews = self._loader()
+            self._snapshot = Snapshot(version, tuple(agents), tuple(tasks), tuple(crews))
+            return self._snapshot
+
+    def invalidate(self):
+        """Mark the current snapshot stale."""
+        with self._version_lock:
+            self._version += 1
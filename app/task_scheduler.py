@@ -0,0 +1,223 @@
+# task_scheduler.py
+#
+# Runs a crew's tasks as a dependency graph. Each task's
+# context_from_async_tasks_ids and context_from_sync_tasks_ids name the
+# tasks whose output it needs; a task starts as soon as all of those have
+# finished, up to the crew's max_parallel_tasks at once, so a run takes about
+# as long as its longest chain of dependent tasks rather than the sum of all
+# tasks. Crews with max_parallel_tasks = 1 keep crewai's sequential kickoff.
+
+import contextvars
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+
+from crewai import Agent, Crew, Task
+from crewai.crews.crew_output import CrewOutput
+from crewai.types.usage_metrics import UsageMetrics
+from crewai.utilities.formatter import aggregate_raw_outputs_from_task_outputs
+
+from run_control import CancelToken, RunCancelled
+
+class TaskGraphError(ValueError):
+    """The tasks' context references do not form a valid dependency graph"""
+
+class RunTask(Task):
+    """
+    crewai Task that can be stopped while it runs asynchronously.
+
+    crewai runs an async task in a thread of its own and sets the result on a
+    future the crew waits for; an exception in that thread, such as the
+    RunCancelled a cancelled run's callbacks raise, leaves the future pending
+    and the crew waiting forever. Here the future fails with the exception
+    instead. The thread also runs in a copy of the caller's context, so the
+    run id and token sink (see run_control, llm_streaming) carry over.
+    """
+
+    def execute_async(self, agent=None, context: Optional[str] = None, tools: Optional[List[Any]] = None) -> Future:
+        future: Future = Future()
+        threading.Thread(
+            target=contextvars.copy_context().run,
+            args=(self._execute_task_async, agent, context, tools, future),
+            daemon=True
+        ).start()
+        return future
+
+    def _execute_task_async(self, agent, context: Optional[str], tools: Optional[List[Any]], future: Future) -> None:
+        try:
+            result = self._execute_core(agent, context, tools)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+
+def task_dependencies(tasks: List[Any]) -> Dict[str, List[str]]:
+    """
+    Upstream task ids of every task, in the order they were declared.
+
+    Args:
+        tasks (list): TaskModels of one crew.
+
+    Raises:
+        TaskGraphError: If a task needs the output of a task outside the list.
+    """
+    ids = {task.id for task in tasks}
+    dependencies = {}
+    for task in tasks:
+        upstream = list(dict.fromkeys([*task.context_from_async_tasks_ids, *task.context_from_sync_tasks_ids]))
+        unknown = [task_id for task_id in upstream if task_id not in ids]
+        if unknown:
+            raise TaskGraphError(f"Task {task.description[:60]} uses the output of a task that is not in the crew")
+        dependencies[task.id] = upstream
+    return dependencies
+
+def topological_order(tasks: List[Any]) -> List[Any]:
+    """
+    The tasks ordered so that every task comes after the tasks it needs.
+
+    Kahn's algorithm, always taking the earliest ready task in list order,
+    so a list that is already in dependency order is returned unchanged.
+
+    Raises:
+        TaskGraphError: If a task needs a task outside the list, or the
+            dependencies form a cycle.
+    """
+    dependencies = task_dependencies(tasks)
+    waiting = {task.id: len(dependencies[task.id]) for task in tasks}
+    downstream: Dict[str, List[str]] = {task.id: [] for task in tasks}
+    for task_id, upstream in dependencies.items():
+        for upstream_id in upstream:
+            downstream[upstream_id].append(task_id)
+
+    position = {task.id: index for index, task in enumerate(tasks)}
+    by_id = {task.id: task for task in tasks}
+    ready = [task.id for task in tasks if waiting[task.id] == 0]
+    order = []
+    while ready:
+        task_id = min(ready, key=position.get)
+        ready.remove(task_id)
+        order.append(by_id[task_id])
+        for downstream_id in downstream[task_id]:
+            waiting[downstream_id] -= 1
+            if waiting[downstream_id] == 0:
+                ready.append(downstream_id)
+
+    if len(order) < len(tasks):
+        cycle = [by_id[task_id].description[:40] for task_id, count in waiting.items() if count > 0]
+        raise TaskGraphError(f"Task dependencies form a cycle between: {', '.join(cycle)}")
+    return order
+
+def _task_agent(crewai_crew: Crew, task: Task, step_callback) -> Agent:
+    """
+    An agent of its own for one task.
+
+    An agent holds the state of the task it is executing, so tasks that run
+    at the same time cannot share one; the copy shares the LLM and tools.
+    This repeats the agent setup of Crew.kickoff.
+    """
+    agent = task.agent.copy()
+    agent.crew = crewai_crew
+    agent.step_callback = step_callback
+    agent.create_agent_executor()
+    return agent
+
+def _task_tools(crewai_crew: Crew, task: Task, agent: Agent) -> List[Any]:
+    tools = list(agent.tools or [])
+    if agent.allow_delegation:
+        others = [member for member in crewai_crew.agents if member.role != agent.role]
+        if others:
+            tools += agent.get_delegation_tools(others)
+    return tools
+
+def kickoff_graph(crewai_crew: Crew, dependencies: Dict[int, List[int]], inputs: Optional[Dict[str, Any]] = None,
+                  max_parallel: int = 2, reporter=None) -> CrewOutput:
+    """
+    Run the tasks of a compiled crew as a dependency graph.
+
+    Every task gets the raw outputs of the tasks it depends on as context;
+    tasks without dependencies get none. The crew's result is the output of
+    its last task, as with a sequential kickoff. If a task fails, tasks
+    that are running stop at their next step, no further tasks start, and
+    the error is raised.
+
+    Args:
+        crewai_crew (Crew): The compiled crew, tasks in dependency order.
+        dependencies (dict): Indexes of the tasks each task (by index) needs.
+        inputs (dict): Placeholder values.
+        max_parallel (int): Tasks that may run at once.
+        reporter (RunReporter): Receives task start/finish and agent steps.
+
+    Raises:
+        RunCancelled: If the reporter's cancel token is cancelled.
+    """
+    tasks = crewai_crew.tasks
+    for task in tasks:
+        task.interpolate_inputs(inputs or {})
+    for agent in crewai_crew.agents:
+        agent.interpolate_inputs(inputs or {})
+
+    # Stops the other tasks when one fails
+    abort = CancelToken()
+    agents: List[Agent] = []
+
+    def step_callback(index: int):
+        def callback(step):
+            if reporter is not None:
+                reporter.step(index, step)
+            abort.check()
+        return callback
+
+    def run_task(index: int):
+        abort.check()
+        task = tasks[index]
+        agent = _task_agent(crewai_crew, task, step_callback(index))
+        agents.append(agent)
+        if reporter is not None:
+            reporter.task_started(index)
+        context = aggregate_raw_outputs_from_task_outputs([tasks[upstream].output for upstream in dependencies[index]])
+        output = task.execute_sync(agent=agent, context=context or None, tools=_task_tools(crewai_crew, task, agent))
+        if reporter is not None:
+            reporter.task_finished(index, output)
+        return output
+
+    waiting = {index: set(dependencies[index]) for index in range(len(tasks))}
+    error: Optional[BaseException] = None
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel), thread_name_prefix='crew-task') as pool:
+        running = {}
+        while True:
+            if error is None:
+                for index in [index for index, upstream in waiting.items() if not upstream]:
+                    del waiting[index]
+                    # Threads do not inherit the run's context (run id, token sink)
+                    running[pool.submit(contextvars.copy_context().run, run_task, index)] = index
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                index = running.pop(future)
+                exception = future.exception()
+                if exception is not None:
+                    # Later errors are the RunCancelled of the tasks this one stops
+                    error = error or exception
+                    abort.cancel()
+                    continue
+                for upstream in waiting.values():
+                    upstream.discard(index)
+    if error is not None:
+        if not isinstance(error, RunCancelled):
+            logging.error(f"Task graph of crew {crewai_crew.id} stopped: {str(error)}")
+        raise error
+
+    usage = UsageMetrics()
+    for agent in agents:
+        usage.add_usage_metrics(agent._token_process.get_summary())
+    crewai_crew.usage_metrics = usage
+    final = tasks[-1].output
+    return CrewOutput(
+        raw=final.raw,
+        pydantic=final.pydantic,
+        json_dict=final.json_dict,
+        tasks_output=[task.output for task in tasks],
+        token_usage=usage,
+    )
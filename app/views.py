@@ -0,0 +1,70 @@
+# views.py
+#
+# The Streamlit pages edit views (MyAgent, MyTask, MyCrew), while db_utils,
+# the runners, the CLI and the API work with the plain models. These helpers
+# load the library as views, and turn the shared snapshot of models into a
+# session's own view objects.
+
+import copy
+from dataclasses import fields
+from typing import Any, Dict, List, Tuple
+
+import db_utils
+from my_agent import MyAgent
+from my_crew import MyCrew
+from my_task import MyTask
+from shared_cache import Snapshot
+
+def identity_map() -> db_utils.IdentityMap:
+    """An identity map that makes the db_utils loaders build views"""
+    return db_utils.IdentityMap(agent_class=MyAgent, task_class=MyTask, crew_class=MyCrew)
+
+def load_agents() -> List[MyAgent]:
+    return db_utils.load_agents(identity_map())
+
+def load_tasks() -> List[MyTask]:
+    return db_utils.load_tasks(identity_map())
+
+def load_crews(limit: int = 100) -> List[MyCrew]:
+    return db_utils.load_crews(limit=limit, identity_map=identity_map())
+
+def _field_values(model) -> Dict[str, Any]:
+    return {field.name: getattr(model, field.name) for field in fields(model)}
+
+def session_library(snapshot: Snapshot) -> Tuple[List[MyAgent], List[MyTask], List[MyCrew]]:
+    """
+    Views of a snapshot's agents, tasks and crews for one session.
+
+    The snapshot's models are shared by all sessions, while the views are
+    edited in place, so every view is a new object; crews and tasks point at
+    the session's own agents and tasks, as in the snapshot.
+    """
+    agents: Dict[str, MyAgent] = {}
+    tasks: Dict[str, MyTask] = {}
+
+    def agent_view(agent) -> MyAgent:
+        if agent.id not in agents:
+            agents[agent.id] = MyAgent(**{**_field_values(agent), 'tools': copy.deepcopy(agent.tools)})
+        return agents[agent.id]
+
+    def task_view(task) -> MyTask:
+        if task.id not in tasks:
+            tasks[task.id] = MyTask(**{
+                **_field_values(task),
+                'agent': agent_view(task.agent) if task.agent else None,
+                'context_from_async_tasks_ids': list(task.context_from_async_tasks_ids),
+                'context_from_sync_tasks_ids': list(task.context_from_sync_tasks_ids),
+            })
+        return tasks[task.id]
+
+    session_agents = [agent_view(agent) for agent in snapshot.agents]
+    session_tasks = [task_view(task) for task in snapshot.tasks]
+    session_crews = [
+        MyCrew(**{
+            **_field_values(crew),
+            'agents': [agent_view(agent) for agent in crew.agents],
+            'tasks': [task_view(task) for task in crew.tasks],
+        })
+        for crew in snapshot.crews
+    ]
+    return session_agents, session_tasks, session_crews
@@ -10,5 +10,12 @@ setup(
         "python-dotenv",
         "zep-python",
         "agentops",
+        "fastapi",
+        "uvicorn",
     ],
+    entry_points={
+        "console_scripts": [
+            "crewai-studio=app.cli:main",
+        ],
+    },
 )
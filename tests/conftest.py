@@ -0,0 +1,11 @@
+# conftest.py
+#
+# The app's modules import each other as top-level modules (see api.py), so
+# the app directory goes on sys.path.
+
+import os
+import sys
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app')
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
@@ -0,0 +1,57 @@
+import crewai_tools
+import pytest
+
+import crew_cache
+from crew_cache import LRUCache, content_hash
+from my_tools import MyFileReadTool
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.get_or_create('a', lambda: 1)
+    cache.get_or_create('b', lambda: 2)
+    # Touching 'a' makes 'b' the oldest entry
+    assert cache.get_or_create('a', lambda: 'rebuilt') == 1
+    cache.get_or_create('c', lambda: 3)
+    assert cache.get_or_create('b', lambda: 'rebuilt') == 'rebuilt'
+    assert cache.stats() == {'size': 2, 'hits': 1, 'misses': 4}
+
+def test_lru_cache_does_not_keep_failures():
+    cache = LRUCache(maxsize=2)
+
+    def fail():
+        raise ValueError('no')
+
+    with pytest.raises(ValueError):
+        cache.get_or_create('a', fail)
+    assert cache.get_or_create('a', lambda: 1) == 1
+
+def test_lru_cache_of_size_zero_stores_nothing():
+    cache = LRUCache(maxsize=0)
+    cache.get_or_create('a', lambda: 1)
+    assert cache.get_or_create('a', lambda: 2) == 2
+    assert cache.stats()['size'] == 0
+
+def test_content_hash_ignores_key_order_and_ids():
+    first = {'id': 'A_1', 'role': 'writer', 'tools': [{'tool_id': 'T_1', 'name': 'x'}]}
+    second = {'tools': [{'name': 'x', 'tool_id': 'T_2'}], 'role': 'writer', 'id': 'A_2'}
+    assert content_hash(first) == content_hash(second)
+    assert content_hash(first) != content_hash({**first, 'role': 'editor'})
+
+def test_tool_lookup_does_not_change_the_tool(monkeypatch, tmp_path):
+    created = []
+
+    class FileReadTool:
+        def __init__(self, file_path=None):
+            created.append(file_path)
+
+    monkeypatch.setattr(crewai_tools, 'FileReadTool', FileReadTool, raising=False)
+    monkeypatch.setenv('WORKSPACE_DIR', str(tmp_path))
+    monkeypatch.setattr(crew_cache, '_tools', LRUCache(maxsize=4))
+    tool = MyFileReadTool(file_path='notes.txt')
+    before = tool.content_hash()
+
+    first = crew_cache.get_tool(tool)
+    assert tool.parameters == {'file_path': 'notes.txt'}
+    assert tool.content_hash() == before
+    assert crew_cache.get_tool(tool) is first
+    assert created == [str(tmp_path / 'notes.txt')]
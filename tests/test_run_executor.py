@@ -0,0 +1,152 @@
+import itertools
+import threading
+
+import pytest
+
+import run_executor
+from crew_runner import RUN_CANCELLED, RUN_COMPLETED, RUN_QUEUED, RUN_RUNNING, CrewRunResult
+from models import CrewModel
+from run_executor import QueueFullError, RunExecutor
+
+@pytest.fixture
+def runs(monkeypatch):
+    """Records runs in memory and runs crews by waiting for the test to release them"""
+    run_ids = itertools.count(1)
+    finished = {}
+    release = {}
+    running = []
+    lock = threading.Lock()
+
+    def record_run(crew, inputs=None):
+        return next(run_ids)
+
+    def execute_run(run_id, crew, inputs, cancel_token, publish=None, channel=None):
+        with lock:
+            running.append(run_id)
+            event = release.setdefault(run_id, threading.Event())
+        event.wait(5)
+        return CrewRunResult(run_id, crew.id, RUN_COMPLETED, output='done')
+
+    def finish_crew_run(run_id, status, **kwargs):
+        finished[run_id] = status
+
+    def release_run(run_id):
+        with lock:
+            release.setdefault(run_id, threading.Event()).set()
+
+    monkeypatch.setattr(run_executor, 'record_run', record_run)
+    monkeypatch.setattr(run_executor, 'execute_run', execute_run)
+    monkeypatch.setattr(run_executor.db_utils, 'finish_crew_run', finish_crew_run)
+    return running, finished, release_run
+
+def wait_for(condition, timeout=5):
+    done = threading.Event()
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return True
+        done.wait(0.01)
+    return condition()
+
+def test_submit_rejects_over_global_queue_limit(runs):
+    executor = RunExecutor(workers=0, max_queued=2, max_queued_per_user=5)
+    executor.submit(CrewModel(), user='a')
+    executor.submit(CrewModel(), user='b')
+    with pytest.raises(QueueFullError, match='queue is full'):
+        executor.submit(CrewModel(), user='c')
+    assert executor.stats()['queued'] == 2
+
+def test_submit_rejects_over_per_user_queue_limit(runs):
+    executor = RunExecutor(workers=0, max_queued=10, max_queued_per_user=2)
+    executor.submit(CrewModel(), user='a')
+    executor.submit(CrewModel(), user='a')
+    with pytest.raises(QueueFullError, match='2 runs waiting'):
+        executor.submit(CrewModel(), user='a')
+    # Other users still have room
+    executor.submit(CrewModel(), user='b')
+
+def test_concurrent_submits_cannot_overfill_the_queue(runs, monkeypatch):
+    executor = RunExecutor(workers=0, max_queued=3, max_queued_per_user=10)
+    barrier = threading.Barrier(8)
+    recorded = itertools.count(1)
+
+    def slow_record_run(crew, inputs=None):
+        # Every submit has passed the capacity check before any run is recorded
+        threading.Event().wait(0.05)
+        return next(recorded)
+
+    monkeypatch.setattr(run_executor, 'record_run', slow_record_run)
+    outcomes = []
+
+    def submit():
+        barrier.wait()
+        try:
+            executor.submit(CrewModel())
+            outcomes.append('queued')
+        except QueueFullError:
+            outcomes.append('full')
+
+    threads = [threading.Thread(target=submit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert outcomes.count('queued') == 3
+    assert executor.stats()['queued'] == 3
+
+def test_failed_record_releases_the_queue_place(runs, monkeypatch):
+    executor = RunExecutor(workers=0, max_queued=1, max_queued_per_user=1)
+
+    def failing_record_run(crew, inputs=None):
+        raise RuntimeError('database is down')
+
+    monkeypatch.setattr(run_executor, 'record_run', failing_record_run)
+    with pytest.raises(RuntimeError):
+        executor.submit(CrewModel())
+    monkeypatch.setattr(run_executor, 'record_run', lambda crew, inputs=None: 1)
+    assert executor.submit(CrewModel()).state == RUN_QUEUED
+
+def test_cancel_queued_job(runs):
+    _, finished, _ = runs
+    executor = RunExecutor(workers=0)
+    first = executor.submit(CrewModel())
+    second = executor.submit(CrewModel())
+    assert executor.position(second.id) == 2
+    assert executor.cancel(first.id) is True
+    assert first.done and first.state == RUN_CANCELLED
+    assert finished[first.run_id] == RUN_CANCELLED
+    assert executor.position(second.id) == 1
+    # Already finished
+    assert executor.cancel(first.id) is False
+
+def test_cancel_unknown_job(runs):
+    executor = RunExecutor(workers=0)
+    with pytest.raises(LookupError):
+        executor.cancel('J_missing')
+
+def test_cancel_running_job_signals_its_token(runs):
+    running, _, release_run = runs
+    executor = RunExecutor(workers=1, cancel_grace=60)
+    job = executor.submit(CrewModel())
+    assert wait_for(lambda: job.run_id in running)
+    assert executor.cancel(job.id) is True
+    assert job.cancel_token.cancelled and job.stopping
+    release_run(job.run_id)
+    assert job.wait(5)
+    assert not job.stopping
+
+def test_per_user_running_limit(runs):
+    running, _, release_run = runs
+    executor = RunExecutor(workers=3, max_per_user=1)
+    first = executor.submit(CrewModel(), user='a')
+    second = executor.submit(CrewModel(), user='a')
+    other = executor.submit(CrewModel(), user='b')
+    assert wait_for(lambda: first.state == RUN_RUNNING and other.state == RUN_RUNNING)
+    # A worker is free, but user a already has a run going
+    assert second.state == RUN_QUEUED
+    release_run(first.run_id)
+    assert first.wait(5) and first.state == RUN_COMPLETED
+    assert wait_for(lambda: second.state == RUN_RUNNING)
+    release_run(second.run_id)
+    release_run(other.run_id)
+    assert second.wait(5) and other.wait(5)
+    assert executor.stats()['running'] == 0
@@ -0,0 +1,147 @@
+import threading
+import time
+
+import pytest
+from crewai import Agent, Crew, Task
+from crewai.tasks.task_output import TaskOutput
+from crewai.types.usage_metrics import UsageMetrics
+
+import task_scheduler
+from models import AgentModel, CrewModel, TaskModel
+from task_scheduler import RunTask, TaskGraphError, kickoff_graph, task_dependencies, topological_order
+
+def make_tasks(*specs):
+    """TaskModels named by description, with sync context from the named tasks: make_tasks(('a', []), ('b', ['a']))"""
+    tasks = {}
+    for name, upstream in specs:
+        tasks[name] = TaskModel(id=name, description=name, context_from_sync_tasks_ids=list(upstream))
+    return list(tasks.values())
+
+def names(tasks):
+    return [task.description for task in tasks]
+
+def test_topological_order_keeps_an_ordered_list():
+    tasks = make_tasks(('a', []), ('b', ['a']), ('c', []), ('d', ['b', 'c']))
+    assert names(topological_order(tasks)) == ['a', 'b', 'c', 'd']
+
+def test_topological_order_moves_tasks_after_their_dependencies():
+    tasks = make_tasks(('d', ['b', 'c']), ('c', ['a']), ('b', ['a']), ('a', []))
+    assert names(topological_order(tasks)) == ['a', 'c', 'b', 'd']
+
+def test_topological_order_uses_async_context_too():
+    tasks = [
+        TaskModel(id='b', description='b', context_from_async_tasks_ids=['a']),
+        TaskModel(id='a', description='a', async_execution=True),
+    ]
+    assert names(topological_order(tasks)) == ['a', 'b']
+
+def test_task_dependencies_drops_duplicates():
+    tasks = [
+        TaskModel(id='a', description='a'),
+        TaskModel(id='b', description='b', context_from_async_tasks_ids=['a'], context_from_sync_tasks_ids=['a']),
+    ]
+    assert task_dependencies(tasks) == {'a': [], 'b': ['a']}
+
+@pytest.mark.parametrize('specs', [
+    (('a', ['a']),),
+    (('a', ['b']), ('b', ['a'])),
+    (('a', []), ('b', ['a', 'd']), ('c', ['b']), ('d', ['c'])),
+])
+def test_topological_order_rejects_cycles(specs):
+    with pytest.raises(TaskGraphError, match='cycle'):
+        topological_order(make_tasks(*specs))
+
+def test_topological_order_rejects_unknown_tasks():
+    with pytest.raises(TaskGraphError, match='not in the crew'):
+        topological_order(make_tasks(('a', []), ('b', ['gone'])))
+
+def test_crew_reports_graph_errors_as_validation_errors():
+    agent = AgentModel(llm_provider_model='Ollama: llama2')
+    tasks = make_tasks(('a', ['b']), ('b', ['a']))
+    for task in tasks:
+        task.agent = agent
+    crew = CrewModel(agents=[agent], tasks=tasks)
+    errors = crew.validation_errors()
+    assert errors and 'cycle' in errors[0]
+    # Invalid graphs are kept in their listed order for display
+    assert crew.ordered_tasks() == tasks
+
+class FakeAgent:
+    """Stands in for the per-task agent copy, which needs an LLM"""
+
+    class _TokenProcess:
+        def get_summary(self):
+            return UsageMetrics()
+
+    _token_process = _TokenProcess()
+
+@pytest.fixture
+def scheduled(monkeypatch):
+    """Runs tasks without an LLM; records when each starts and ends and the context it gets"""
+    log = []
+    lock = threading.Lock()
+    durations = {}
+    failing = set()
+
+    def execute_sync(self, agent=None, context=None, tools=None):
+        with lock:
+            log.append(('start', self.description, context))
+        time.sleep(durations.get(self.description, 0.05))
+        if self.description in failing:
+            raise RuntimeError(f"{self.description} failed")
+        with lock:
+            log.append(('end', self.description, context))
+        self.output = TaskOutput(description=self.description, raw=f"out {self.description}", agent='agent')
+        return self.output
+
+    monkeypatch.setattr(Task, 'execute_sync', execute_sync)
+    monkeypatch.setattr(task_scheduler, '_task_agent', lambda crew, task, step_callback: FakeAgent())
+    monkeypatch.setattr(task_scheduler, '_task_tools', lambda crew, task, agent: [])
+    return log, durations, failing
+
+def make_crew(count):
+    agent = Agent(role='r', goal='g', backstory='b', llm='ollama/llama2')
+    tasks = [RunTask(description=f't{index}', expected_output='o', agent=agent) for index in range(count)]
+    return Crew(agents=[agent], tasks=tasks)
+
+def events(log, kind):
+    return [name for event, name, _ in log if event == kind]
+
+def test_kickoff_graph_starts_tasks_after_their_dependencies(scheduled):
+    log, _, _ = scheduled
+    # t0 -> t1, t0 -> t2, (t1, t2) -> t3
+    result = kickoff_graph(make_crew(4), {0: [], 1: [0], 2: [0], 3: [1, 2]}, max_parallel=2)
+    for task, upstream in (('t1', ['t0']), ('t2', ['t0']), ('t3', ['t1', 't2'])):
+        start = log.index(next(entry for entry in log if entry[:2] == ('start', task)))
+        for name in upstream:
+            assert log.index(next(entry for entry in log if entry[:2] == ('end', name))) < start
+    assert result.raw == 'out t3'
+    assert [output.raw for output in result.tasks_output] == ['out t0', 'out t1', 'out t2', 'out t3']
+
+def test_kickoff_graph_passes_upstream_outputs_as_context(scheduled):
+    log, _, _ = scheduled
+    kickoff_graph(make_crew(3), {0: [], 1: [], 2: [0, 1]}, max_parallel=2)
+    contexts = {name: context for event, name, context in log if event == 'start'}
+    assert contexts['t0'] is None and contexts['t1'] is None
+    assert 'out t0' in contexts['t2'] and 'out t1' in contexts['t2']
+
+def test_kickoff_graph_runs_independent_tasks_concurrently(scheduled):
+    log, durations, _ = scheduled
+    durations.update(t0=0.3, t1=0.3)
+    kickoff_graph(make_crew(2), {0: [], 1: []}, max_parallel=2)
+    assert events(log, 'start') == ['t0', 't1'] or events(log, 'start') == ['t1', 't0']
+    # Both started before either finished
+    assert [event for event, _, _ in log][:2] == ['start', 'start']
+
+def test_kickoff_graph_respects_max_parallel(scheduled):
+    log, _, _ = scheduled
+    kickoff_graph(make_crew(3), {0: [], 1: [], 2: []}, max_parallel=1)
+    assert [event for event, _, _ in log] == ['start', 'end'] * 3
+
+def test_kickoff_graph_stops_on_failure(scheduled):
+    log, durations, failing = scheduled
+    failing.add('t0')
+    durations['t0'] = 0.05
+    with pytest.raises(RuntimeError, match='t0 failed'):
+        kickoff_graph(make_crew(3), {0: [], 1: [0], 2: [1]}, max_parallel=2)
+    assert events(log, 'start') == ['t0']